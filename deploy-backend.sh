@@ -59,18 +59,29 @@ else
     exit 0
 fi
 
-# v2.0 Lambda 함수 패키징 (9개 함수)
+# DSQL 접속용 psycopg2 (Lambda 런타임용 바이너리)
+echo "📦 psycopg2 준비 중..."
+rm -rf build && mkdir -p build
+$PYTHON_CMD -m pip install psycopg2-binary==2.9.9 --target build --platform manylinux2014_x86_64 \
+    --only-binary=:all: --python-version 3.9 --quiet
+DB_DEPS="lambda/dsql.py build/psycopg2 build/psycopg2_binary.libs"
+
+# v2.0 Lambda 함수 패키징 (13개 함수)
 echo "📦 v2.0 Lambda 함수 패키징 중..."
-$PYTHON_CMD -m zipfile -c ../speech_analysis.zip lambda/speech_analysis.py
-$PYTHON_CMD -m zipfile -c ../chat_analysis.zip lambda/chat_analysis.py
-$PYTHON_CMD -m zipfile -c ../emotion_analysis.zip lambda/emotion_analysis.py
+$PYTHON_CMD -m zipfile -c ../speech_analysis.zip lambda/speech_analysis.py lambda/speech_analyzer.py lambda/korean_sentiment.py lambda/keyword_matcher.py
+$PYTHON_CMD -m zipfile -c ../chat_analysis.zip lambda/chat_analysis.py lambda/response_cache.py lambda/json_extractor.py lambda/keyword_matcher.py lambda/credits.py lambda/auth_context.py lambda/prompt_compiler.py $DB_DEPS
+$PYTHON_CMD -m zipfile -c ../emotion_analysis.zip lambda/emotion_analysis.py lambda/emotion_cache.py lambda/korean_sentiment.py $DB_DEPS
 $PYTHON_CMD -m zipfile -c ../auth_middleware.zip lambda/auth_middleware.py
-$PYTHON_CMD -m zipfile -c ../file_upload.zip lambda/file_upload.py
-$PYTHON_CMD -m zipfile -c ../conversation_history.zip lambda/conversation_history.py
-$PYTHON_CMD -m zipfile -c ../user_profile_manager.zip lambda/user_profile_manager.py
-$PYTHON_CMD -m zipfile -c ../partner_profile_manager.zip lambda/partner_profile_manager.py
-$PYTHON_CMD -m zipfile -c ../chat_room_manager.zip lambda/chat_room_manager.py
-
+$PYTHON_CMD -m zipfile -c ../stream_authorizer.zip lambda/stream_authorizer.py
+$PYTHON_CMD -m zipfile -c ../file_upload.zip lambda/file_upload.py lambda/speech_analyzer.py lambda/korean_sentiment.py lambda/keyword_matcher.py
+$PYTHON_CMD -m zipfile -c ../conversation_history.zip lambda/conversation_history.py lambda/usage_stats_buffer.py lambda/ids.py lambda/dashboard_summary.py $DB_DEPS
+$PYTHON_CMD -m zipfile -c ../user_profile_manager.zip lambda/user_profile_manager.py lambda/dashboard_summary.py $DB_DEPS
+$PYTHON_CMD -m zipfile -c ../dashboard_summary.zip lambda/dashboard_summary.py $DB_DEPS
+$PYTHON_CMD -m zipfile -c ../usage_stats_buffer.zip lambda/usage_stats_buffer.py $DB_DEPS
+$PYTHON_CMD -m zipfile -c ../partner_profile_manager.zip lambda/partner_profile_manager.py lambda/auth_context.py lambda/keyword_matcher.py lambda/ids.py $DB_DEPS
+$PYTHON_CMD -m zipfile -c ../chat_room_manager.zip lambda/chat_room_manager.py lambda/chat_room_store.py lambda/ids.py $DB_DEPS
+
+rm -rf build
 cd ..
 
 # v2.0 함수 업데이트
@@ -102,6 +113,13 @@ aws lambda update-function-code \
     --region $REGION \
     --output text > /dev/null
 
+echo "🔄 stream_authorizer 함수 업데이트 중 (WebSocket 연결 인증)..."
+aws lambda update-function-code \
+    --function-name love-q-stream-authorizer-$ENVIRONMENT \
+    --zip-file fileb://stream_authorizer.zip \
+    --region $REGION \
+    --output text > /dev/null
+
 echo "🔄 file_upload 함수 업데이트 중..."
 aws lambda update-function-code \
     --function-name love-q-file-upload-$ENVIRONMENT \
@@ -109,6 +127,27 @@ aws lambda update-function-code \
     --region $REGION \
     --output text > /dev/null
 
+echo "🔄 file_processor 함수 업데이트 중 (S3 업로드 이벤트 처리)..."
+aws lambda update-function-code \
+    --function-name love-q-file-processor-$ENVIRONMENT \
+    --zip-file fileb://file_upload.zip \
+    --region $REGION \
+    --output text > /dev/null
+
+echo "🔄 dashboard_rebuild 함수 업데이트 중 (대시보드 요약 재계산)..."
+aws lambda update-function-code \
+    --function-name love-q-dashboard-rebuild-$ENVIRONMENT \
+    --zip-file fileb://dashboard_summary.zip \
+    --region $REGION \
+    --output text > /dev/null
+
+echo "🔄 usage_stats_flush 함수 업데이트 중 (사용 통계 증분 반영)..."
+aws lambda update-function-code \
+    --function-name love-q-usage-stats-flush-$ENVIRONMENT \
+    --zip-file fileb://usage_stats_buffer.zip \
+    --region $REGION \
+    --output text > /dev/null
+
 echo "🔄 conversation_history 함수 업데이트 중..."
 aws lambda update-function-code \
     --function-name love-q-conversation-history-$ENVIRONMENT \
@@ -139,7 +178,7 @@ aws lambda update-function-code \
 
 rm -f *.zip
 
-echo "✅ v2.0 Lambda 함수 배포 완료! (9개 함수)"
+echo "✅ v2.0 Lambda 함수 배포 완료! (13개 함수)"
 
 # 3. v2.0 배포 정보 출력
 API_URL=$(aws cloudformation describe-stacks \
@@ -49,7 +49,17 @@ export interface SpeechAnalysisResponse {
   response_examples: string[];
 }
 
+export interface ChatRoomUpdate {
+  room_id: string;
+  last_message?: string;
+  message_count?: number;
+  increment_message_count?: number;
+  version?: number;
+}
+
 export interface ChatAnalysisRequest {
+  // 저장된 상대방 프로필 (서버에 저장된 분석 결과 사용)
+  profile_id?: string;
   context: string;
   situation: string;
   user_style: SpeechAnalysisResponse;
@@ -131,9 +141,12 @@ export const apiService = {
     return response.data;
   },
 
-  getConversationHistory: async (userId: string, limit = 20, offset = 0) => {
+  getConversationHistory: async (userId: string, limit = 20, cursor?: string, includeCount = false) => {
     const client = await createAuthenticatedClient();
-    const response = await client.get(`/conversation-history?user_id=${userId}&limit=${limit}&offset=${offset}`);
+    const params = new URLSearchParams({ user_id: userId, limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+    if (includeCount) params.set('include_count', 'true');
+    const response = await client.get(`/conversation-history?${params.toString()}`);
     return response.data;
   },
 
@@ -179,9 +192,11 @@ export const apiService = {
   },
 
   // 대화방 관리
-  getChatRooms: async (userId: string) => {
+  getChatRooms: async (userId: string, limit = 50, cursor?: string) => {
     const client = await createAuthenticatedClient();
-    const response = await client.get(`/chat-rooms?user_id=${userId}`);
+    const params = new URLSearchParams({ user_id: userId, limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+    const response = await client.get(`/chat-rooms?${params.toString()}`);
     return response.data;
   },
 
@@ -195,16 +210,18 @@ export const apiService = {
     return response.data;
   },
 
-  updateChatRoom: async (data: {
-    room_id: string;
-    last_message?: string;
-    message_count?: number;
-  }) => {
+  updateChatRoom: async (data: ChatRoomUpdate) => {
     const client = await createAuthenticatedClient();
     const response = await client.put('/chat-rooms', data);
     return response.data;
   },
 
+  updateChatRooms: async (updates: ChatRoomUpdate[]) => {
+    const client = await createAuthenticatedClient();
+    const response = await client.put('/chat-rooms', { updates });
+    return response.data;
+  },
+
   deleteChatRoom: async (roomId: string) => {
     const client = await createAuthenticatedClient();
     const response = await client.delete('/chat-rooms', {
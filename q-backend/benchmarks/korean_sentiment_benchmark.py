@@ -0,0 +1,119 @@
+"""로컬 한국어 감정 분석 엔진 벤치마크 및 Comprehend 일치율 리포트
+
+사용법:
+    python benchmarks/korean_sentiment_benchmark.py bench [메시지 수]
+    python benchmarks/korean_sentiment_benchmark.py record texts.txt recorded.jsonl
+    python benchmarks/korean_sentiment_benchmark.py agreement recorded.jsonl
+
+record는 texts.txt의 각 줄을 Comprehend detect_sentiment로 분석하여
+{"text", "Sentiment", "SentimentScore"} 형태의 JSONL로 저장합니다 (AWS 자격 증명 필요).
+agreement는 저장된 Comprehend 결과와 로컬 엔진 결과를 비교합니다.
+"""
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'lambda'))
+
+from korean_sentiment import score_sentiment
+
+LABELS = ['POSITIVE', 'NEGATIVE', 'NEUTRAL', 'MIXED']
+SCORE_KEYS = ['Positive', 'Negative', 'Neutral', 'Mixed']
+
+SAMPLE_MESSAGES = [
+    '안녕하세요', '뭐해?', 'ㅋㅋㅋㅋ 진짜 웃기다', '오늘 날씨 좋아요 😀', '힘들어 ㅠㅠ',
+    '내일 영화 볼래? 대박 재밌대', '아니 그게 아니라', '넵 알겠습니다', '^^ 좋아', '헐 완전 최고',
+    '퇴근했어? 저녁 먹었어?', 'T_T 별로였어', '와 :) 고마워요', '주말에 시간 돼요?', '안 좋은 일 있었어'
+]
+
+def bench(count: int):
+    rng = random.Random(42)
+    messages = [rng.choice(SAMPLE_MESSAGES) + ' ' + rng.choice(SAMPLE_MESSAGES) for _ in range(count)]
+
+    start = time.perf_counter()
+    results = [score_sentiment(message) for message in messages]
+    elapsed = time.perf_counter() - start
+
+    distribution = Counter(result['Sentiment'] for result in results)
+    print(f"messages: {count}")
+    print(f"total: {elapsed:.3f}s, per message: {elapsed / count * 1000:.4f}ms")
+    print(f"distribution: {dict(distribution)}")
+
+def record(texts_path: str, output_path: str):
+    import boto3
+    comprehend = boto3.client('comprehend')
+
+    with open(texts_path, encoding='utf-8') as texts, open(output_path, 'w', encoding='utf-8') as output:
+        for line in texts:
+            text = line.strip()
+            if not text:
+                continue
+            response = comprehend.detect_sentiment(Text=text[:5000], LanguageCode='ko')
+            output.write(json.dumps({
+                'text': text,
+                'Sentiment': response['Sentiment'],
+                'SentimentScore': response['SentimentScore']
+            }, ensure_ascii=False) + '\n')
+
+def load_recorded(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding='utf-8') as recorded:
+        return [json.loads(line) for line in recorded if line.strip()]
+
+def agreement(recorded_path: str):
+    records = load_recorded(recorded_path)
+    if not records:
+        print("No recorded outputs found")
+        return
+
+    confusion = {expected: Counter() for expected in LABELS}
+    matches = 0
+    polarity_matches = polarity_total = 0
+    score_error = 0.0
+
+    for item in records:
+        expected = item['Sentiment']
+        local = score_sentiment(item['text'])
+        actual = local['Sentiment']
+
+        confusion.setdefault(expected, Counter())[actual] += 1
+        matches += expected == actual
+        score_error += sum(
+            abs(item['SentimentScore'].get(key, 0.0) - local['SentimentScore'][key]) for key in SCORE_KEYS
+        ) / len(SCORE_KEYS)
+
+        # 긍정/부정만 비교 (중립/복합 제외)
+        if expected in ('POSITIVE', 'NEGATIVE'):
+            polarity_total += 1
+            polarity_matches += expected == actual
+
+    total = len(records)
+    print(f"records: {total}")
+    print(f"label agreement: {matches / total:.1%}")
+    if polarity_total:
+        print(f"polarity agreement (POSITIVE/NEGATIVE only): {polarity_matches / polarity_total:.1%}")
+    print(f"mean absolute score difference: {score_error / total:.3f}")
+
+    header = 'comprehend / local'
+    print(f"\n{header:>20} " + ' '.join(f"{label:>9}" for label in LABELS))
+    for expected in LABELS:
+        row = confusion.get(expected, Counter())
+        print(f"{expected:>20} " + ' '.join(f"{row[label]:>9}" for label in LABELS))
+
+def main(args: List[str]):
+    command = args[0] if args else 'bench'
+    if command == 'bench':
+        bench(int(args[1]) if len(args) > 1 else 100000)
+    elif command == 'record' and len(args) == 3:
+        record(args[1], args[2])
+    elif command == 'agreement' and len(args) == 2:
+        agreement(args[1])
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
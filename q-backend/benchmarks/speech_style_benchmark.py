@@ -0,0 +1,103 @@
+"""말투 분석 벤치마크 - 기존 4회 순회 구현 대비 단일 순회/NumPy 배치 분석 속도 비교
+
+사용법:
+    python benchmarks/speech_style_benchmark.py [메시지 수 ...]
+"""
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, List, Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'lambda'))
+
+from speech_analyzer import analyze_speech_style, analyze_speech_style_batch, np
+
+SAMPLE_MESSAGES = [
+    '안녕하세요', '뭐해?', 'ㅋㅋㅋㅋ 진짜 웃기다', '오늘 날씨 좋아요 😀', '힘들어 ㅠㅠ',
+    '내일 영화 볼래? 대박 재밌대', '아니 그게 아니라', '넵 알겠습니다', '^^ 좋아', '헐 완전 최고',
+    '퇴근했어? 저녁 먹었어?', 'T_T 별로였어', '와 :) 고마워요', '주말에 시간 돼요?', 'XD ><'
+]
+
+def legacy_analyze_speech_style(messages: List[str]) -> Dict[str, Any]:
+    """기존 구현 (메시지 목록 4회 순회 + 매 메시지 정규식 컴파일 캐시 조회)"""
+    total_msgs = len(messages)
+    if total_msgs == 0:
+        return {
+            "formal_ratio": 0.5,
+            "emoji_ratio": 0.2,
+            "avg_length": 10,
+            "total_messages": 0,
+            "tone": "neutral",
+            "speech_style": "casual"
+        }
+
+    formal_patterns = ['요', '습니다', '해요', '입니다', '세요', '시죠', '죠']
+    formal_count = sum(1 for msg in messages
+                       if any(pattern in msg for pattern in formal_patterns))
+
+    emoji_pattern = r'[😀-🙏ㅋㅎㅠㅜ]|:\)|:\(|:D|XD|><|T_T|\^\^'
+    emoji_count = sum(len(re.findall(emoji_pattern, msg)) for msg in messages)
+
+    avg_length = sum(len(msg) for msg in messages) / total_msgs
+
+    positive_words = ['좋아', '최고', '대박', '완전', '진짜', '헐', '와']
+    negative_words = ['싫어', '별로', '아니', '안돼', '힘들어', 'ㅠㅠ']
+
+    positive_count = sum(1 for msg in messages
+                         if any(word in msg for word in positive_words))
+    negative_count = sum(1 for msg in messages
+                         if any(word in msg for word in negative_words))
+
+    if positive_count > negative_count:
+        tone = "positive"
+    elif negative_count > positive_count:
+        tone = "negative"
+    else:
+        tone = "neutral"
+
+    formal_ratio = formal_count / total_msgs
+    if formal_ratio > 0.7:
+        speech_style = "formal"
+    elif formal_ratio > 0.3:
+        speech_style = "semi_formal"
+    else:
+        speech_style = "casual"
+
+    return {
+        "formal_ratio": formal_ratio,
+        "emoji_ratio": emoji_count / total_msgs,
+        "avg_length": avg_length,
+        "total_messages": total_msgs,
+        "tone": tone,
+        "speech_style": speech_style
+    }
+
+def generate_messages(count: int, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    return [rng.choice(SAMPLE_MESSAGES) + rng.choice(SAMPLE_MESSAGES) for _ in range(count)]
+
+def measure(func, messages: List[str]):
+    start = time.perf_counter()
+    result = func(messages)
+    return result, time.perf_counter() - start
+
+def main(sizes: List[int]):
+    print(f"NumPy: {'사용 가능' if np is not None else '미설치 (배치 경로는 단일 순회로 대체)'}")
+    print(f"{'messages':>10} {'legacy(s)':>10} {'single(s)':>10} {'batch(s)':>10} {'single x':>9} {'batch x':>8}")
+
+    for size in sizes:
+        messages = generate_messages(size)
+        legacy_result, legacy_time = measure(legacy_analyze_speech_style, messages)
+        single_result, single_time = measure(analyze_speech_style, messages)
+        batch_result, batch_time = measure(analyze_speech_style_batch, messages)
+
+        assert single_result == legacy_result, (single_result, legacy_result)
+        assert batch_result == legacy_result, (batch_result, legacy_result)
+
+        print(f"{size:>10} {legacy_time:>10.3f} {single_time:>10.3f} {batch_time:>10.3f} "
+              f"{legacy_time / single_time:>8.2f}x {legacy_time / batch_time:>7.2f}x")
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
@@ -40,9 +40,15 @@ CREATE TABLE IF NOT EXISTS emotion_analysis (
     emotions JSONB,
     key_phrases JSONB,
     entities JSONB,
+    text_hash VARCHAR(64), -- 정규화된 텍스트의 SHA-256 (결과 캐시 키)
+    result JSONB, -- 전체 분석 결과 (캐시 적중 시 그대로 반환)
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 기존 테이블에 캐시 컬럼 추가
+ALTER TABLE emotion_analysis ADD COLUMN IF NOT EXISTS text_hash VARCHAR(64);
+ALTER TABLE emotion_analysis ADD COLUMN IF NOT EXISTS result JSONB;
+
 -- 대화 기록 테이블
 CREATE TABLE IF NOT EXISTS conversations (
     conversation_id SERIAL PRIMARY KEY,
@@ -95,6 +101,21 @@ CREATE TABLE IF NOT EXISTS user_credits (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(user_id)
 );
+-- 답변 생성 중 예약된 크레딧 (credits.reserve ~ commit/release)
+ALTER TABLE user_credits ADD COLUMN IF NOT EXISTS credits_reserved INTEGER NOT NULL DEFAULT 0;
+
+-- 크레딧 예약 테이블 (reservation_id = 멱등 키)
+CREATE TABLE IF NOT EXISTS credit_reservations (
+    reservation_id VARCHAR(100) PRIMARY KEY,
+    user_id VARCHAR(255) REFERENCES users(user_id) ON DELETE CASCADE,
+    amount INTEGER NOT NULL CHECK (amount > 0),
+    status VARCHAR(20) NOT NULL DEFAULT 'reserved', -- 'reserved', 'committed', 'released'
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+-- 확정된 요청의 답변 (같은 멱등 키로 재시도하면 모델을 다시 호출하지 않고 반환)
+ALTER TABLE credit_reservations ADD COLUMN IF NOT EXISTS response JSONB;
 
 -- 사용 통계 테이블 (확장)
 CREATE TABLE IF NOT EXISTS usage_stats (
@@ -108,15 +129,76 @@ CREATE TABLE IF NOT EXISTS usage_stats (
     UNIQUE(user_id, date)
 );
 
+-- 사용 통계 증분 (대화 저장과 같은 트랜잭션에서 추가, usage_stats_buffer.flush_handler가 모아 usage_stats에 반영)
+CREATE TABLE IF NOT EXISTS usage_stats_deltas (
+    delta_id BIGSERIAL PRIMARY KEY,
+    user_id VARCHAR(255) NOT NULL,
+    date DATE NOT NULL,
+    conversations INTEGER NOT NULL,
+    responses INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 대화방 테이블 (chat_room_manager)
+CREATE TABLE IF NOT EXISTS chat_rooms (
+    room_id VARCHAR(200) PRIMARY KEY,
+    user_id VARCHAR(255) NOT NULL,
+    name VARCHAR(200),
+    partner_name VARCHAR(100),
+    partner_relationship VARCHAR(50),
+    message_count INTEGER NOT NULL DEFAULT 0,
+    last_message TEXT,
+    version INTEGER NOT NULL DEFAULT 1, -- 갱신마다 1 증가 (ETag/If-Match)
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+ALTER TABLE chat_rooms ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+-- 상대방 프로필 테이블 (partner_profile_manager, 분석 결과는 저장 시 한 번 계산)
+CREATE TABLE IF NOT EXISTS partner_profiles (
+    profile_id VARCHAR(200) PRIMARY KEY,
+    user_id VARCHAR(255) NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    age VARCHAR(20),
+    relationship VARCHAR(50) NOT NULL,
+    description TEXT,
+    interests TEXT,
+    communication_style VARCHAR(50),
+    analysis JSONB NOT NULL DEFAULT '{}', -- analyze_partner_info 결과
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 사용자 대시보드 요약 테이블 (대화 저장/피드백 시 증분 갱신, dashboard_summary.rebuild_handler로 재계산)
+CREATE TABLE IF NOT EXISTS user_dashboard_summary (
+    user_id VARCHAR(255) PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    total_conversations INTEGER NOT NULL DEFAULT 0,
+    rated_conversations INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    response_type_counts JSONB NOT NULL DEFAULT '{}',
+    activity_date DATE,
+    activity_date_conversations INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- 인덱스 생성
 CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations(user_id);
 CREATE INDEX IF NOT EXISTS idx_conversations_created_at ON conversations(created_at);
+-- cursor 페이지네이션용 (user_id별 최신순)
+CREATE INDEX IF NOT EXISTS idx_conversations_user_created ON conversations(user_id, created_at DESC, conversation_id DESC);
 CREATE INDEX IF NOT EXISTS idx_user_sessions_user_id ON user_sessions(user_id);
 CREATE INDEX IF NOT EXISTS idx_emotion_analysis_user_id ON emotion_analysis(user_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_emotion_analysis_text_hash ON emotion_analysis(text_hash);
 CREATE INDEX IF NOT EXISTS idx_usage_stats_user_date ON usage_stats(user_id, date);
 CREATE INDEX IF NOT EXISTS idx_response_feedback_conversation ON response_feedback(conversation_id);
+-- 대화방 목록용 (user_id별 최근 활동순)
+CREATE INDEX IF NOT EXISTS idx_chat_rooms_user_updated ON chat_rooms(user_id, updated_at DESC, room_id DESC);
+-- 상대방 프로필 목록용 (user_id별 최신순)
+CREATE INDEX IF NOT EXISTS idx_partner_profiles_user_created ON partner_profiles(user_id, created_at DESC, profile_id DESC);
+CREATE INDEX IF NOT EXISTS idx_credit_reservations_user_status ON credit_reservations(user_id, status, expires_at);
 
--- 사용자 대시보드 뷰 (확장)
+-- 사용자 대시보드 뷰 (확장, 전체 대화를 매번 집계하므로 API는 user_dashboard_summary 사용)
 CREATE OR REPLACE VIEW user_dashboard AS
 SELECT 
     u.user_id,
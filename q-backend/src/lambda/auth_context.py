@@ -0,0 +1,8 @@
+from typing import Dict, Optional
+
+def get_user_id(event: Dict) -> Optional[str]:
+    """API Gateway 권한 부여자가 검증한 사용자 ID (Cognito 토큰의 sub, 인증되지 않았으면 None)"""
+    authorizer = (event.get('requestContext') or {}).get('authorizer') or {}
+    claims = authorizer.get('claims') or {}
+    # REST API Cognito 권한 부여자는 claims, Lambda 권한 부여자(WebSocket $connect)는 context 값을 그대로 전달
+    return claims.get('sub') or authorizer.get('user_id') or authorizer.get('principalId')
@@ -1,10 +1,33 @@
 import json
 import boto3
 import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Callable
+
+import dsql
+from auth_context import get_user_id
+from credits import CreditHold, InsufficientCreditsError, DuplicateRequestError, CREDITS_REQUIRED
+from keyword_matcher import PERSONALITY_MATCHER
+from json_extractor import IncrementalJSONExtractor, extract_json, get_extraction_stats
+from prompt_compiler import CompiledPrompt, SectionCache, content_version
+from response_cache import build_fingerprint, create_response_cache_from_env
 
 bedrock = boto3.client('bedrock-runtime')
 
+# 답변 캐시 (웜 컨테이너 간 재사용, RESPONSE_CACHE_BACKEND=none 이면 비활성화)
+response_cache = create_response_cache_from_env()
+
+# 컴파일된 프롬프트 섹션 (상대방 프로필/사용자 말투별, 웜 컨테이너 간 재사용)
+prompt_sections = SectionCache()
+
+BEDROCK_MODEL_ID = 'anthropic.claude-3-5-sonnet-20240620-v1:0'
+
+# 답변 스타일 (위험 허용도 낮은 순)
+RESPONSE_TYPES = ['안전형', '균형형', '대담형']
+STYLE_RISK_LEVELS = {'안전형': 2, '균형형': 3, '대담형': 4}
+
+# 상대방 섹션 내용을 결정하는 필드 (캐시 버전 계산용)
+PARTNER_SECTION_FIELDS = ('name', 'relationship', 'description', 'interests', 'communication_style', 'analysis')
+
 def lambda_handler(event, context):
     """답변 생성 Lambda 함수"""
     try:
@@ -13,7 +36,7 @@ def lambda_handler(event, context):
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*',
             'Access-Control-Allow-Methods': 'POST, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type'
+            'Access-Control-Allow-Headers': 'Content-Type, Authorization, Idempotency-Key'
         }
         
         # OPTIONS 요청 처리
@@ -24,15 +47,57 @@ def lambda_handler(event, context):
                 'body': ''
             }
         
+        # WebSocket 연결/종료 (사용자 확인은 $connect 권한 부여자가 처리)
+        if (event.get('requestContext') or {}).get('routeKey') in ('$connect', '$disconnect'):
+            return {
+                'statusCode': 200,
+                'body': ''
+            }
+        
         # 요청 본문 파싱
-        body = json.loads(event.get('body', '{}'))
+        body = json.loads(event.get('body') or '{}')
+
+        # 캐시 적중률 조회
+        if body.get('action') == 'cache_stats':
+            return {
+                'statusCode': 200,
+                'headers': headers,
+                'body': json.dumps({
+                    'response_cache': response_cache.get_stats() if response_cache else {},
+                    'prompt_sections': prompt_sections.get_stats()
+                })
+            }
+
         context_text = body.get('context', '')
         situation = body.get('situation', '')
         user_style = body.get('user_style', {})
         partner_info = body.get('partner_info', {})
         
-        # 답변 생성
-        responses = generate_responses(context_text, situation, user_style, partner_info)
+        # 크레딧 예약 준비 (모델 호출 직전에 예약, 사용자는 요청 본문이 아닌 권한 부여자에서 확인)
+        user_id = get_user_id(event)
+        if CREDITS_REQUIRED and not user_id:
+            return {
+                'statusCode': 401,
+                'headers': headers,
+                'body': json.dumps({'error': 'Authentication required'})
+            }
+        credit_hold = build_credit_hold(event, body, user_id) if user_id else None
+        
+        # 스트리밍 모드 (WebSocket 연결에서만 부분 응답 전송 가능)
+        on_message = None
+        if body.get('stream'):
+            on_message = build_stream_sender(event)
+        
+        # 답변 생성 (all_styles: 안전형/균형형/대담형을 한 번의 호출로 생성)
+        if body.get('all_styles'):
+            responses = generate_all_responses(context_text, situation, user_style, partner_info, on_message,
+                                               credit_hold, body.get('profile_id'), user_id)
+        else:
+            responses = generate_responses(context_text, situation, user_style, partner_info, on_message,
+                                           credit_hold, body.get('profile_id'), user_id)
+        
+        if on_message:
+            on_message({'type': 'responses', 'responses': responses})
         
         return {
             'statusCode': 200,
@@ -40,6 +105,18 @@ def lambda_handler(event, context):
             'body': json.dumps({'responses': responses})
         }
         
+    except InsufficientCreditsError:
+        return {
+            'statusCode': 402,
+            'headers': headers,
+            'body': json.dumps({'error': 'Insufficient credits'})
+        }
+    except DuplicateRequestError as e:
+        return {
+            'statusCode': 409,
+            'headers': headers,
+            'body': json.dumps({'error': str(e)})
+        }
     except Exception as e:
         return {
             'statusCode': 500,
@@ -47,11 +124,288 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
-def generate_responses(context: str, situation: str, user_style: Dict, partner_info: Dict) -> List[Dict]:
-    """AI 답변 생성 (상대방 정보 기반 맞춤 답변)"""
+def build_credit_hold(event: Dict, body: Dict, user_id: str) -> Optional[CreditHold]:
+    """요청의 크레딧 예약 (멱등 키는 Idempotency-Key 헤더 또는 idempotency_key)"""
+    if not dsql.is_configured():
+        # 과금이 필수인데 DB가 없으면 모델을 호출하지 않음
+        if CREDITS_REQUIRED:
+            raise RuntimeError("Credit store not configured")
+        return None
+    request_headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    idempotency_key = request_headers.get('idempotency-key') or body.get('idempotency_key')
+    return CreditHold(user_id, 1, idempotency_key)
+
+def load_partner_info(profile_id: str, user_id: Optional[str], partner_info: Dict) -> Dict:
+    """요청한 사용자의 저장된 상대방 프로필과 분석 결과로 partner_info 구성 (없으면 요청 값 그대로)"""
+    if not user_id:
+        print(f"Partner profile requires an authenticated user: {profile_id}")
+        return partner_info
+    try:
+        profile = dsql.fetch_one("""
+            SELECT profile_id, name, age, relationship, description, interests, communication_style,
+                   analysis, updated_at
+            FROM partner_profiles
+            WHERE profile_id = %(profile_id)s AND user_id = %(user_id)s
+        """, {'profile_id': profile_id, 'user_id': user_id})
+    except Exception as e:
+        print(f"Partner profile load error: {e}")
+        return partner_info
     
-    # 상대방 정보 상세 분석
-    partner_context = build_partner_context(partner_info)
+    if not profile:
+        print(f"Partner profile not found: {profile_id}")
+        return partner_info
+    
+    if isinstance(profile['analysis'], str):
+        profile['analysis'] = json.loads(profile['analysis'])
+    return {**partner_info, **{field: value for field, value in profile.items() if value is not None}}
+
+def generate_responses(context: str, situation: str, user_style: Dict, partner_info: Dict,
+                       on_message: Optional[Callable[[Dict], None]] = None,
+                       credit_hold: Optional[CreditHold] = None,
+                       profile_id: Optional[str] = None, user_id: Optional[str] = None) -> List[Dict]:
+    """AI 답변 생성 (상대방 정보 기반 맞춤 답변, profile_id가 있으면 사용자의 저장된 프로필 분석 사용)"""
+    if profile_id:
+        partner_info = load_partner_info(profile_id, user_id, partner_info)
+    
+    # 캐시 조회 - 적중 시 Bedrock 호출 생략
+    fingerprint = None
+    if response_cache:
+        fingerprint = build_response_fingerprint(context, situation, user_style, partner_info, user_id=user_id)
+        cached_responses = get_cached_responses(fingerprint, on_message)
+        if cached_responses is not None:
+            return cached_responses
+    
+    prompt = build_prompt(context, situation, user_style, partner_info, user_id)
+    
+    # 모델 호출 전 크레딧 예약 (부족하면 InsufficientCreditsError, 이미 확정된 재시도면 저장된 답변 반환)
+    if credit_hold:
+        stored_responses = credit_hold.reserve()
+        if stored_responses is not None:
+            return stored_responses
+
+    try:
+        ai_response = invoke_model_text(prompt, on_message)
+        
+        parsed_responses = [
+            response for response in map(validate_response, parse_ai_response(ai_response) or [])
+            if response
+        ]
+        if parsed_responses:
+            if credit_hold:
+                credit_hold.commit(parsed_responses)
+            if fingerprint:
+                response_cache.set(fingerprint, parsed_responses)
+            return parsed_responses
+            
+    except Exception as e:
+        print(f"Bedrock API error: {e}")
+    
+    # 기본 응답은 과금하지 않음
+    if credit_hold:
+        credit_hold.release()
+    return build_fallback_responses(situation, user_style)
+
+def generate_all_responses(context: str, situation: str, user_style: Dict, partner_info: Dict,
+                           on_message: Optional[Callable[[Dict], None]] = None,
+                           credit_hold: Optional[CreditHold] = None,
+                           profile_id: Optional[str] = None, user_id: Optional[str] = None) -> List[Dict]:
+    """안전형/균형형/대담형 답변을 한 번의 Bedrock 호출로 생성"""
+    if profile_id:
+        partner_info = load_partner_info(profile_id, user_id, partner_info)
+    
+    # 캐시 조회 - 단일 답변과 구분되는 'all' 버킷 사용
+    fingerprint = None
+    if response_cache:
+        fingerprint = build_response_fingerprint(context, situation, user_style, partner_info, 'all', user_id)
+        cached_responses = get_cached_responses(fingerprint, on_message)
+        if cached_responses is not None:
+            return cached_responses
+    
+    recommended_type = get_response_type(calculate_risk_tolerance(user_style))
+    prompt = build_multi_prompt(context, situation, user_style, partner_info, user_id)
+    
+    # 모델 호출 전 크레딧 예약 (부족하면 InsufficientCreditsError, 이미 확정된 재시도면 저장된 답변 반환)
+    if credit_hold:
+        stored_responses = credit_hold.reserve()
+        if stored_responses is not None:
+            return stored_responses
+    
+    responses_by_type = {}
+    try:
+        ai_response = invoke_model_text(prompt, on_message)
+        
+        for item in parse_ai_response(ai_response) or []:
+            response = validate_response(item)
+            if response and response['type'] not in responses_by_type:
+                responses_by_type[response['type']] = response
+                
+    except Exception as e:
+        print(f"Bedrock API error: {e}")
+    
+    # 모델이 생성한 답변이 하나도 없으면 과금하지 않음
+    generated = bool(responses_by_type)
+    
+    # 누락되거나 검증에 실패한 스타일만 기본 응답으로 채움
+    missing_types = [t for t in RESPONSE_TYPES if t not in responses_by_type]
+    if missing_types:
+        for response in build_fallback_responses(situation, user_style, missing_types):
+            responses_by_type[response['type']] = response
+    
+    responses = []
+    for response_type in RESPONSE_TYPES:
+        response = responses_by_type[response_type]
+        response['recommended'] = response_type == recommended_type
+        responses.append(response)
+    
+    # 모델이 생성한 답변이 하나라도 있으면 확정 (재시도에 돌려줄 답변과 함께 저장), 모두 기본 응답이면 취소
+    if credit_hold:
+        if generated:
+            credit_hold.commit(responses)
+        else:
+            credit_hold.release()
+    
+    # 모든 스타일이 모델 생성 결과일 때만 캐시에 저장
+    if fingerprint and not missing_types:
+        response_cache.set(fingerprint, responses)
+    
+    return responses
+
+def validate_response(item: Any) -> Optional[Dict]:
+    """모델이 생성한 개별 답변 검증 및 정규화 (유효하지 않으면 None)"""
+    if not isinstance(item, dict):
+        return None
+    
+    response_type = item.get('type')
+    message = item.get('message')
+    if response_type not in RESPONSE_TYPES or not isinstance(message, str) or not message.strip():
+        return None
+    
+    try:
+        risk_level = int(item.get('risk_level', STYLE_RISK_LEVELS[response_type]))
+    except (TypeError, ValueError):
+        risk_level = STYLE_RISK_LEVELS[response_type]
+    
+    try:
+        confidence = float(item.get('confidence', 0.8))
+    except (TypeError, ValueError):
+        confidence = 0.8
+    
+    explanation = item.get('explanation') or item.get('advice') or ''
+    
+    return {
+        'type': response_type,
+        'message': message.strip(),
+        'explanation': str(explanation),
+        'risk_level': min(max(risk_level, 1), 5),
+        'confidence': min(max(confidence, 0.0), 1.0)
+    }
+
+def get_cached_responses(fingerprint: Dict[str, str],
+                         on_message: Optional[Callable[[Dict], None]] = None) -> Optional[List[Dict]]:
+    """캐시 조회 (적중 시 스트리밍 클라이언트에 첫 message 즉시 전달)"""
+    cached_responses = response_cache.get(fingerprint)
+    
+    if cached_responses is not None and on_message and cached_responses:
+        on_message({'type': 'message', 'message': cached_responses[0].get('message', '')})
+    
+    return cached_responses
+
+def build_response_fingerprint(context: str, situation: str, user_style: Dict, partner_info: Dict,
+                               response_type: Optional[str] = None, user_id: Optional[str] = None) -> Dict[str, str]:
+    """캐시 키용 입력 지문 (사용자별로 분리, 프롬프트에 들어가는 상대방/감정/말투 내용이 같을 때만 적중)"""
+    if response_type is None:
+        response_type = get_response_type(calculate_risk_tolerance(user_style))
+    
+    partner_traits = get_partner_traits(partner_info)
+    partner_traits += [f"risk:{risk}" for risk in (partner_info.get('analysis') or {}).get('risk_factors', [])]
+    for field in ('relationship', 'communication_style'):
+        if partner_info.get(field):
+            partner_traits.append(f"{field}:{partner_info[field]}")
+    
+    return build_fingerprint(
+        situation,
+        context,
+        response_type,
+        partner_traits,
+        user_style.get('speech_style', 'casual'),
+        build_cache_scope(user_style, partner_info, user_id)
+    )
+
+def build_cache_scope(user_style: Dict, partner_info: Dict, user_id: Optional[str]) -> str:
+    # 캐시된 message/explanation에는 상대방 이름·관심사와 감정 상태가 반영되므로 같은 입력에만 재사용
+    emotion_data = user_style.get('emotion_data', {})
+    prompt_inputs = content_version(
+        *(partner_info.get(field) for field in PARTNER_SECTION_FIELDS),
+        emotion_data.get('sentiment', 'NEUTRAL'),
+        round(float(emotion_data.get('sentiment_confidence', 0.5)), 1),
+        user_style.get('personality_traits', []),
+        *(user_style.get(field) for field in ('formal_ratio', 'emoji_ratio', 'avg_length'))
+    )
+    return f"{user_id or 'anonymous'}:{prompt_inputs}"
+
+def build_prompt(context: str, situation: str, user_style: Dict, partner_info: Dict,
+                 user_id: Optional[str] = None) -> CompiledPrompt:
+    """답변 생성 프롬프트 구성"""
+    
+    # 사용자 위험 허용도 계산
+    risk_tolerance = calculate_risk_tolerance(user_style)
+    response_type = get_response_type(risk_tolerance)
+    
+    prompt = build_request_context(context, situation, user_style) + f"""
+상대방의 성격과 소통 스타일을 고려하여 {response_type} 스타일로 답변을 생성해주세요.
+특히 상대방이 선호할 만한 대화 방식과 관심사를 반영해주세요.
+
+JSON 형식으로 응답:
+{{
+  "type": "{response_type}",
+  "message": "상대방에게 보낼 실제 메시지 (복사용)",
+  "explanation": "왜 이 답변이 효과적인지 상대방 특성 기반 설명",
+  "risk_level": {int(risk_tolerance)},
+  "confidence": 0.9
+}}
+"""
+    return CompiledPrompt(build_stable_prefix(user_style, partner_info, user_id), prompt)
+
+def build_multi_prompt(context: str, situation: str, user_style: Dict, partner_info: Dict,
+                       user_id: Optional[str] = None) -> CompiledPrompt:
+    """세 가지 스타일 답변을 한 번에 요청하는 프롬프트 구성 (단일 답변과 같은 앞부분 공유)"""
+    
+    response_examples = ',\n'.join(
+        f"""    {{
+      "type": "{response_type}",
+      "message": "상대방에게 보낼 실제 메시지 (복사용)",
+      "explanation": "왜 이 답변이 효과적인지 상대방 특성 기반 설명",
+      "risk_level": {STYLE_RISK_LEVELS[response_type]},
+      "confidence": 0.9
+    }}"""
+        for response_type in RESPONSE_TYPES
+    )
+    
+    prompt = build_request_context(context, situation, user_style) + f"""
+상대방의 성격과 소통 스타일을 고려하여 안전형(무난하고 부담 없는 답변), 균형형(적당한 관심 표현),
+대담형(적극적인 호감 표현) 세 가지 스타일의 답변을 각각 하나씩 생성해주세요.
+특히 상대방이 선호할 만한 대화 방식과 관심사를 반영해주세요.
+
+JSON 형식으로 응답 (responses 배열에 세 스타일을 순서대로 포함):
+{{
+  "responses": [
+{response_examples}
+  ]
+}}
+"""
+    return CompiledPrompt(build_stable_prefix(user_style, partner_info, user_id), prompt)
+
+def build_stable_prefix(user_style: Dict, partner_info: Dict, user_id: Optional[str] = None) -> str:
+    """같은 (사용자, 상대방)이면 요청이 바뀌어도 동일한 프롬프트 앞부분 (역할, 상대방, 말투)"""
+    return f"""
+당신은 연애 상담 전문가입니다. 상대방의 성격과 특성을 깊이 분석하여 가장 효과적인 메시지를 제안해주세요.
+
+{get_partner_section(partner_info)}
+
+{get_user_style_section(user_style, partner_info, user_id)}"""
+
+def build_request_context(context: str, situation: str, user_style: Dict) -> str:
+    """요청마다 바뀌는 프롬프트 부분 (감정 상태, 대화 맥락, 상황)"""
     
     # 감정 데이터 추출
     emotion_data = user_style.get('emotion_data', {})
@@ -64,79 +418,158 @@ def generate_responses(context: str, situation: str, user_style: Dict, partner_i
     response_type = get_response_type(risk_tolerance)
     
     # 감정 상태를 고려한 프롬프트
-    emotion_context = f"""
+    return f"""
 사용자 감정 상태:
 - 전반적 감정: {sentiment} (신뢰도: {sentiment_confidence:.1%})
 - 성격 특성: {', '.join(personality_traits) if personality_traits else '일반적'}
 - 추천 답변 타입: {response_type}
-"""
-    
-    prompt = f"""
-당신은 연애 상담 전문가입니다. 상대방의 성격과 특성을 깊이 분석하여 가장 효과적인 메시지를 제안해주세요.
 
-{partner_context}
-{emotion_context}
 대화 맥락: {context}
 현재 상황: {situation}
+"""
 
-사용자 말투 특성:
-- 존댓말 비율: {user_style.get('formal_ratio', 0.3):.1%}
-- 이모티콘 사용: {user_style.get('emoji_ratio', 0.2):.1f}개/메시지
-- 평균 메시지 길이: {user_style.get('avg_length', 20):.0f}자
-- 말투 스타일: {user_style.get('speech_style', 'casual')}
+def get_partner_section(partner_info: Dict) -> str:
+    """컴파일된 상대방 섹션 (저장된 프로필은 profile_id별 한 항목, 수정되면 다시 컴파일)"""
+    version = content_version(partner_info.get('updated_at'),
+                              *(partner_info.get(field) for field in PARTNER_SECTION_FIELDS))
+    owner = partner_info.get('profile_id') or version
+    return prompt_sections.get_or_build('partner', owner, version, lambda: build_partner_context(partner_info))
 
-상대방의 성격과 소통 스타일을 고려하여 {response_type} 스타일로 답변을 생성해주세요.
-특히 상대방이 선호할 만한 대화 방식과 관심사를 반영해주세요.
+def get_user_style_section(user_style: Dict, partner_info: Dict, user_id: Optional[str] = None) -> str:
+    """컴파일된 사용자 말투 섹션 ((사용자, 상대방)별 한 항목, 말투가 바뀌면 다시 컴파일)"""
+    values = (user_style.get('formal_ratio', 0.3), user_style.get('emoji_ratio', 0.2),
+              user_style.get('avg_length', 20), user_style.get('speech_style', 'casual'))
+    version = content_version(*values)
+    owner = f"{user_id}:{partner_info.get('profile_id') or ''}" if user_id else version
+    return prompt_sections.get_or_build('user_style', owner, version, lambda: build_user_style_context(*values))
 
-JSON 형식으로 응답:
-{{
-  "type": "{response_type}",
-  "message": "상대방에게 보낼 실제 메시지 (복사용)",
-  "explanation": "왜 이 답변이 효과적인지 상대방 특성 기반 설명",
-  "risk_level": {int(risk_tolerance)},
-  "confidence": 0.9
-}}
+def build_user_style_context(formal_ratio: float, emoji_ratio: float, avg_length: float, speech_style: str) -> str:
+    return f"""사용자 말투 특성:
+- 존댓말 비율: {formal_ratio:.1%}
+- 이모티콘 사용: {emoji_ratio:.1f}개/메시지
+- 평균 메시지 길이: {avg_length:.0f}자
+- 말투 스타일: {speech_style}
 """
 
+def build_bedrock_request(prompt: CompiledPrompt) -> str:
+    """Bedrock 요청 본문 생성"""
+    return json.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 2000,
+        "messages": [
+            {
+                "role": "user",
+                "content": str(prompt)
+            }
+        ]
+    })
+
+def invoke_model_text(prompt: CompiledPrompt, on_message: Optional[Callable[[Dict], None]] = None) -> str:
+    """AWS Bedrock 호출 (on_message가 있으면 스트리밍으로 message 필드 선전송)"""
+    if on_message:
+        return invoke_bedrock_stream(prompt, on_message)
+    return invoke_bedrock(prompt)
+
+def invoke_bedrock(prompt: CompiledPrompt) -> str:
+    """Bedrock 동기 호출 (전체 생성 완료까지 대기)"""
+    response = bedrock.invoke_model(
+        modelId=BEDROCK_MODEL_ID,
+        body=build_bedrock_request(prompt)
+    )
+    
+    response_body = json.loads(response['body'].read())
+    return response_body['content'][0]['text']
+
+def invoke_bedrock_stream(prompt: CompiledPrompt, on_message: Callable[[Dict], None]) -> str:
+    """Bedrock 스트리밍 호출 - message 필드가 완성되면 즉시 on_message로 전달"""
     try:
-        # AWS Bedrock 호출
-        response = bedrock.invoke_model(
-            modelId='anthropic.claude-3-5-sonnet-20240620-v1:0',
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 2000,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            })
+        response = bedrock.invoke_model_with_response_stream(
+            modelId=BEDROCK_MODEL_ID,
+            body=build_bedrock_request(prompt)
         )
+    except Exception as e:
+        # 스트리밍 API 사용 불가 시 기존 동기 호출로 폴백
+        print(f"Bedrock stream error, falling back to invoke_model: {e}")
+        return invoke_bedrock(prompt)
+    
+    extractor = IncrementalJSONExtractor()
+    message_sent = False
+    for stream_event in response['body']:
+        chunk = stream_event.get('chunk')
+        if not chunk:
+            continue
         
-        response_body = json.loads(response['body'].read())
-        ai_response = response_body['content'][0]['text']
+        payload = json.loads(chunk['bytes'])
+        if payload.get('type') != 'content_block_delta':
+            continue
         
-        # JSON 파싱 시도
-        try:
-            parsed_response = json.loads(ai_response)
-            # 단일 응답을 배열로 감싸서 반환
-            if 'type' in parsed_response:
-                return [parsed_response]
-            return parsed_response.get('responses', [])
-        except json.JSONDecodeError:
-            # JSON 파싱 실패 시 기본 응답 반환
-            pass
-            
-    except Exception as e:
-        print(f"Bedrock API error: {e}")
+        completed_fields = extractor.feed(payload.get('delta', {}).get('text', ''))
+        
+        if message_sent:
+            continue
+        for key, value in completed_fields:
+            if key == 'message':
+                message_sent = True
+                try:
+                    on_message({'type': 'message', 'message': value})
+                except Exception as e:
+                    print(f"Stream send error: {e}")
+                break
+    
+    return extractor.buffer
+
+def parse_ai_response(ai_response: str) -> Optional[List[Dict]]:
+    """모델 응답 JSON 파싱 (코드 블록/잘린 출력도 복구, 실패 시 None)"""
+    parsed_response = extract_json(ai_response)
+    print(f"Model output extraction stats: {get_extraction_stats()}")
+    
+    # 단일 응답을 배열로 감싸서 반환
+    if isinstance(parsed_response, list):
+        return parsed_response
+    if not isinstance(parsed_response, dict):
+        # JSON 파싱 실패 시 기본 응답 반환
+        return None
+    if 'type' in parsed_response:
+        return [parsed_response]
+    return parsed_response.get('responses', [])
+
+def build_stream_sender(event: Dict) -> Optional[Callable[[Dict], None]]:
+    """WebSocket 연결로 부분 응답을 전송하는 콜백 생성"""
+    request_context = event.get('requestContext', {})
+    connection_id = request_context.get('connectionId')
+    domain_name = request_context.get('domainName')
+    stage = request_context.get('stage')
     
-    # 감정 상태를 고려한 맞춤 기본 응답 (API 실패 시)
+    if not (connection_id and domain_name and stage):
+        # REST 호출은 부분 응답을 전달할 수 없으므로 동기 방식 사용
+        return None
+    
+    management_client = boto3.client(
+        'apigatewaymanagementapi',
+        endpoint_url=f"https://{domain_name}/{stage}"
+    )
+    
+    def send(data: Dict):
+        management_client.post_to_connection(
+            ConnectionId=connection_id,
+            Data=json.dumps(data, ensure_ascii=False).encode('utf-8')
+        )
+    
+    return send
+
+def build_fallback_responses(situation: str, user_style: Dict,
+                             response_types: Optional[List[str]] = None) -> List[Dict]:
+    """감정 상태를 고려한 맞춤 기본 응답 (API 실패 시)"""
     emotion_data = user_style.get('emotion_data', {})
     sentiment = emotion_data.get('sentiment', 'NEUTRAL')
     risk_tolerance = calculate_risk_tolerance(user_style)
     response_type = get_response_type(risk_tolerance)
     
+    # 지정된 스타일이 없으면 사용자 위험 허용도에 맞는 한 가지만 반환
+    if response_types is None:
+        response_types = [response_type]
+    risk_levels = {**STYLE_RISK_LEVELS, response_type: int(risk_tolerance)}
+    
     if "연락" in situation and "없어" in situation:
         if sentiment == 'NEGATIVE':
             messages = {
@@ -161,13 +594,7 @@ JSON 형식으로 응답:
                 "대담형": "적극적인 관심을 표현하며 대화를 이끌어갑니다."
             }
         
-        return [{
-            "type": response_type,
-            "message": messages.get(response_type, messages["균형형"]),
-            "advice": advice.get(response_type, advice["균형형"]),
-            "risk_level": int(risk_tolerance),
-            "confidence": 0.8
-        }]
+        return build_fallback_items(messages, advice, response_types, risk_levels)
     
     # 감정 상태를 고려한 기본 응답
     if sentiment == 'POSITIVE':
@@ -193,13 +620,18 @@ JSON 형식으로 응답:
             "대담형": "적극적인 호기심을 표현하며 관심을 드러냅니다."
         }
     
+    return build_fallback_items(messages, advice, response_types, risk_levels)
+
+def build_fallback_items(messages: Dict[str, str], advice: Dict[str, str],
+                         response_types: List[str], risk_levels: Dict[str, int]) -> List[Dict]:
+    """스타일별 기본 응답 목록 생성"""
     return [{
         "type": response_type,
         "message": messages.get(response_type, messages["균형형"]),
         "advice": advice.get(response_type, advice["균형형"]),
-        "risk_level": int(risk_tolerance),
+        "risk_level": risk_levels.get(response_type, 3),
         "confidence": 0.8
-    }]
+    } for response_type in response_types]
 
 def calculate_risk_tolerance(user_style: Dict) -> float:
     """사용자 위험 허용도 계산"""
@@ -241,11 +673,17 @@ def build_partner_context(partner_info: Dict) -> str:
     description = partner_info.get('description', '').strip()
     if description:
         context_parts.append(f"상대방 상세 정보:\n{description}")
-        
-        # 성격 키워드 추출
-        personality_keywords = extract_personality_keywords(description)
-        if personality_keywords:
-            context_parts.append(f"추출된 성격 특성: {', '.join(personality_keywords)}")
+    
+    # 성격 특성 (저장된 프로필은 저장 시 분석한 결과 사용)
+    personality_keywords = get_partner_traits(partner_info)
+    if personality_keywords:
+        context_parts.append(f"추출된 성격 특성: {', '.join(personality_keywords)}")
+    
+    analysis = partner_info.get('analysis') or {}
+    if analysis.get('approach_strategy'):
+        context_parts.append(f"관계 접근 전략: {analysis['approach_strategy']}")
+    if analysis.get('risk_factors'):
+        context_parts.append(f"주의할 점: {', '.join(analysis['risk_factors'])}")
     
     # 관심사
     if partner_info.get('interests'):
@@ -262,29 +700,16 @@ def build_partner_context(partner_info: Dict) -> str:
     
     return "\n".join(context_parts) if context_parts else "상대방 정보 없음"
 
+def get_partner_traits(partner_info: Dict) -> List[str]:
+    """상대방 성격 특성 (저장된 분석 결과가 있으면 사용, 없으면 설명에서 추출)"""
+    analysis = partner_info.get('analysis')
+    if analysis:
+        return list(analysis.get('personality_traits', []))[:5]
+    return extract_personality_keywords(partner_info.get('description', ''))
+
 def extract_personality_keywords(description: str) -> List[str]:
     """설명에서 성격 키워드 추출"""
-    keywords = []
-    
-    # 성격 관련 키워드 매핑
-    personality_patterns = {
-        '내성적': ['내성적', '조용', '수줍', '소심'],
-        '외향적': ['외향적', '활발', '사교적', '적극적'],
-        '감성적': ['감성적', '감정적', '로맨틱', '섬세'],
-        '논리적': ['논리적', '이성적', '분석적', '체계적'],
-        '유머러스': ['유머', '재미있', '웃긴', '장난'],
-        '진지함': ['진지', '성실', '책임감', '신중'],
-        '독립적': ['독립적', '자립적', '혼자', '개인주의'],
-        '배려심': ['배려', '친절', '따뜻', '상냥'],
-        '완벽주의': ['완벽', '꼼꼼', '세심', '정확'],
-        '자유로움': ['자유', '즉흥', '유연', '개방적']
-    }
-    
-    description_lower = description.lower()
-    for trait, patterns in personality_patterns.items():
-        if any(pattern in description_lower for pattern in patterns):
-            keywords.append(trait)
-    
+    keywords = PERSONALITY_MATCHER.match(description.lower(), 'personality')
     return keywords[:5]  # 최대 5개
 
 def get_communication_advice(style: str) -> str:
@@ -1,14 +1,19 @@
 import json
-import boto3
 import os
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
-# AWS 서비스 클라이언트
-dsql_client = boto3.client('dsql')
+from chat_room_store import create_room_store_from_env
+from ids import new_id
 
-# 임시 메모리 저장소 (실제 프로덕션에서는 DSQL 사용)
-CHAT_ROOMS = {}
+# 대화방 저장소 (웜 컨테이너 간 연결 재사용, 모든 인스턴스가 같은 DB 공유)
+room_store = create_room_store_from_env()
+
+# 목록 페이지 크기
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+# 일괄 업데이트 최대 건수
+MAX_BATCH_UPDATES = 100
 
 def lambda_handler(event, context):
     """대화방 관리 Lambda 함수"""
@@ -18,7 +23,8 @@ def lambda_handler(event, context):
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*',
             'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type, Authorization'
+            'Access-Control-Allow-Headers': 'Content-Type, Authorization, If-Match',
+            'Access-Control-Expose-Headers': 'ETag'
         }
         
         # OPTIONS 요청 처리
@@ -57,7 +63,9 @@ def lambda_handler(event, context):
 def get_chat_rooms(event, headers):
     """사용자의 대화방 목록 조회"""
     try:
-        user_id = event.get('queryStringParameters', {}).get('user_id')
+        query_params = event.get('queryStringParameters', {}) or {}
+        user_id = query_params.get('user_id')
+        limit = min(max(int(query_params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
         if not user_id:
             return {
                 'statusCode': 400,
@@ -67,16 +75,22 @@ def get_chat_rooms(event, headers):
         
         print(f"Getting chat rooms for user: {user_id}")
         
-        # 사용자의 채팅방 목록 반환
-        user_rooms = [room for room in CHAT_ROOMS.values() if room.get('user_id') == user_id]
-        rooms = sorted(user_rooms, key=lambda x: x.get('updated_at', ''), reverse=True)
+        # 사용자의 채팅방 목록 반환 (user_id, updated_at 인덱스 순서 그대로)
+        try:
+            page = room_store.list_rooms(user_id, limit, query_params.get('cursor'))
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': 'Invalid cursor'})
+            }
         
-        print(f"Found {len(rooms)} rooms for user {user_id}")
+        print(f"Found {len(page['rooms'])} rooms for user {user_id}")
         
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps({'rooms': rooms})
+            'body': json.dumps(page)
         }
         
     except Exception as e:
@@ -102,26 +116,20 @@ def create_chat_room(event, headers):
                 }
         
         # 대화방 ID 생성
-        room_id = f"room_{int(datetime.now().timestamp())}_{body['partner_name']}"
+        room_id = new_id('room')
         
         # 대화방 데이터 생성
-        room_data = {
-            'id': room_id,
+        room_data = room_store.create_room({
+            'room_id': room_id,
             'user_id': body['user_id'],
             'name': f"{body['partner_name']}와의 대화",
             'partner_name': body['partner_name'],
             'partner_relationship': body['partner_relationship'],
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat(),
             'message_count': 0,
             'last_message': '새로운 대화가 시작되었습니다.'
-        }
+        })
         
-        # 메모리에 저장 (실제 프로덕션에서는 DSQL 사용)
-        CHAT_ROOMS[room_id] = room_data
-        
-        print(f"Chat room created successfully: {room_data}")
-        print(f"Total chat rooms: {len(CHAT_ROOMS)}")
+        print(f"Chat room created successfully: {room_id}")
         
         return {
             'statusCode': 201,
@@ -141,33 +149,42 @@ def create_chat_room(event, headers):
         }
 
 def update_chat_room(event, headers):
-    """대화방 정보 업데이트"""
+    """대화방 정보 업데이트 (단건 또는 updates 배열로 여러 대화방 일괄 처리)"""
     try:
         body = json.loads(event.get('body', '{}'))
-        room_id = body.get('room_id')
         
-        if not room_id:
+        # 일괄 업데이트: 항목별 결과 반환 (한 항목 실패가 다른 항목에 영향 없음)
+        if isinstance(body.get('updates'), list):
+            if len(body['updates']) > MAX_BATCH_UPDATES:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({'error': f'Too many updates (max {MAX_BATCH_UPDATES})'})
+                }
+            results = [apply_room_update(item if isinstance(item, dict) else {}) for item in body['updates']]
             return {
-                'statusCode': 400,
+                'statusCode': 200,
                 'headers': headers,
-                'body': json.dumps({'error': 'room_id is required'})
+                'body': json.dumps({'results': results})
             }
         
-        # 메모리에서 업데이트
-        if room_id in CHAT_ROOMS:
-            if 'last_message' in body:
-                CHAT_ROOMS[room_id]['last_message'] = body['last_message']
-            if 'message_count' in body:
-                CHAT_ROOMS[room_id]['message_count'] = body['message_count']
-            CHAT_ROOMS[room_id]['updated_at'] = datetime.now().isoformat()
-            print(f"Updated chat room: {room_id}")
-        else:
-            print(f"Chat room not found: {room_id}")
+        # 단건 업데이트: If-Match 헤더(또는 version)로 버전 확인
+        request_headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+        if request_headers.get('if-match') and 'version' not in body:
+            body['version'] = parse_etag(request_headers['if-match'])
+        
+        result = apply_room_update(body)
+        status = result.pop('status')
+        response_headers = dict(headers)
+        if result.get('room'):
+            response_headers['ETag'] = format_etag(result['room']['version'])
+        if status == 200:
+            result['message'] = 'Chat room updated successfully'
         
         return {
-            'statusCode': 200,
-            'headers': headers,
-            'body': json.dumps({'message': 'Chat room updated successfully'})
+            'statusCode': status,
+            'headers': response_headers,
+            'body': json.dumps(result)
         }
         
     except Exception as e:
@@ -178,6 +195,52 @@ def update_chat_room(event, headers):
             'body': json.dumps({'error': str(e)})
         }
 
+def apply_room_update(update: Dict[str, Any]) -> Dict[str, Any]:
+    """대화방 하나 업데이트 후 결과 반환 (status: 200/400/404/412)"""
+    room_id = update.get('room_id')
+    if not room_id:
+        return {'room_id': room_id, 'status': 400, 'error': 'room_id is required'}
+    
+    increment = update.get('increment_message_count', 0)
+    if not isinstance(increment, int) or increment < 0:
+        return {'room_id': room_id, 'status': 400, 'error': 'increment_message_count must be a non-negative integer'}
+    if increment and 'message_count' in update:
+        return {'room_id': room_id, 'status': 400,
+                'error': 'Use either message_count or increment_message_count'}
+    message_count = update.get('message_count', 0)
+    if not isinstance(message_count, int) or isinstance(message_count, bool) or message_count < 0:
+        return {'room_id': room_id, 'status': 400, 'error': 'message_count must be a non-negative integer'}
+    
+    expected_version = update.get('version')
+    if expected_version is not None and not isinstance(expected_version, int):
+        return {'room_id': room_id, 'status': 400, 'error': 'version must be an integer'}
+    
+    fields = {field: update[field] for field in ('last_message', 'message_count') if field in update}
+    outcome, room = room_store.update_room(room_id, fields, increment, expected_version)
+    
+    if outcome == 'not_found':
+        print(f"Chat room not found: {room_id}")
+        return {'room_id': room_id, 'status': 404, 'error': 'Chat room not found'}
+    if outcome == 'conflict':
+        print(f"Chat room version conflict: {room_id} (expected {expected_version}, current {room['version']})")
+        return {'room_id': room_id, 'status': 412, 'error': 'Version mismatch', 'room': room}
+    
+    print(f"Updated chat room: {room_id}")
+    return {'room_id': room_id, 'status': 200, 'room': room}
+
+def parse_etag(value: str) -> Optional[int]:
+    """If-Match 값("3", W/"3")을 버전 번호로 변환"""
+    value = value.strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        return -1  # 어떤 버전과도 일치하지 않음
+
+def format_etag(version: int) -> str:
+    return f'"{version}"'
+
 def delete_chat_room(event, headers):
     """대화방 삭제"""
     try:
@@ -191,13 +254,16 @@ def delete_chat_room(event, headers):
                 'body': json.dumps({'error': 'room_id is required'})
             }
         
-        # 메모리에서 삭제
-        if room_id in CHAT_ROOMS:
-            del CHAT_ROOMS[room_id]
-            print(f"Deleted chat room: {room_id}")
-        else:
+        # 저장소에서 삭제
+        if not room_store.delete_room(room_id):
             print(f"Chat room not found: {room_id}")
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': json.dumps({'error': 'Chat room not found'})
+            }
         
+        print(f"Deleted chat room: {room_id}")
         return {
             'statusCode': 200,
             'headers': headers,
@@ -0,0 +1,169 @@
+import base64
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+import dsql
+
+# 저장소 설정: dsql(기본) 또는 sqlite:///<경로> (로컬 테스트용, sqlite:///:memory: 가능)
+CHAT_ROOM_STORE = os.environ.get('CHAT_ROOM_STORE', 'dsql')
+
+ROOM_COLUMNS = [
+    'room_id', 'user_id', 'name', 'partner_name', 'partner_relationship',
+    'message_count', 'last_message', 'version', 'created_at', 'updated_at'
+]
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_rooms (
+    room_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    name TEXT,
+    partner_name TEXT,
+    partner_relationship TEXT,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    last_message TEXT,
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_rooms_user_updated ON chat_rooms(user_id, updated_at DESC, room_id DESC);
+"""
+
+class DSQLExecutor:
+    """DSQL/PostgreSQL 쿼리 실행 (dsql 모듈의 웜 연결 사용)"""
+
+    def fetch_all(self, sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return dsql.fetch_all(sql, params)
+
+    def execute(self, sql: str, params: Dict[str, Any]) -> int:
+        return dsql.execute(sql, params)
+
+class SQLiteExecutor:
+    """로컬 SQLite 쿼리 실행 (%(name)s 파라미터를 :name으로 변환)"""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SQLITE_SCHEMA)
+        self._lock = threading.Lock()
+
+    def fetch_all(self, sql: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(to_sqlite(sql), params).fetchall()]
+
+    def execute(self, sql: str, params: Dict[str, Any]) -> int:
+        with self._lock:
+            return self._conn.execute(to_sqlite(sql), params).rowcount
+
+def to_sqlite(sql: str) -> str:
+    return re.sub(r'%\((\w+)\)s', r':\1', sql)
+
+class ChatRoomStore:
+    """대화방 저장소 (user_id별 updated_at 최신순 인덱스로 목록 조회)"""
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    def list_rooms(self, user_id: str, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """사용자의 대화방을 최신순으로 한 페이지 조회 (다음 페이지는 next_cursor로)"""
+        params = {'user_id': user_id, 'limit': limit + 1}
+        condition = ''
+        if cursor:
+            params['updated_at'], params['room_id'] = decode_cursor(cursor)
+            condition = 'AND (updated_at, room_id) < (%(updated_at)s, %(room_id)s)'
+
+        rows = self.executor.fetch_all(f"""
+            SELECT {', '.join(ROOM_COLUMNS)}
+            FROM chat_rooms
+            WHERE user_id = %(user_id)s {condition}
+            ORDER BY updated_at DESC, room_id DESC
+            LIMIT %(limit)s
+        """, params)
+
+        rooms = [format_room(row) for row in rows[:limit]]
+        has_more = len(rows) > limit
+        return {
+            'rooms': rooms,
+            'has_more': has_more,
+            'next_cursor': encode_cursor(rows[limit - 1]) if has_more else None
+        }
+
+    def get_room(self, room_id: str) -> Optional[Dict[str, Any]]:
+        rows = self.executor.fetch_all(
+            f"SELECT {', '.join(ROOM_COLUMNS)} FROM chat_rooms WHERE room_id = %(room_id)s",
+            {'room_id': room_id}
+        )
+        return format_room(rows[0]) if rows else None
+
+    def create_room(self, room: Dict[str, Any]) -> Dict[str, Any]:
+        now = current_timestamp()
+        row = {**room, 'version': 1, 'created_at': now, 'updated_at': now}
+        self.executor.execute(f"""
+            INSERT INTO chat_rooms ({', '.join(ROOM_COLUMNS)})
+            VALUES ({', '.join(f'%({column})s' for column in ROOM_COLUMNS)})
+        """, row)
+        return format_room(row)
+
+    def update_room(self, room_id: str, fields: Dict[str, Any], increment: int = 0,
+                    expected_version: Optional[int] = None) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """필드 갱신 + message_count 원자적 증가 (expected_version이 있으면 버전이 같을 때만)"""
+        # 반환: ('updated', 갱신된 대화방) / ('conflict', 현재 대화방) / ('not_found', None)
+        params = {**fields, 'room_id': room_id, 'increment': increment,
+                  'expected_version': expected_version, 'updated_at': current_timestamp()}
+        set_clauses = [f"{field} = %({field})s" for field in fields]
+        if increment:
+            set_clauses.append('message_count = message_count + %(increment)s')
+        set_clauses += ['version = version + 1', 'updated_at = %(updated_at)s']
+        condition = 'AND version = %(expected_version)s' if expected_version is not None else ''
+
+        rows = self.executor.fetch_all(f"""
+            UPDATE chat_rooms SET {', '.join(set_clauses)}
+            WHERE room_id = %(room_id)s {condition}
+            RETURNING {', '.join(ROOM_COLUMNS)}
+        """, params)
+        if rows:
+            return 'updated', format_room(rows[0])
+
+        # 갱신된 행이 없으면 버전 불일치인지 없는 대화방인지 구분
+        current = self.get_room(room_id)
+        return ('conflict', current) if current else ('not_found', None)
+
+    def delete_room(self, room_id: str) -> bool:
+        return self.executor.execute(
+            "DELETE FROM chat_rooms WHERE room_id = %(room_id)s", {'room_id': room_id}
+        ) > 0
+
+def format_room(row: Dict[str, Any]) -> Dict[str, Any]:
+    """저장된 행을 기존 API 응답 형태로 변환 (id = room_id)"""
+    room = {column: row[column] for column in ROOM_COLUMNS}
+    room['id'] = room.pop('room_id')
+    return room
+
+def current_timestamp() -> str:
+    # 문자열 비교로도 순서가 맞도록 마이크로초까지 고정 길이로 기록
+    return datetime.now().isoformat(timespec='microseconds')
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """마지막 행의 (updated_at, room_id)를 불투명한 cursor 문자열로 인코딩"""
+    raw = json.dumps([row['updated_at'], row['room_id']], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str):
+    """cursor 문자열을 (updated_at, room_id)로 디코딩 (형식이 잘못되면 ValueError)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        updated_at, room_id = json.loads(raw)
+        datetime.fromisoformat(updated_at)
+        return updated_at, str(room_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def create_room_store_from_env() -> ChatRoomStore:
+    """환경 변수 설정으로 저장소 생성 (CHAT_ROOM_STORE=sqlite:///<경로> 이면 SQLite)"""
+    if CHAT_ROOM_STORE.startswith('sqlite:///'):
+        return ChatRoomStore(SQLiteExecutor(CHAT_ROOM_STORE[len('sqlite:///'):]))
+    return ChatRoomStore(DSQLExecutor())
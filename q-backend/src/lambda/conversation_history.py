@@ -1,12 +1,29 @@
+import base64
 import json
-import boto3
 import os
-import uuid
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
-# AWS 서비스 클라이언트
-dsql_client = boto3.client('dsql')
+import dsql
+import dashboard_summary
+from ids import new_id
+import usage_stats_buffer
+
+# 페이지 크기 제한
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# 일괄 저장 최대 건수
+MAX_BATCH_SIZE = int(os.environ.get('CONVERSATION_BATCH_MAX', '100'))
+
+# 피드백으로 갱신할 수 있는 대화 필드
+FEEDBACK_FIELDS = ['feedback_rating', 'selected_response_type', 'selected_response', 'feedback_comment']
+
+# 대화 기록 컬럼 (저장 순서)
+CONVERSATION_COLUMNS = [
+    'user_id', 'session_id', 'partner_name', 'partner_relationship',
+    'context_text', 'user_message', 'ai_responses', 'selected_response_type',
+    'selected_response', 'feedback_rating', 'feedback_comment', 'created_at'
+]
 
 def lambda_handler(event, context):
     """대화 기록 저장 및 조회 Lambda 함수"""
@@ -31,6 +48,11 @@ def lambda_handler(event, context):
         http_method = event.get('httpMethod', 'POST')
         
         if http_method == 'POST':
+            body = json.loads(event.get('body') or '{}')
+            if isinstance(body.get('conversations'), list):
+                return save_conversations_batch(body['conversations'], headers)
+            if body.get('action') == 'feedback':
+                return save_feedback(body, headers)
             return save_conversation(event, headers)
         elif http_method == 'GET':
             return get_conversation_history(event, headers)
@@ -56,36 +78,20 @@ def save_conversation(event, headers) -> Dict[str, Any]:
         body = json.loads(event.get('body', '{}'))
         
         # 필수 필드 검증
-        required_fields = ['user_id', 'user_message', 'ai_responses']
-        for field in required_fields:
-            if not body.get(field):
-                return {
-                    'statusCode': 400,
-                    'headers': headers,
-                    'body': json.dumps({'error': f'Missing required field: {field}'})
-                }
+        missing_field = find_missing_field(body)
+        if missing_field:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': f'Missing required field: {missing_field}'})
+            }
         
         # 대화 기록 데이터 구성
-        conversation_data = {
-            'user_id': body['user_id'],
-            'session_id': body.get('session_id', f"session_{uuid.uuid4().hex[:8]}"),
-            'partner_name': body.get('partner_name', ''),
-            'partner_relationship': body.get('partner_relationship', ''),
-            'context_text': body.get('context_text', ''),
-            'user_message': body['user_message'],
-            'ai_responses': json.dumps(body['ai_responses']),  # JSON으로 저장
-            'selected_response_type': body.get('selected_response_type'),
-            'selected_response': body.get('selected_response'),
-            'feedback_rating': body.get('feedback_rating'),
-            'feedback_comment': body.get('feedback_comment', '')
-        }
+        conversation_data = build_conversation_data(body)
         
-        # DSQL에 저장
+        # DSQL에 저장 (사용 통계 증분도 같은 트랜잭션에서 기록)
         conversation_id = save_to_dsql(conversation_data)
         
-        # 사용 통계 업데이트
-        update_usage_stats(body['user_id'])
-        
         return {
             'statusCode': 200,
             'headers': headers,
@@ -103,14 +109,140 @@ def save_conversation(event, headers) -> Dict[str, Any]:
             'body': json.dumps({'error': str(e)})
         }
 
+def save_feedback(body: Dict[str, Any], headers) -> Dict[str, Any]:
+    """저장된 대화에 피드백(평점/선택 답변) 기록"""
+    try:
+        if not body.get('user_id') or not body.get('conversation_id'):
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': 'user_id and conversation_id are required'})
+            }
+        
+        rating = body.get('feedback_rating')
+        if rating is not None and (not isinstance(rating, int) or not 1 <= rating <= 5):
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': 'feedback_rating must be an integer between 1 and 5'})
+            }
+        
+        feedback = {field: body[field] for field in FEEDBACK_FIELDS if field in body}
+        if not save_feedback_to_dsql(body['user_id'], int(body['conversation_id']), feedback):
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': json.dumps({'error': 'Conversation not found'})
+            }
+        
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': json.dumps({
+                'conversation_id': int(body['conversation_id']),
+                'message': 'Feedback saved successfully'
+            })
+        }
+        
+    except Exception as e:
+        print(f"Save feedback error: {e}")
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'error': str(e)})
+        }
+
+def save_conversations_batch(items: List[Any], headers) -> Dict[str, Any]:
+    """대화 기록 일괄 저장 (오프라인 기록 동기화용, 한 트랜잭션에서 multi-row INSERT)"""
+    try:
+        if len(items) > MAX_BATCH_SIZE:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': f'Too many conversations (max {MAX_BATCH_SIZE})'})
+            }
+        
+        # 항목별 검증 (잘못된 항목은 건너뛰고 오류로 보고)
+        results = [None] * len(items)
+        valid = []  # (index, conversation_data)
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = {'index': index, 'error': 'Conversation must be an object'}
+                continue
+            missing_field = find_missing_field(item)
+            if missing_field:
+                results[index] = {'index': index, 'error': f'Missing required field: {missing_field}'}
+                continue
+            try:
+                valid.append((index, build_conversation_data(item)))
+            except ValueError as e:
+                results[index] = {'index': index, 'error': str(e)}
+        
+        if valid:
+            conversation_ids = save_batch_to_dsql([data for _, data in valid])
+            for (index, _), conversation_id in zip(valid, conversation_ids):
+                results[index] = {'index': index, 'conversation_id': conversation_id}
+        
+        saved_count = len(valid)
+        return {
+            'statusCode': 200 if saved_count == len(items) else 207,
+            'headers': headers,
+            'body': json.dumps({
+                'results': results,
+                'saved_count': saved_count,
+                'error_count': len(items) - saved_count
+            })
+        }
+        
+    except Exception as e:
+        print(f"Save conversations batch error: {e}")
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'error': str(e)})
+        }
+
+def find_missing_field(body: Dict[str, Any]) -> Optional[str]:
+    """필수 필드 중 비어 있는 첫 필드 (모두 있으면 None)"""
+    for field in ['user_id', 'user_message', 'ai_responses']:
+        if not body.get(field):
+            return field
+    return None
+
+def build_conversation_data(body: Dict[str, Any]) -> Dict[str, Any]:
+    """요청 본문을 conversations 행 데이터로 변환 (created_at 없으면 저장 시각)"""
+    created_at = body.get('created_at')
+    if created_at:
+        try:
+            datetime.fromisoformat(str(created_at).replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"Invalid created_at: {created_at}")
+    
+    return {
+        'user_id': body['user_id'],
+        'session_id': body.get('session_id', new_id('session')),
+        'partner_name': body.get('partner_name', ''),
+        'partner_relationship': body.get('partner_relationship', ''),
+        'context_text': body.get('context_text', ''),
+        'user_message': body['user_message'],
+        'ai_responses': json.dumps(body['ai_responses']),  # JSON으로 저장
+        'selected_response_type': body.get('selected_response_type'),
+        'selected_response': body.get('selected_response'),
+        'feedback_rating': body.get('feedback_rating'),
+        'feedback_comment': body.get('feedback_comment', ''),
+        'created_at': created_at
+    }
+
 def get_conversation_history(event, headers) -> Dict[str, Any]:
-    """대화 기록 조회"""
+    """대화 기록 조회 (cursor 기반 페이지네이션, offset은 하위 호환용)"""
     try:
         # 쿼리 파라미터 추출
         query_params = event.get('queryStringParameters', {}) or {}
         user_id = query_params.get('user_id')
-        limit = int(query_params.get('limit', 20))
+        limit = min(max(int(query_params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
         offset = int(query_params.get('offset', 0))
+        cursor = query_params.get('cursor')
+        include_count = str(query_params.get('include_count', 'false')).lower() == 'true'
         
         if not user_id:
             return {
@@ -119,18 +251,38 @@ def get_conversation_history(event, headers) -> Dict[str, Any]:
                 'body': json.dumps({'error': 'user_id is required'})
             }
         
-        # DSQL에서 조회
-        conversations = get_from_dsql(user_id, limit, offset)
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': 'Invalid cursor'})
+            }
+        
+        # DSQL에서 조회 (다음 페이지 존재 여부 확인을 위해 1개 더 조회)
+        if offset and not after:
+            rows = get_from_dsql(user_id, limit + 1, offset)
+        else:
+            rows = get_page_from_dsql(user_id, limit + 1, after)
+        conversations = rows[:limit]
+        has_more = len(rows) > limit
+        
+        result = {
+            'conversations': conversations,
+            'limit': limit,
+            'has_more': has_more,
+            'next_cursor': encode_cursor(conversations[-1]) if has_more else None
+        }
+        if offset and not after:
+            result['offset'] = offset
+        if include_count:
+            result['total_count'] = count_conversations(user_id)
         
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps({
-                'conversations': conversations,
-                'total_count': len(conversations),
-                'limit': limit,
-                'offset': offset
-            })
+            'body': json.dumps(result)
         }
         
     except Exception as e:
@@ -141,12 +293,25 @@ def get_conversation_history(event, headers) -> Dict[str, Any]:
             'body': json.dumps({'error': str(e)})
         }
 
+def encode_cursor(conversation: Dict[str, Any]) -> str:
+    """마지막 행의 (created_at, conversation_id)를 불투명한 cursor 문자열로 인코딩"""
+    raw = json.dumps([conversation['created_at'], conversation['conversation_id']])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """cursor 문자열을 (created_at, conversation_id)로 디코딩 (형식이 잘못되면 ValueError)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, conversation_id = json.loads(raw)
+        datetime.fromisoformat(created_at)
+        return {'created_at': created_at, 'conversation_id': int(conversation_id)}
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 def save_to_dsql(conversation_data: Dict[str, Any]) -> int:
     """DSQL에 대화 기록 저장"""
     try:
-        cluster_arn = os.environ.get('DSQL_CLUSTER_ARN')
-        
-        if not cluster_arn:
+        if not dsql.is_configured():
             raise ValueError("DSQL_CLUSTER_ARN not configured")
         
         # SQL 쿼리 구성
@@ -158,26 +323,60 @@ def save_to_dsql(conversation_data: Dict[str, Any]) -> int:
         ) VALUES (
             %(user_id)s, %(session_id)s, %(partner_name)s, %(partner_relationship)s,
             %(context_text)s, %(user_message)s, %(ai_responses)s, %(selected_response_type)s,
-            %(selected_response)s, %(feedback_rating)s, %(feedback_comment)s, NOW()
+            %(selected_response)s, %(feedback_rating)s, %(feedback_comment)s, COALESCE(%(created_at)s, NOW())
         ) RETURNING conversation_id
         """
         
-        # 실제 운영환경에서는 DSQL 클라이언트 사용
-        # 현재는 시뮬레이션
-        conversation_id = simulate_dsql_insert(conversation_data)
-        
-        return conversation_id
+        # 대시보드 요약과 사용 통계 증분도 같은 트랜잭션에서 기록
+        with dsql.transaction() as tx:
+            row = tx.fetch_one(sql, conversation_data)
+            dashboard_summary.apply_delta(
+                tx, conversation_data['user_id'], dashboard_summary.conversation_delta(conversation_data)
+            )
+            usage_stats_buffer.append_deltas(tx, usage_stats_buffer.group_conversations([conversation_data]))
+        return row['conversation_id']
         
     except Exception as e:
         print(f"DSQL save error: {e}")
         raise
 
+def save_feedback_to_dsql(user_id: str, conversation_id: int, feedback: Dict[str, Any]) -> bool:
+    """피드백 저장과 대시보드 요약 갱신을 한 트랜잭션으로 처리 (대화가 없으면 False)"""
+    try:
+        if not dsql.is_configured():
+            raise ValueError("DSQL_CLUSTER_ARN not configured")
+        if not feedback:
+            return True
+        
+        params = {**feedback, 'user_id': user_id, 'conversation_id': conversation_id}
+        set_clauses = [f"{field} = %({field})s" for field in feedback]
+        
+        with dsql.transaction() as tx:
+            old = tx.fetch_one("""
+                SELECT feedback_rating, selected_response_type
+                FROM conversations
+                WHERE conversation_id = %(conversation_id)s AND user_id = %(user_id)s
+                FOR UPDATE
+            """, params)
+            if old is None:
+                return False
+            
+            tx.execute(f"""
+                UPDATE conversations SET {', '.join(set_clauses)}
+                WHERE conversation_id = %(conversation_id)s AND user_id = %(user_id)s
+            """, params)
+            dashboard_summary.apply_delta(tx, user_id, dashboard_summary.feedback_delta(old, {**old, **feedback}))
+        
+        return True
+        
+    except Exception as e:
+        print(f"DSQL feedback save error: {e}")
+        raise
+
 def get_from_dsql(user_id: str, limit: int, offset: int) -> List[Dict[str, Any]]:
     """DSQL에서 대화 기록 조회"""
     try:
-        cluster_arn = os.environ.get('DSQL_CLUSTER_ARN')
-        
-        if not cluster_arn:
+        if not dsql.is_configured():
             raise ValueError("DSQL_CLUSTER_ARN not configured")
         
         # SQL 쿼리 구성
@@ -188,98 +387,119 @@ def get_from_dsql(user_id: str, limit: int, offset: int) -> List[Dict[str, Any]]
             selected_response, feedback_rating, feedback_comment, created_at
         FROM conversations 
         WHERE user_id = %(user_id)s 
-        ORDER BY created_at DESC 
+        ORDER BY created_at DESC, conversation_id DESC
         LIMIT %(limit)s OFFSET %(offset)s
         """
         
-        # 실제 운영환경에서는 DSQL 클라이언트 사용
-        # 현재는 시뮬레이션
-        conversations = simulate_dsql_select(user_id, limit, offset)
-        
-        return conversations
+        return dsql.fetch_all(sql, {'user_id': user_id, 'limit': limit, 'offset': offset})
         
     except Exception as e:
         print(f"DSQL get error: {e}")
         raise
 
-def update_usage_stats(user_id: str):
-    """사용 통계 업데이트"""
+def save_batch_to_dsql(conversations: List[Dict[str, Any]]) -> List[int]:
+    """여러 대화 기록을 한 트랜잭션에서 저장하고 입력 순서대로 conversation_id 반환"""
     try:
-        # 오늘 날짜의 통계 업데이트
-        today = datetime.now().date().isoformat()
+        if not dsql.is_configured():
+            raise ValueError("DSQL_CLUSTER_ARN not configured")
         
-        # UPSERT 쿼리 (있으면 업데이트, 없으면 삽입)
-        sql = """
-        INSERT INTO usage_stats (user_id, date, conversations_count, responses_generated, created_at)
-        VALUES (%(user_id)s, %(date)s, 1, 3, NOW())
-        ON CONFLICT (user_id, date) 
-        DO UPDATE SET 
-            conversations_count = usage_stats.conversations_count + 1,
-            responses_generated = usage_stats.responses_generated + 3
-        """
+        # 대시보드 요약은 사용자별로 합쳐 같은 트랜잭션에서 갱신
+        deltas = {}
+        for conversation in conversations:
+            deltas.setdefault(conversation['user_id'], []).append(dashboard_summary.conversation_delta(conversation))
         
-        # 실제 운영환경에서는 DSQL 실행
-        print(f"Updated usage stats for user {user_id} on {today}")
+        with dsql.transaction() as tx:
+            # multi-row INSERT의 RETURNING 순서는 보장되지 않으므로 ID를 먼저 받아 입력 순서대로 지정
+            allocated = tx.fetch_all("""
+                SELECT nextval(pg_get_serial_sequence('conversations', 'conversation_id')) AS conversation_id
+                FROM generate_series(1, %(count)s)
+            """, {'count': len(conversations)})
+            conversation_ids = sorted(row['conversation_id'] for row in allocated)
+            
+            # 행마다 번호를 붙인 파라미터로 multi-row VALUES 구성
+            params = {}
+            rows = []
+            for index, (conversation_id, conversation) in enumerate(zip(conversation_ids, conversations)):
+                params[f"conversation_id_{index}"] = conversation_id
+                placeholders = [f"%(conversation_id_{index})s"]
+                for column in CONVERSATION_COLUMNS:
+                    params[f"{column}_{index}"] = conversation[column]
+                    placeholders.append(f"%({column}_{index})s")
+                placeholders[-1] = f"COALESCE({placeholders[-1]}, NOW())"
+                rows.append(f"({', '.join(placeholders)})")
+            
+            tx.execute(f"""
+                INSERT INTO conversations (conversation_id, {', '.join(CONVERSATION_COLUMNS)})
+                VALUES {', '.join(rows)}
+            """, params)
+            for user_id, user_deltas in deltas.items():
+                dashboard_summary.apply_delta(tx, user_id, dashboard_summary.merge_deltas(user_deltas))
+            # 사용 통계 증분은 (user_id, 날짜)별로 묶어 한 번에 기록
+            usage_stats_buffer.append_deltas(tx, usage_stats_buffer.group_conversations(conversations))
+        
+        return conversation_ids
         
     except Exception as e:
-        print(f"Usage stats update error: {e}")
+        print(f"DSQL batch save error: {e}")
+        raise
 
-def simulate_dsql_insert(data: Dict[str, Any]) -> int:
-    """DSQL INSERT 시뮬레이션 (개발용)"""
-    # 실제로는 DSQL 클라이언트로 실행
-    conversation_id = hash(f"{data['user_id']}_{datetime.now().isoformat()}") % 1000000
-    print(f"Simulated DSQL INSERT: conversation_id = {conversation_id}")
-    return conversation_id
+def get_page_from_dsql(user_id: str, limit: int, after: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """DSQL에서 cursor 이후 대화 기록 조회 (idx_conversations_user_created 인덱스 범위 스캔)"""
+    try:
+        if not dsql.is_configured():
+            raise ValueError("DSQL_CLUSTER_ARN not configured")
+        
+        # 깊은 페이지도 첫 페이지와 같은 비용이 들도록 OFFSET 대신 (created_at, conversation_id) 비교
+        columns = """
+            conversation_id, session_id, partner_name, partner_relationship,
+            context_text, user_message, ai_responses, selected_response_type,
+            selected_response, feedback_rating, feedback_comment, created_at
+        """
+        if after:
+            sql = f"""
+            SELECT {columns}
+            FROM conversations
+            WHERE user_id = %(user_id)s
+              AND (created_at, conversation_id) < (%(created_at)s, %(conversation_id)s)
+            ORDER BY created_at DESC, conversation_id DESC
+            LIMIT %(limit)s
+            """
+            params = {'user_id': user_id, 'limit': limit, **after}
+        else:
+            sql = f"""
+            SELECT {columns}
+            FROM conversations
+            WHERE user_id = %(user_id)s
+            ORDER BY created_at DESC, conversation_id DESC
+            LIMIT %(limit)s
+            """
+            params = {'user_id': user_id, 'limit': limit}
+        
+        return dsql.fetch_all(sql, params)
+        
+    except Exception as e:
+        print(f"DSQL page error: {e}")
+        raise
 
-def simulate_dsql_select(user_id: str, limit: int, offset: int) -> List[Dict[str, Any]]:
-    """DSQL SELECT 시뮬레이션 (개발용)"""
-    # 실제로는 DSQL 클라이언트로 실행
-    sample_conversations = [
-        {
-            'conversation_id': 1,
-            'session_id': 'session_123',
-            'partner_name': '민수',
-            'partner_relationship': '썸',
-            'context_text': '영화 얘기를 하고 있었음',
-            'user_message': '영화 보자고 했는데 뭐라고 답할까?',
-            'ai_responses': json.dumps([
-                {'type': '안전형', 'message': '좋아! 언제 볼까?'},
-                {'type': '표준형', 'message': '오 좋은데? 어떤 영화?'},
-                {'type': '대담형', 'message': '완전 좋아! 같이 보자 😍'}
-            ]),
-            'selected_response_type': '표준형',
-            'selected_response': '오 좋은데? 어떤 영화?',
-            'feedback_rating': 4,
-            'feedback_comment': '좋은 답변이었어요',
-            'created_at': datetime.now().isoformat()
-        }
-    ]
-    
-    print(f"Simulated DSQL SELECT: {len(sample_conversations)} conversations for user {user_id}")
-    return sample_conversations[:limit]
+def count_conversations(user_id: str) -> int:
+    """사용자의 전체 대화 수 (대시보드 요약 행에서 읽어 대화 수와 무관한 비용)"""
+    try:
+        row = dsql.fetch_one(
+            "SELECT total_conversations FROM user_dashboard_summary WHERE user_id = %(user_id)s",
+            {'user_id': user_id}
+        )
+        return int(row['total_conversations']) if row else 0
+        
+    except Exception as e:
+        print(f"DSQL count error: {e}")
+        raise
 
 def get_user_dashboard_data(user_id: str) -> Dict[str, Any]:
     """사용자 대시보드 데이터 조회"""
     try:
-        # 사용자 통계 조회
-        sql = """
-        SELECT * FROM user_dashboard WHERE user_id = %(user_id)s
-        """
-        
-        # 실제로는 DSQL에서 조회
-        dashboard_data = {
-            'user_id': user_id,
-            'total_conversations': 15,
-            'today_conversations': 3,
-            'avg_response_rating': 4.2,
-            'overall_success_rate': 0.85,
-            'credits_remaining': 7,
-            'speech_style': 'casual',
-            'favorite_response_type': '표준형'
-        }
-        
-        return dashboard_data
+        # 사용자별 요약 테이블에서 조회
+        return dashboard_summary.get_summary(user_id)
         
     except Exception as e:
         print(f"Dashboard data error: {e}")
-        return {}
\ No newline at end of file
+        return {}
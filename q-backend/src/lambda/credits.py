@@ -0,0 +1,184 @@
+import json
+import os
+import uuid
+from typing import Dict, List, Any, Optional
+
+import dsql
+
+# 예약 후 이 시간(초) 안에 확정/취소되지 않으면 만료로 보고 반환 (Lambda 비정상 종료 대비)
+# Lambda 최대 실행 시간(900초)보다 길어야 실행 중인 요청의 예약을 다른 요청이 반환하지 않음
+RESERVATION_TTL_SECONDS = int(os.environ.get('CREDIT_RESERVATION_TTL', '1800'))
+# true(기본)면 인증된 사용자 없이 답변 생성 불가 (로컬 개발에서만 false)
+CREDITS_REQUIRED = os.environ.get('CREDITS_REQUIRED', 'true').lower() == 'true'
+
+class InsufficientCreditsError(Exception):
+    """크레딧 부족으로 예약 실패"""
+
+class DuplicateRequestError(Exception):
+    """같은 멱등 키의 요청이 처리 중이거나 다른 사용자가 사용한 키"""
+
+class _ReservationRejected(Exception):
+    """트랜잭션 롤백용 (잔액 부족)"""
+
+def reserve(user_id: str, amount: int = 1, idempotency_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """크레딧 예약 (잔액 조건부 UPDATE 한 번으로 차감, 확정된 키로 다시 호출하면 기존 예약 반환, 부족하면 None)"""
+    reservation_id = idempotency_key or uuid.uuid4().hex
+    release_expired(user_id)
+
+    try:
+        with dsql.transaction() as tx:
+            inserted = tx.fetch_one("""
+                INSERT INTO credit_reservations (reservation_id, user_id, amount, status, created_at, expires_at)
+                VALUES (%(reservation_id)s, %(user_id)s, %(amount)s, 'reserved', NOW(),
+                        NOW() + %(ttl)s * INTERVAL '1 second')
+                ON CONFLICT (reservation_id) DO NOTHING
+                RETURNING reservation_id
+            """, {'reservation_id': reservation_id, 'user_id': user_id, 'amount': amount,
+                  'ttl': RESERVATION_TTL_SECONDS})
+
+            if inserted is None:
+                # 이미 처리된 요청 (재시도) - 예약 중이거나 확정된 예약은 다시 차감하지 않음
+                existing = tx.fetch_one("""
+                    SELECT reservation_id, user_id, amount, status, response
+                    FROM credit_reservations
+                    WHERE reservation_id = %(reservation_id)s
+                    FOR UPDATE
+                """, {'reservation_id': reservation_id})
+                if existing['user_id'] != user_id:
+                    raise DuplicateRequestError(f"Idempotency key already used: {reservation_id}")
+                if existing['status'] == 'reserved':
+                    # 같은 키의 요청이 아직 모델을 호출 중 (만료되면 반환 후 재예약 가능)
+                    raise DuplicateRequestError(f"Request already in progress: {reservation_id}")
+                if existing['status'] == 'committed':
+                    # 이미 과금된 요청 - 다시 차감하지 않고 저장된 답변을 돌려줌
+                    return existing
+
+                # 취소된 예약의 재시도는 다시 예약
+                tx.execute("""
+                    UPDATE credit_reservations
+                    SET status = 'reserved', amount = %(amount)s, updated_at = NOW(),
+                        expires_at = NOW() + %(ttl)s * INTERVAL '1 second'
+                    WHERE reservation_id = %(reservation_id)s
+                """, {'reservation_id': reservation_id, 'amount': amount, 'ttl': RESERVATION_TTL_SECONDS})
+
+            # 잔액이 충분할 때만 차감 (동시 요청이 있어도 음수가 되지 않음)
+            balance = tx.fetch_one("""
+                UPDATE user_credits
+                SET credits_remaining = credits_remaining - %(amount)s,
+                    credits_reserved = credits_reserved + %(amount)s,
+                    updated_at = NOW()
+                WHERE user_id = %(user_id)s AND credits_remaining >= %(amount)s
+                RETURNING credits_remaining
+            """, {'user_id': user_id, 'amount': amount})
+            if balance is None:
+                raise _ReservationRejected()
+
+    except _ReservationRejected:
+        print(f"Insufficient credits for user {user_id}")
+        return None
+
+    print(f"Reserved {amount} credits for user {user_id} ({reservation_id})")
+    return {
+        'reservation_id': reservation_id,
+        'user_id': user_id,
+        'amount': amount,
+        'status': 'reserved',
+        'credits_remaining': balance['credits_remaining']
+    }
+
+def commit(reservation_id: str, response: Optional[List[Dict[str, Any]]] = None) -> bool:
+    """예약 확정 (사용량으로 기록하고 재시도에 돌려줄 답변 저장, 이미 확정/취소된 예약이면 False)"""
+    return _settle(reservation_id, 'committed', """
+        UPDATE user_credits
+        SET credits_reserved = credits_reserved - %(amount)s,
+            credits_used = credits_used + %(amount)s,
+            updated_at = NOW()
+        WHERE user_id = %(user_id)s
+    """, response)
+
+def release(reservation_id: str) -> bool:
+    """예약 취소 (잔액으로 되돌림, 이미 확정/취소된 예약이면 False)"""
+    return _settle(reservation_id, 'released', """
+        UPDATE user_credits
+        SET credits_reserved = credits_reserved - %(amount)s,
+            credits_remaining = credits_remaining + %(amount)s,
+            updated_at = NOW()
+        WHERE user_id = %(user_id)s
+    """)
+
+def release_expired(user_id: str) -> int:
+    """만료된 예약을 잔액으로 되돌림 (확정/취소 전에 종료된 요청 정리)"""
+    try:
+        expired = dsql.fetch_all("""
+            SELECT reservation_id FROM credit_reservations
+            WHERE user_id = %(user_id)s AND status = 'reserved' AND expires_at < NOW()
+        """, {'user_id': user_id})
+        return sum(release(row['reservation_id']) for row in expired)
+    except Exception as e:
+        print(f"Release expired reservations error: {e}")
+        return 0
+
+def _settle(reservation_id: str, status: str, balance_sql: str,
+            response: Optional[List[Dict[str, Any]]] = None) -> bool:
+    # reserved 상태에서 한 번만 전이되므로 중복 호출해도 잔액이 두 번 바뀌지 않음
+    with dsql.transaction() as tx:
+        reservation = tx.fetch_one("""
+            UPDATE credit_reservations
+            SET status = %(status)s, response = %(response)s::jsonb, updated_at = NOW()
+            WHERE reservation_id = %(reservation_id)s AND status = 'reserved'
+            RETURNING user_id, amount
+        """, {'reservation_id': reservation_id, 'status': status,
+              'response': json.dumps(response, ensure_ascii=False) if response is not None else None})
+        if reservation is None:
+            return False
+        tx.execute(balance_sql, reservation)
+
+    print(f"Credit reservation {reservation_id} {status}")
+    return True
+
+class CreditHold:
+    """답변 생성 한 건의 크레딧 예약 (모델 호출 전 reserve, 성공 시 commit, 실패 시 release)"""
+
+    def __init__(self, user_id: str, amount: int = 1, idempotency_key: Optional[str] = None):
+        self.user_id = user_id
+        self.amount = amount
+        self.idempotency_key = idempotency_key
+        self.reservation = None
+
+    def reserve(self) -> Optional[List[Dict[str, Any]]]:
+        """예약 (부족하면 InsufficientCreditsError, 이미 확정된 요청이면 저장된 답변 반환)"""
+        if self.reservation is None:
+            self.reservation = reserve(self.user_id, self.amount, self.idempotency_key)
+            if self.reservation is None:
+                raise InsufficientCreditsError(f"Insufficient credits for user {self.user_id}")
+
+        if self.reservation['status'] == 'committed':
+            stored = self.reservation.get('response')
+            if isinstance(stored, str):
+                stored = json.loads(stored)
+            if stored is None:
+                raise DuplicateRequestError(f"Request already processed: {self.reservation['reservation_id']}")
+            return stored
+        return None
+
+    def commit(self, response: Optional[List[Dict[str, Any]]] = None):
+        # 확정에 실패해도 응답은 반환 (예약은 만료 후 반환됨)
+        if self.reservation and self.reservation['status'] == 'reserved':
+            try:
+                if commit(self.reservation['reservation_id'], response):
+                    self.reservation['status'] = 'committed'
+                else:
+                    # 만료 정리로 이미 반환된 예약 - 답변은 전달되지만 과금되지 않음
+                    self.reservation['status'] = 'expired'
+                    print(f"Credit reservation expired before commit, response not charged: "
+                          f"{self.reservation['reservation_id']} (user {self.user_id})")
+            except Exception as e:
+                print(f"Credit commit error: {e}")
+
+    def release(self):
+        if self.reservation and self.reservation['status'] == 'reserved':
+            try:
+                release(self.reservation['reservation_id'])
+                self.reservation['status'] = 'released'
+            except Exception as e:
+                print(f"Credit release error: {e}")
@@ -0,0 +1,190 @@
+import json
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import dsql
+
+# 피드백 평점이 이 값 이상이면 성공으로 집계
+SUCCESS_RATING = 4
+DEFAULT_RESPONSE_TYPE = '균형형'
+
+def empty_delta() -> Dict[str, Any]:
+    return {'conversations': 0, 'today': 0, 'rated': 0, 'rating_sum': 0, 'success': 0, 'response_types': {}}
+
+def conversation_delta(conversation: Dict[str, Any], today: Optional[str] = None) -> Dict[str, Any]:
+    """새 대화 한 건이 요약에 더하는 값"""
+    today = today or datetime.now().date().isoformat()
+    created_at = conversation.get('created_at')
+    delta = empty_delta()
+    delta['conversations'] = 1
+    delta['today'] = 1 if not created_at or str(created_at)[:10] == today else 0
+    add_feedback(delta, conversation.get('feedback_rating'), conversation.get('selected_response_type'), 1)
+    return delta
+
+def feedback_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """기존 대화의 피드백/선택 답변 변경이 요약에 주는 차이 (이전 값을 빼고 새 값을 더함)"""
+    delta = empty_delta()
+    add_feedback(delta, old.get('feedback_rating'), old.get('selected_response_type'), -1)
+    add_feedback(delta, new.get('feedback_rating'), new.get('selected_response_type'), 1)
+    return delta
+
+def add_feedback(delta: Dict[str, Any], rating: Optional[int], response_type: Optional[str], sign: int):
+    if rating is not None:
+        delta['rated'] += sign
+        delta['rating_sum'] += sign * int(rating)
+        delta['success'] += sign if int(rating) >= SUCCESS_RATING else 0
+    if response_type:
+        delta['response_types'][response_type] = delta['response_types'].get(response_type, 0) + sign
+
+def merge_deltas(deltas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """같은 사용자의 여러 변경을 하나로 합침"""
+    merged = empty_delta()
+    for delta in deltas:
+        for key in ('conversations', 'today', 'rated', 'rating_sum', 'success'):
+            merged[key] += delta[key]
+        for response_type, count in delta['response_types'].items():
+            merged['response_types'][response_type] = merged['response_types'].get(response_type, 0) + count
+    return merged
+
+def apply_delta(tx, user_id: str, delta: Dict[str, Any]):
+    """user_dashboard_summary 한 행에 변경 반영 (대화 저장/피드백과 같은 트랜잭션에서 호출)"""
+    sql = """
+    INSERT INTO user_dashboard_summary (
+        user_id, total_conversations, rated_conversations, rating_sum, success_count,
+        response_type_counts, activity_date, activity_date_conversations, updated_at
+    ) VALUES (
+        %(user_id)s, %(conversations)s, %(rated)s, %(rating_sum)s, %(success)s,
+        %(response_types)s::jsonb, CURRENT_DATE, %(today)s, NOW()
+    )
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_conversations = user_dashboard_summary.total_conversations + EXCLUDED.total_conversations,
+        rated_conversations = user_dashboard_summary.rated_conversations + EXCLUDED.rated_conversations,
+        rating_sum = user_dashboard_summary.rating_sum + EXCLUDED.rating_sum,
+        success_count = user_dashboard_summary.success_count + EXCLUDED.success_count,
+        response_type_counts = (
+            SELECT COALESCE(jsonb_object_agg(key, total), '{}'::jsonb)
+            FROM (
+                SELECT key, SUM(value::int) AS total
+                FROM (
+                    SELECT * FROM jsonb_each_text(user_dashboard_summary.response_type_counts)
+                    UNION ALL
+                    SELECT * FROM jsonb_each_text(EXCLUDED.response_type_counts)
+                ) counts
+                GROUP BY key
+            ) merged
+        ),
+        activity_date_conversations = CASE
+            WHEN user_dashboard_summary.activity_date = CURRENT_DATE
+            THEN user_dashboard_summary.activity_date_conversations + EXCLUDED.activity_date_conversations
+            ELSE EXCLUDED.activity_date_conversations
+        END,
+        activity_date = CURRENT_DATE,
+        updated_at = NOW()
+    """
+
+    tx.execute(sql, {
+        'user_id': user_id,
+        **{key: delta[key] for key in ('conversations', 'today', 'rated', 'rating_sum', 'success')},
+        'response_types': json.dumps(delta['response_types'], ensure_ascii=False)
+    })
+
+def get_summary(user_id: str) -> Dict[str, Any]:
+    """대시보드 통계 조회 (사용자당 한 행, 대화 수와 무관한 비용)"""
+    row = dsql.fetch_one("""
+        SELECT total_conversations, rated_conversations, rating_sum, success_count,
+               response_type_counts, activity_date = CURRENT_DATE AS is_today, activity_date_conversations
+        FROM user_dashboard_summary
+        WHERE user_id = %(user_id)s
+    """, {'user_id': user_id})
+    return format_summary(row)
+
+def format_summary(row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """요약 행을 기존 user_dashboard 뷰와 같은 필드로 변환"""
+    if not row:
+        return {
+            'total_conversations': 0,
+            'today_conversations': 0,
+            'avg_response_rating': 0,
+            'overall_success_rate': 0,
+            'favorite_response_type': DEFAULT_RESPONSE_TYPE
+        }
+
+    rated = row['rated_conversations']
+    counts = row['response_type_counts'] or {}
+    if isinstance(counts, str):
+        counts = json.loads(counts)
+    counts = {response_type: int(count) for response_type, count in counts.items() if int(count) > 0}
+
+    return {
+        'total_conversations': row['total_conversations'],
+        'today_conversations': row['activity_date_conversations'] if row['is_today'] else 0,
+        'avg_response_rating': round(row['rating_sum'] / rated, 1) if rated else 0,
+        'overall_success_rate': row['success_count'] / rated if rated else 0,
+        'favorite_response_type': max(sorted(counts), key=counts.get) if counts else DEFAULT_RESPONSE_TYPE
+    }
+
+def rebuild_summary(user_id: str) -> Dict[str, Any]:
+    """conversations 전체에서 한 사용자의 요약을 다시 계산 (누적 오차 보정)"""
+    sql = """
+    INSERT INTO user_dashboard_summary (
+        user_id, total_conversations, rated_conversations, rating_sum, success_count,
+        response_type_counts, activity_date, activity_date_conversations, updated_at
+    )
+    SELECT
+        %(user_id)s,
+        COUNT(*),
+        COUNT(feedback_rating),
+        COALESCE(SUM(feedback_rating), 0),
+        COUNT(CASE WHEN feedback_rating >= %(success_rating)s THEN 1 END),
+        COALESCE((
+            SELECT jsonb_object_agg(selected_response_type, type_count)
+            FROM (
+                SELECT selected_response_type, COUNT(*) AS type_count
+                FROM conversations
+                WHERE user_id = %(user_id)s AND selected_response_type IS NOT NULL
+                GROUP BY selected_response_type
+            ) types
+        ), '{}'::jsonb),
+        CURRENT_DATE,
+        COUNT(CASE WHEN DATE(created_at) = CURRENT_DATE THEN 1 END),
+        NOW()
+    FROM conversations
+    WHERE user_id = %(user_id)s
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_conversations = EXCLUDED.total_conversations,
+        rated_conversations = EXCLUDED.rated_conversations,
+        rating_sum = EXCLUDED.rating_sum,
+        success_count = EXCLUDED.success_count,
+        response_type_counts = EXCLUDED.response_type_counts,
+        activity_date = EXCLUDED.activity_date,
+        activity_date_conversations = EXCLUDED.activity_date_conversations,
+        updated_at = NOW()
+    """
+
+    before = get_summary(user_id)
+    dsql.execute(sql, {'user_id': user_id, 'success_rating': SUCCESS_RATING})
+    after = get_summary(user_id)
+    return {'user_id': user_id, 'drifted': before != after}
+
+def rebuild_handler(event, context):
+    """요약 재계산 작업 (EventBridge 스케줄, event.user_ids로 특정 사용자만 지정 가능)"""
+    user_ids = (event or {}).get('user_ids')
+    if not user_ids:
+        rows = dsql.fetch_all("SELECT user_id FROM users WHERE is_active = true ORDER BY user_id")
+        user_ids = [row['user_id'] for row in rows]
+
+    # DSQL 트랜잭션 크기 제한을 피하기 위해 사용자별로 나누어 재계산
+    rebuilt = drifted = failed = 0
+    for user_id in user_ids:
+        try:
+            result = rebuild_summary(user_id)
+            rebuilt += 1
+            drifted += result['drifted']
+            if result['drifted']:
+                print(f"Dashboard summary drift repaired for {user_id}")
+        except Exception as e:
+            failed += 1
+            print(f"Dashboard summary rebuild error for {user_id}: {e}")
+
+    print(f"Dashboard summary rebuild: {rebuilt} rebuilt, {drifted} drifted, {failed} failed")
+    return {'rebuilt': rebuilt, 'drifted': drifted, 'failed': failed}
@@ -1,10 +1,30 @@
 import json
 import boto3
 import os
-from typing import Dict, List, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Tuple
 
-# AWS 서비스 클라이언트
-comprehend = boto3.client('comprehend')
+from botocore.config import Config
+
+from emotion_cache import create_emotion_cache_from_env, hash_text
+from korean_sentiment import SENTIMENT_ENGINE, resolve_sentiment_client, fallback_sentiment_client
+
+# Comprehend 호출별 제한 시간 (초)
+COMPREHEND_CALL_TIMEOUT = float(os.environ.get('COMPREHEND_CALL_TIMEOUT', '3'))
+
+# AWS 서비스 클라이언트 (제한 시간을 넘긴 호출이 스레드를 오래 점유하지 않도록 소켓 타임아웃 지정)
+comprehend = boto3.client('comprehend', config=Config(
+    connect_timeout=COMPREHEND_CALL_TIMEOUT,
+    read_timeout=COMPREHEND_CALL_TIMEOUT,
+    retries={'max_attempts': 1}
+))
+
+# 감정/핵심 구문/개체명 3개 호출을 동시에 실행하는 스레드 풀 (웜 컨테이너에서 재사용)
+executor = ThreadPoolExecutor(max_workers=6)
+
+# 같은 텍스트의 반복 분석 방지 (텍스트 SHA-256 기준)
+emotion_cache = create_emotion_cache_from_env()
 
 def lambda_handler(event, context):
     """감정 분석 전용 Lambda 함수"""
@@ -27,6 +47,15 @@ def lambda_handler(event, context):
         
         # 요청 본문 파싱
         body = json.loads(event.get('body', '{}'))
+        
+        # 캐시 적중률 조회
+        if body.get('action') == 'cache_stats':
+            return {
+                'statusCode': 200,
+                'headers': headers,
+                'body': json.dumps(emotion_cache.get_stats() if emotion_cache else {})
+            }
+        
         text = body.get('text', '')
         
         if not text.strip():
@@ -37,7 +66,7 @@ def lambda_handler(event, context):
             }
         
         # 감정 분석 수행
-        emotion_result = analyze_comprehensive_emotion(text)
+        emotion_result = analyze_emotion_cached(text)
         
         return {
             'statusCode': 200,
@@ -53,45 +82,70 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
+def analyze_emotion_cached(text: str) -> Dict[str, Any]:
+    """캐시를 먼저 확인하고, 없으면 분석 후 모든 호출이 성공한 결과만 저장"""
+    # 로컬 엔진은 충분히 빠르므로 캐시하지 않음 (Comprehend 결과와 섞이지 않도록)
+    if emotion_cache is None or SENTIMENT_ENGINE == 'local':
+        return analyze_comprehensive_emotion(text)
+    
+    text_hash = hash_text(text)
+    cached = emotion_cache.get(text_hash)
+    if cached is None:
+        result, complete = run_comprehensive_emotion(text)
+        if complete:
+            emotion_cache.set(text_hash, text[:5000], result)
+    else:
+        result = cached
+    
+    return result
+
 def analyze_comprehensive_emotion(text: str) -> Dict[str, Any]:
     """종합적인 감정 분석"""
+    return run_comprehensive_emotion(text)[0]
+
+def run_comprehensive_emotion(text: str) -> Tuple[Dict[str, Any], bool]:
+    """종합적인 감정 분석 결과와 모든 Comprehend 호출의 성공 여부"""
     try:
         # 텍스트 길이 제한 (Comprehend 제한)
         text = text[:5000]
         
-        # 1. 감정 분석 (Sentiment Analysis)
-        sentiment_response = comprehend.detect_sentiment(
-            Text=text,
-            LanguageCode='ko'
-        )
+        # 1~3. 감정 분석, 핵심 구문 추출, 개체명 인식을 동시에 호출 (SENTIMENT_ENGINE=local이면 로컬 분석)
+        client = resolve_sentiment_client(comprehend)
+        futures = {
+            'sentiment': executor.submit(client.detect_sentiment, Text=text, LanguageCode='ko'),
+            'key_phrases': executor.submit(client.detect_key_phrases, Text=text, LanguageCode='ko'),
+            'entities': executor.submit(client.detect_entities, Text=text, LanguageCode='ko')
+        }
+        responses = collect_results(futures, COMPREHEND_CALL_TIMEOUT)
+        complete = all(response is not None for response in responses.values())
         
         # 2. 핵심 구문 추출 (Key Phrases)
         try:
-            key_phrases_response = comprehend.detect_key_phrases(
-                Text=text,
-                LanguageCode='ko'
-            )
-            key_phrases = [phrase['Text'] for phrase in key_phrases_response['KeyPhrases'][:5]]
+            key_phrases = [phrase['Text'] for phrase in responses['key_phrases']['KeyPhrases'][:5]]
         except:
             key_phrases = []
         
         # 3. 개체명 인식 (Named Entity Recognition)
         try:
-            entities_response = comprehend.detect_entities(
-                Text=text,
-                LanguageCode='ko'
-            )
             entities = [
                 {
                     'text': entity['Text'],
                     'type': entity['Type'],
                     'confidence': entity['Score']
                 }
-                for entity in entities_response['Entities'][:5]
+                for entity in responses['entities']['Entities'][:5]
             ]
         except:
             entities = []
         
+        # 1. 감정 분석 (Sentiment Analysis) - 실패 시 로컬 분석, 그마저 없으면 나머지 결과만 담아 폴백
+        sentiment_response = responses['sentiment']
+        if sentiment_response is None:
+            fallback = fallback_sentiment_client()
+            if fallback is None or fallback is client:
+                return build_fallback_emotion(key_phrases, entities), False
+            sentiment_response = fallback.detect_sentiment(Text=text, LanguageCode='ko')
+        
         # 4. 감정 강도 계산
         sentiment_scores = sentiment_response['SentimentScore']
         dominant_emotion = max(sentiment_scores.items(), key=lambda x: x[1])
@@ -115,21 +169,38 @@ def analyze_comprehensive_emotion(text: str) -> Dict[str, Any]:
                 dominant_emotion[1], 
                 key_phrases
             )
-        }
+        }, complete
         
     except Exception as e:
         print(f"Comprehensive emotion analysis error: {e}")
         # 폴백 응답
-        return {
-            'sentiment': 'NEUTRAL',
-            'sentiment_confidence': 0.5,
-            'sentiment_scores': {'Neutral': 1.0},
-            'emotion_category': 'calm',
-            'emotion_intensity': 'medium',
-            'key_phrases': [],
-            'entities': [],
-            'analysis_summary': '감정 분석을 완료할 수 없습니다.'
-        }
+        return build_fallback_emotion([], []), False
+
+def collect_results(futures: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """동시 호출 결과 수집 (모든 호출이 같은 마감 시각을 공유, 실패/시간 초과는 None)"""
+    deadline = time.monotonic() + timeout
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except Exception as e:
+            print(f"Comprehend {name} call failed: {e!r}")
+            future.cancel()
+            results[name] = None
+    return results
+
+def build_fallback_emotion(key_phrases: List[str], entities: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """감정 분석 실패 시 기본 응답 (완료된 핵심 구문/개체명은 유지)"""
+    return {
+        'sentiment': 'NEUTRAL',
+        'sentiment_confidence': 0.5,
+        'sentiment_scores': {'Neutral': 1.0},
+        'emotion_category': 'calm',
+        'emotion_intensity': 'medium',
+        'key_phrases': key_phrases,
+        'entities': entities,
+        'analysis_summary': '감정 분석을 완료할 수 없습니다.'
+    }
 
 def map_emotion_category(sentiment: str, confidence: float) -> str:
     """감정을 더 세분화된 카테고리로 매핑"""
@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import dsql
+
+# 캐시 설정 (환경 변수)
+DEFAULT_MAX_ENTRIES = int(os.environ.get('EMOTION_CACHE_MAX_ENTRIES', '2000'))
+
+def normalize_text(text: str) -> str:
+    """같은 내용이 같은 키를 갖도록 유니코드 정규화 + 공백 정리"""
+    text = unicodedata.normalize('NFC', text or '')
+    return ' '.join(text.split())
+
+def hash_text(text: str) -> str:
+    """정규화된 텍스트의 SHA-256"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+class DSQLEmotionStore:
+    """emotion_analysis 테이블을 영구 캐시로 사용 (text_hash 고유 인덱스)"""
+
+    def get(self, text_hash: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = dsql.fetch_one(
+                "SELECT result FROM emotion_analysis WHERE text_hash = %(text_hash)s AND result IS NOT NULL LIMIT 1",
+                {'text_hash': text_hash}
+            )
+        except Exception as e:
+            print(f"Emotion cache read error: {e}")
+            return None
+        if row is None:
+            return None
+        return row['result'] if isinstance(row['result'], dict) else json.loads(row['result'])
+
+    def put(self, text_hash: str, text: str, result: Dict[str, Any]):
+        try:
+            dsql.execute(
+                """
+                INSERT INTO emotion_analysis (
+                    text_hash, text_content, sentiment, sentiment_confidence,
+                    emotions, key_phrases, entities, result
+                ) VALUES (
+                    %(text_hash)s, %(text_content)s, %(sentiment)s, %(sentiment_confidence)s,
+                    %(emotions)s, %(key_phrases)s, %(entities)s, %(result)s
+                )
+                ON CONFLICT (text_hash) DO NOTHING
+                """,
+                {
+                    'text_hash': text_hash,
+                    'text_content': text,
+                    'sentiment': result.get('sentiment'),
+                    'sentiment_confidence': round(result.get('sentiment_confidence', 0), 2),
+                    'emotions': json.dumps(result.get('sentiment_scores', {})),
+                    'key_phrases': json.dumps(result.get('key_phrases', []), ensure_ascii=False),
+                    'entities': json.dumps(result.get('entities', []), ensure_ascii=False),
+                    'result': json.dumps(result, ensure_ascii=False)
+                }
+            )
+        except Exception as e:
+            print(f"Emotion cache write error: {e}")
+
+class EmotionCache:
+    """텍스트 해시 기반 감정 분석 결과 캐시 (프로세스 내 LRU + 선택적 영구 저장소)"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, store=None):
+        self.max_entries = max_entries
+        self.store = store
+        self._entries = OrderedDict()  # text_hash -> result
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'store_hits': 0, 'misses': 0, 'stores': 0}
+
+    def get(self, text_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._entries.get(text_hash)
+            if result is not None:
+                self._entries.move_to_end(text_hash)
+                self.stats['memory_hits'] += 1
+                return result
+
+        if self.store is not None:
+            result = self.store.get(text_hash)
+            if result is not None:
+                self._remember(text_hash, result)
+                self.stats['store_hits'] += 1
+                return result
+
+        self.stats['misses'] += 1
+        return None
+
+    def set(self, text_hash: str, text: str, result: Dict[str, Any]):
+        self._remember(text_hash, result)
+        if self.store is not None:
+            self.store.put(text_hash, text, result)
+        self.stats['stores'] += 1
+
+    def _remember(self, text_hash: str, result: Dict[str, Any]):
+        with self._lock:
+            self._entries[text_hash] = result
+            self._entries.move_to_end(text_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 적중률 및 절약된 Comprehend 호출 수"""
+        hits = self.stats['memory_hits'] + self.stats['store_hits']
+        lookups = hits + self.stats['misses']
+        return {
+            **self.stats,
+            'hits': hits,
+            'lookups': lookups,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'comprehend_calls_saved': hits * 3  # 감정/핵심 구문/개체명
+        }
+
+def create_emotion_cache_from_env() -> Optional[EmotionCache]:
+    """환경 변수 설정으로 캐시 생성 (EMOTION_CACHE=none 이면 비활성화, memory면 영구 저장 없이 LRU만)"""
+    mode = os.environ.get('EMOTION_CACHE', 'dsql').lower()
+    if mode == 'none':
+        return None
+
+    store = DSQLEmotionStore() if mode == 'dsql' and dsql.is_configured() else None
+    return EmotionCache(DEFAULT_MAX_ENTRIES, store)
@@ -1,12 +1,53 @@
 import json
 import boto3
 import base64
+import codecs
+import io
 import os
-from typing import Dict, Any
+import re
+import uuid
+from itertools import islice
+from urllib.parse import quote, unquote, unquote_plus
+from typing import Dict, Any, Iterable, Iterator, Optional
 
-# AWS 서비스 클라이언트
-s3_client = boto3.client('s3')
+from speech_analyzer import analyze_messages
+
+# AWS 서비스 클라이언트 (S3_ENDPOINT_URL 지정 시 로컬 S3 호환 서버 사용)
+s3_client = boto3.client('s3', endpoint_url=os.environ.get('S3_ENDPOINT_URL') or None)
 lambda_client = boto3.client('lambda')
+comprehend_client = boto3.client('comprehend')
+
+# 파싱 설정
+MAX_MESSAGES = 100  # 최대 메시지 수
+BASE64_CHUNK_SIZE = 64 * 1024
+
+# S3 직접 업로드 설정
+UPLOAD_PREFIX = 'uploads/'
+RESULT_PREFIX = 'results/'
+PRESIGNED_URL_EXPIRES = int(os.environ.get('PRESIGNED_URL_EXPIRES', '900'))
+
+# 말투 분석 방식: inline(기본, 같은 프로세스에서 분석) / async(speech_analysis 함수 비동기 호출)
+SPEECH_ANALYSIS_MODE = os.environ.get('SPEECH_ANALYSIS_MODE', 'inline').lower()
+
+# 시간 패턴 (예: [오후 3:45])
+TIME_PATTERN = re.compile(r'\[.*?\]')
+
+# 카카오톡 내보내기 형식 (모듈 로드 시 1회 컴파일)
+EXPORT_DATE = r'\d{4}년 \d{1,2}월 \d{1,2}일|\d{4}\. ?\d{1,2}\. ?\d{1,2}\.'
+# 모바일: 2024년 1월 1일 오후 3:45, 홍길동 : 메시지 / 2024. 1. 1. 오후 3:45, 홍길동 : 메시지
+MOBILE_MESSAGE_PATTERN = re.compile(
+    r'^(?P<date>' + EXPORT_DATE + r') (?P<ampm>오전|오후) (?P<time>\d{1,2}:\d{2}), (?P<speaker>.+?) : (?P<text>.*)$'
+)
+MOBILE_SYSTEM_PATTERN = re.compile(r'^(?:' + EXPORT_DATE + r') (?:오전|오후) \d{1,2}:\d{2}, ')
+# PC: [홍길동] [오후 3:45] 메시지
+PC_MESSAGE_PATTERN = re.compile(
+    r'^\[(?P<speaker>[^\]]+)\] \[(?P<ampm>오전|오후) (?P<time>\d{1,2}:\d{2})\] (?P<text>.*)$'
+)
+# 날짜 구분선: --------------- 2024년 1월 1일 월요일 --------------- / 2024년 1월 1일 월요일
+DATE_LINE_PATTERN = re.compile(r'^-*\s*(?P<date>' + EXPORT_DATE + r')\s*\S*요일\s*-*$')
+DATE_NUMBER_PATTERN = re.compile(r'\d+')
+# 파일 머리글: 홍길동 님과 카카오톡 대화 / Talk_2024.1.1 12:00-1.txt
+EXPORT_HEADER_PATTERN = re.compile(r'^(?:.+ 님과 카카오톡 대화|Talk_[\d.]+.*)$')
 
 def lambda_handler(event, context):
     """파일 업로드 및 처리 Lambda 함수"""
@@ -30,6 +71,13 @@ def lambda_handler(event, context):
         # 요청 본문 파싱
         body = json.loads(event.get('body', '{}'))
         
+        # S3 직접 업로드: 업로드 URL 발급 / 분석 결과 조회
+        action = body.get('action')
+        if action == 'presign':
+            return create_upload_url(body, headers)
+        if action == 'result':
+            return get_upload_result(body, headers)
+        
         # 필수 필드 검증
         if not body.get('file_content'):
             return {
@@ -40,6 +88,8 @@ def lambda_handler(event, context):
         
         file_content = body['file_content']
         file_type = body.get('file_type', 'txt')
+        content_encoding = body.get('content_encoding')
+        speaker = body.get('speaker')  # 지정 시 해당 화자(사용자 본인)의 메시지만 분석
         
         # 파일 내용 검증
         if not file_content.strip():
@@ -50,7 +100,8 @@ def lambda_handler(event, context):
             }
         
         # 메시지 추출 및 분석
-        messages = extract_messages_from_content(file_content, file_type)
+        parsed = parse_chat_export(iter_content_lines(file_content, content_encoding), file_type, speaker)
+        messages = parsed['messages']
         
         if not messages:
             return {
@@ -59,22 +110,26 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'No valid messages found in file'})
             }
         
-        # 말투 분석 호출
-        speech_function_name = os.environ.get('SPEECH_ANALYSIS_FUNCTION')
-        if speech_function_name:
-            analysis_result = invoke_speech_analysis(speech_function_name, messages)
+        result = {
+            'messages_count': len(messages),
+            'speakers': parsed['speakers'],
+            'truncated': parsed['truncated'],
+            'sample_messages': messages[:5]  # 처음 5개 메시지만
+        }
+        
+        # async 모드: 감정 분석까지 포함한 결과는 speech_analysis 함수가 S3에 저장 (action=result로 조회)
+        upload_id = start_async_speech_analysis(messages) if SPEECH_ANALYSIS_MODE == 'async' else None
+        if upload_id:
+            result['upload_id'] = upload_id
+            result['status'] = 'processing'
+            result['analysis'] = analyze_messages(messages)  # Comprehend 없이 말투만 즉시 반환
         else:
-            # 직접 분석 (fallback)
-            analysis_result = analyze_messages_directly(messages)
+            result['analysis'] = analyze_messages(messages, comprehend_client)
         
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps({
-                'messages_count': len(messages),
-                'analysis': analysis_result,
-                'sample_messages': messages[:5]  # 처음 5개 메시지만
-            })
+            'body': json.dumps(result)
         }
         
     except Exception as e:
@@ -85,139 +140,364 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
-def extract_messages_from_content(content: str, file_type: str) -> list:
-    """파일 내용에서 메시지 추출"""
-    messages = []
+def create_upload_url(body: Dict[str, Any], headers: Dict[str, str], client=None) -> Dict[str, Any]:
+    """대화 파일을 S3에 직접 올릴 presigned PUT URL 발급"""
+    client = client or s3_client
+    bucket = os.environ.get('S3_BUCKET')
+    if not bucket:
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'error': 'S3_BUCKET is not configured'})
+        }
     
-    if file_type == 'kakao':
-        # 카카오톡 대화 내역 파싱
-        lines = content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('---') or line.startswith('저장한 날짜'):
-                continue
-            
-            # 시간 패턴 제거 (예: [오후 3:45])
-            import re
-            time_pattern = r'\[.*?\]'
-            line = re.sub(time_pattern, '', line).strip()
-            
-            # 이름: 메시지 형태에서 메시지만 추출
-            if ':' in line:
-                parts = line.split(':', 1)
-                if len(parts) == 2:
-                    message = parts[1].strip()
-                    if message and len(message) > 1:
-                        messages.append(message)
-            elif len(line) > 1:
-                messages.append(line)
+    upload_id = uuid.uuid4().hex
+    key = f"{UPLOAD_PREFIX}{upload_id}.txt"
+    
+    # 파일 형식/화자는 객체 메타데이터로 전달 (헤더는 ASCII만 허용되므로 URL 인코딩)
+    metadata = {'file-type': body.get('file_type', 'kakao')}
+    if body.get('speaker'):
+        metadata['speaker'] = quote(body['speaker'])
+    
+    upload_url = client.generate_presigned_url(
+        'put_object',
+        Params={
+            'Bucket': bucket,
+            'Key': key,
+            'ContentType': 'text/plain',
+            'Metadata': metadata
+        },
+        ExpiresIn=PRESIGNED_URL_EXPIRES
+    )
+    
+    # 업로드 시 서명에 포함된 헤더를 그대로 보내야 함
+    upload_headers = {'Content-Type': 'text/plain'}
+    upload_headers.update({f"x-amz-meta-{name}": value for name, value in metadata.items()})
+    
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': json.dumps({
+            'upload_id': upload_id,
+            'upload_url': upload_url,
+            'upload_headers': upload_headers,
+            'expires_in': PRESIGNED_URL_EXPIRES
+        })
+    }
+
+def get_upload_result(body: Dict[str, Any], headers: Dict[str, str], client=None) -> Dict[str, Any]:
+    """S3 이벤트 처리기가 저장한 분석 결과 조회 (아직 없으면 202)"""
+    client = client or s3_client
+    upload_id = body.get('upload_id', '')
+    if not re.fullmatch(r'[0-9a-f]{32}', upload_id):
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({'error': 'valid upload_id is required'})
+        }
+    
+    try:
+        response = client.get_object(Bucket=os.environ.get('S3_BUCKET'), Key=f"{RESULT_PREFIX}{upload_id}.json")
+    except Exception as e:
+        print(f"Upload result not ready ({upload_id}): {e}")
+        return {
+            'statusCode': 202,
+            'headers': headers,
+            'body': json.dumps({'upload_id': upload_id, 'status': 'processing'})
+        }
+    
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': response['Body'].read().decode('utf-8')
+    }
+
+def s3_event_handler(event, context):
+    """S3 업로드 완료 이벤트로 대화 파일을 스트리밍 파싱 후 분석 결과를 results/에 저장"""
+    processed = []
+    failed = []
+    for record in event.get('Records', []):
+        bucket = record['s3']['bucket']['name']
+        key = unquote_plus(record['s3']['object']['key'])
+        if not key.startswith(UPLOAD_PREFIX):
+            continue
+        
+        try:
+            processed.append(process_uploaded_object(bucket, key))
+        except Exception as e:
+            print(f"S3 upload processing error ({key}): {e}")
+            # 결과 조회가 202(처리 중)에 머물지 않도록 실패 결과 기록
+            try:
+                failed.append(write_upload_result(bucket, {
+                    'upload_id': upload_id_from_key(key),
+                    'status': 'failed',
+                    'error': str(e)
+                }))
+            except Exception as write_error:
+                print(f"S3 upload failure result error ({key}): {write_error}")
+    
+    return {'processed': processed, 'failed': failed}
+
+def process_uploaded_object(bucket: str, key: str, client=None) -> str:
+    """업로드된 객체를 한 줄씩 읽어 분석하고 결과 키 반환"""
+    client = client or s3_client
+    response = client.get_object(Bucket=bucket, Key=key)
+    metadata = response.get('Metadata', {})
+    file_type = metadata.get('file-type', 'kakao')
+    speaker = unquote(metadata['speaker']) if metadata.get('speaker') else None
+    
+    # 본문 전체를 메모리에 올리지 않고 스트림에서 줄 단위로 디코딩
+    lines = codecs.getreader('utf-8')(response['Body'], errors='replace')
+    parsed = parse_chat_export(lines, file_type, speaker)
+    messages = parsed['messages']
+    
+    upload_id = upload_id_from_key(key)
+    if messages:
+        result = {
+            'upload_id': upload_id,
+            'status': 'completed',
+            'messages_count': len(messages),
+            'analysis': analyze_messages(messages, comprehend_client),
+            'speakers': parsed['speakers'],
+            'truncated': parsed['truncated'],
+            'sample_messages': messages[:5]
+        }
     else:
-        # 일반 텍스트 파일
-        lines = content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line and len(line) > 1:
-                messages.append(line)
+        result = {'upload_id': upload_id, 'status': 'failed', 'error': 'No valid messages found in file'}
     
-    return messages[:100]  # 최대 100개 메시지
+    return write_upload_result(bucket, result, client)
+
+def upload_id_from_key(key: str) -> str:
+    """uploads/<upload_id>.txt 키에서 upload_id 추출"""
+    return key[len(UPLOAD_PREFIX):].rsplit('.', 1)[0]
+
+def write_upload_result(bucket: str, result: Dict[str, Any], client=None) -> str:
+    """분석 결과(성공/실패)를 results/<upload_id>.json에 저장하고 결과 키 반환"""
+    client = client or s3_client
+    result_key = f"{RESULT_PREFIX}{result['upload_id']}.json"
+    client.put_object(
+        Bucket=bucket,
+        Key=result_key,
+        Body=json.dumps(result, ensure_ascii=False).encode('utf-8'),
+        ContentType='application/json'
+    )
+    return result_key
 
-def invoke_speech_analysis(function_name: str, messages: list) -> Dict[str, Any]:
-    """말투 분석 Lambda 함수 호출"""
+def start_async_speech_analysis(messages: list) -> Optional[str]:
+    """speech_analysis 함수를 비동기(Event)로 호출하고 결과 조회용 upload_id 반환 (실패 시 None)"""
+    function_name = os.environ.get('SPEECH_ANALYSIS_FUNCTION')
+    bucket = os.environ.get('S3_BUCKET')
+    if not function_name or not bucket:
+        return None
+    
+    upload_id = uuid.uuid4().hex
     try:
+        # 결과 위치는 speech_analysis가 자체 설정(S3_BUCKET)과 upload_id로 결정
         payload = {
-            'body': json.dumps({'messages': messages}),
-            'httpMethod': 'POST'
+            'async_analysis': {
+                'messages': messages,
+                'upload_id': upload_id
+            }
         }
         
-        response = lambda_client.invoke(
+        lambda_client.invoke(
             FunctionName=function_name,
-            InvocationType='RequestResponse',
+            InvocationType='Event',
             Payload=json.dumps(payload)
         )
+        return upload_id
         
-        result = json.loads(response['Payload'].read())
-        if result.get('statusCode') == 200:
-            return json.loads(result['body'])
-        else:
-            raise Exception(f"Speech analysis failed: {result}")
-            
     except Exception as e:
-        print(f"Speech analysis invocation error: {e}")
-        return analyze_messages_directly(messages)
+        print(f"Async speech analysis invocation error: {e}")
+        return None
 
-def analyze_messages_directly(messages: list) -> Dict[str, Any]:
-    """직접 메시지 분석 (fallback)"""
-    if not messages:
-        return {
-            "formal_ratio": 0.5,
-            "emoji_ratio": 0.2,
-            "avg_length": 10,
-            "total_messages": 0,
-            "tone": "neutral",
-            "speech_style": "casual",
-            "personality_traits": [],
-            "response_examples": []
-        }
-    
-    total_msgs = len(messages)
-    
-    # 존댓말 패턴
-    formal_patterns = ['요', '습니다', '해요', '입니다', '세요', '시죠', '죠']
-    formal_count = sum(1 for msg in messages 
-                      if any(pattern in msg for pattern in formal_patterns))
-    
-    # 이모티콘 분석
-    import re
-    emoji_pattern = r'[😀-🙏ㅋㅎㅠㅜ]|:\)|:\(|:D|XD|><|T_T|\^\^'
-    emoji_count = sum(len(re.findall(emoji_pattern, msg)) for msg in messages)
+def extract_messages_from_content(content: str, file_type: str, content_encoding: Optional[str] = None,
+                                  max_messages: int = MAX_MESSAGES, speaker: Optional[str] = None) -> list:
+    """파일 내용에서 메시지 추출 (필요한 개수만큼만 읽고 중단)"""
+    lines = iter_content_lines(content, content_encoding)
+    return parse_chat_export(lines, file_type, speaker, max_messages)['messages']
+
+def parse_chat_export(lines: Iterable[str], file_type: str, speaker: Optional[str] = None,
+                      max_messages: int = MAX_MESSAGES) -> Dict[str, Any]:
+    """대화 내역에서 분석할 메시지와 화자별 통계 추출 (speaker 지정 시 해당 화자 메시지만)
+
+    메시지는 max_messages개까지만 모으고(초과 시 truncated), 화자별 통계는 파일 전체를 대상으로 집계
+    """
+    messages = []
+    speakers = {}
+    truncated = False
     
-    # 평균 길이
-    avg_length = sum(len(msg) for msg in messages) / total_msgs
+    if file_type != 'kakao':
+        messages = list(islice(iter_messages(lines, file_type), max_messages + 1))
+        truncated = len(messages) > max_messages
+        return {'messages': messages[:max_messages], 'speakers': speakers, 'truncated': truncated}
     
-    # 톤 분석
-    positive_words = ['좋아', '최고', '대박', '완전', '진짜', '헐', '와']
-    negative_words = ['싫어', '별로', '아니', '안돼', '힘들어', 'ㅠㅠ']
+    for record in iter_kakao_records(lines):
+        update_speaker_stats(speakers, record)
+        
+        if speaker and record['speaker'] != speaker:
+            continue
+        if len(record['text']) > 1:
+            if len(messages) < max_messages:
+                messages.append(record['text'])
+            else:
+                truncated = True
     
-    positive_count = sum(1 for msg in messages 
-                        if any(word in msg for word in positive_words))
-    negative_count = sum(1 for msg in messages 
-                        if any(word in msg for word in negative_words))
+    return {'messages': messages, 'speakers': speakers, 'truncated': truncated}
+
+def update_speaker_stats(speakers: Dict[str, Dict[str, Any]], record: Dict[str, Any]):
+    """화자별 메시지 수, 평균 길이, 첫/마지막 시각 갱신"""
+    name = record['speaker']
+    if name is None:
+        return
     
-    if positive_count > negative_count:
-        tone = "positive"
-    elif negative_count > positive_count:
-        tone = "negative"
-    else:
-        tone = "neutral"
+    stats = speakers.get(name)
+    if stats is None:
+        stats = speakers[name] = {
+            'message_count': 0,
+            'avg_length': 0,
+            'first_timestamp': record['timestamp'],
+            'last_timestamp': record['timestamp']
+        }
     
-    formal_ratio = formal_count / total_msgs
-    speech_style = "formal" if formal_ratio > 0.7 else "semi_formal" if formal_ratio > 0.3 else "casual"
+    stats['message_count'] += 1
+    stats['avg_length'] += (len(record['text']) - stats['avg_length']) / stats['message_count']
+    if record['timestamp']:
+        stats['first_timestamp'] = stats['first_timestamp'] or record['timestamp']
+        stats['last_timestamp'] = record['timestamp']
+
+def iter_content_lines(content: str, content_encoding: Optional[str] = None) -> Iterator[str]:
+    """요청 본문의 파일 내용을 한 줄씩 반환 (전체 split/디코딩 없이)"""
+    if content_encoding == 'base64':
+        return iter_base64_lines(content)
+    return io.StringIO(content)
+
+def iter_base64_lines(content: str) -> Iterator[str]:
+    """base64 문자열을 청크 단위로 디코딩하며 한 줄씩 반환"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
     
-    # 성격 특성
-    traits = []
-    if formal_ratio > 0.7:
-        traits.append('정중함')
-    elif formal_ratio < 0.3:
-        traits.append('친근함')
+    # 공백/개행이 섞인 base64도 처리하도록 4의 배수 길이로 모아서 디코딩
+    encoded = ''
+    for start in range(0, len(content), BASE64_CHUNK_SIZE):
+        encoded += ''.join(content[start:start + BASE64_CHUNK_SIZE].split())
+        usable = len(encoded) - len(encoded) % 4
+        if not usable:
+            continue
+        
+        text = pending + decoder.decode(base64.b64decode(encoded[:usable]))
+        encoded = encoded[usable:]
+        
+        lines = text.split('\n')
+        pending = lines.pop()
+        yield from lines
     
-    if emoji_count / total_msgs > 0.5:
-        traits.append('표현력 풍부')
+    if encoded:
+        pending += decoder.decode(base64.b64decode(encoded + '=' * (-len(encoded) % 4)))
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+def iter_messages(lines: Iterable[str], file_type: str) -> Iterator[str]:
+    """파일 객체(또는 줄 단위 iterable)에서 메시지를 하나씩 추출하는 제너레이터"""
+    if file_type == 'kakao':
+        # 카카오톡 대화 내역 파싱
+        for record in iter_kakao_records(lines):
+            if len(record['text']) > 1:
+                yield record['text']
+        return
     
-    if avg_length > 50:
-        traits.append('상세함')
-    elif avg_length < 15:
-        traits.append('간단명료')
+    for line in lines:
+        line = line.strip()
+        
+        # 일반 텍스트 파일
+        if line and len(line) > 1:
+            yield line
+
+def iter_kakao_records(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """카카오톡 내보내기(모바일/PC)를 {speaker, timestamp, text} 레코드로 변환 (여러 줄 메시지 포함)"""
+    current = None  # 다음 줄이 이어붙을 수 있는 레코드
+    current_date = None
     
-    if tone == "positive":
-        traits.append('긍정적')
+    for raw_line in lines:
+        line = raw_line.strip()
+        
+        if not line or line.startswith('저장한 날짜') or EXPORT_HEADER_PATTERN.match(line):
+            continue
+        
+        # PC 버전: [이름] [오후 3:45] 메시지
+        match = PC_MESSAGE_PATTERN.match(line)
+        if match:
+            if current:
+                yield current
+            current = build_record(match, current_date)
+            continue
+        
+        # 모바일 버전: 2024년 1월 1일 오후 3:45, 이름 : 메시지
+        match = MOBILE_MESSAGE_PATTERN.match(line)
+        if match:
+            if current:
+                yield current
+            current_date = parse_export_date(match.group('date'))
+            current = build_record(match, current_date)
+            continue
+        
+        # 날짜 구분선 (--------------- 2024년 1월 1일 월요일 ---------------)
+        date_match = DATE_LINE_PATTERN.match(line)
+        if date_match:
+            if current:
+                yield current
+                current = None
+            current_date = parse_export_date(date_match.group('date'))
+            continue
+        
+        # 입장/퇴장 등 시스템 메시지 (2024년 1월 1일 오후 3:45, 홍길동님이 들어왔습니다.)
+        if MOBILE_SYSTEM_PATTERN.match(line):
+            if current:
+                yield current
+                current = None
+            continue
+        
+        # 형식에 맞지 않는 줄은 직전 메시지의 다음 줄
+        if current:
+            current['text'] += '\n' + line
+            continue
+        
+        if line.startswith('---'):
+            continue
+        
+        # 알 수 없는 형식은 기존 방식으로 처리 (시간 패턴 제거 후 이름: 메시지 분리)
+        line = TIME_PATTERN.sub('', line).strip()
+        if ':' in line:
+            name, message = line.split(':', 1)
+            yield {'speaker': name.strip() or None, 'timestamp': None, 'text': message.strip()}
+        else:
+            yield {'speaker': None, 'timestamp': None, 'text': line}
     
+    if current:
+        yield current
+
+def build_record(match: 're.Match', current_date: Optional[str]) -> Dict[str, Any]:
+    """정규식 매치에서 메시지 레코드 생성"""
+    time_text = to_24_hour(match.group('ampm'), match.group('time'))
     return {
-        "formal_ratio": formal_ratio,
-        "emoji_ratio": emoji_count / total_msgs,
-        "avg_length": avg_length,
-        "total_messages": total_msgs,
-        "tone": tone,
-        "speech_style": speech_style,
-        "personality_traits": traits[:5],
-        "response_examples": messages[:3]
-    }
\ No newline at end of file
+        'speaker': match.group('speaker').strip(),
+        'timestamp': f"{current_date}T{time_text}" if current_date else time_text,
+        'text': match.group('text').strip()
+    }
+
+def parse_export_date(date_text: str) -> Optional[str]:
+    """'2024년 1월 1일' 또는 '2024. 1. 1.' 형태의 날짜를 YYYY-MM-DD로 변환"""
+    numbers = DATE_NUMBER_PATTERN.findall(date_text)
+    if len(numbers) < 3:
+        return None
+    year, month, day = (int(number) for number in numbers[:3])
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+def to_24_hour(ampm: str, time_text: str) -> str:
+    """'오후', '3:45' → '15:45'"""
+    hour, minute = time_text.split(':')
+    hour = int(hour) % 12
+    if ampm == '오후':
+        hour += 12
+    return f"{hour:02d}:{minute}"
@@ -0,0 +1,42 @@
+import os
+import threading
+import time
+
+# ULID: 48비트 밀리초 타임스탬프 + 80비트 난수, Crockford base32 26자 (생성 시각 순으로 정렬됨)
+ENCODING = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+ULID_LENGTH = 26
+RANDOM_BITS = 80
+MAX_RANDOM = (1 << RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_last = {'timestamp': -1, 'random': 0}
+
+def new_ulid() -> str:
+    """프로세스 내 단조 증가 ULID (같은 밀리초면 난수부를 1 증가, 시계가 뒤로 가도 순서 유지)"""
+    with _lock:
+        timestamp = int(time.time() * 1000)
+        if timestamp <= _last['timestamp']:
+            timestamp = _last['timestamp']
+            random_part = _last['random'] + 1
+            if random_part > MAX_RANDOM:
+                # 같은 밀리초에 난수 공간을 모두 쓰면 다음 밀리초로 넘어감
+                timestamp += 1
+                random_part = int.from_bytes(os.urandom(10), 'big')
+        else:
+            random_part = int.from_bytes(os.urandom(10), 'big')
+
+        _last['timestamp'] = timestamp
+        _last['random'] = random_part
+
+    return encode((timestamp << RANDOM_BITS) | random_part)
+
+def new_id(prefix: str) -> str:
+    """접두사가 붙은 고정 길이 ID (예: room_01HV...)"""
+    return f"{prefix}_{new_ulid()}"
+
+def encode(number: int) -> str:
+    chars = []
+    for _ in range(ULID_LENGTH):
+        chars.append(ENCODING[number & 31])
+        number >>= 5
+    return ''.join(reversed(chars))
@@ -0,0 +1,193 @@
+import json
+import re
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+# ```json ... ``` 코드 블록
+CODE_FENCE_PATTERN = re.compile(r'```(?:json|JSON)?\s*(.*?)(?:```|$)', re.DOTALL)
+
+# 잘린 JSON 복구 시 시도할 최대 절단 지점 수
+MAX_REPAIR_ATTEMPTS = 8
+
+# 모델 출력 파싱 통계 (웜 컨테이너 단위)
+EXTRACTION_STATS = {'parsed': 0, 'recovered': 0, 'discarded': 0}
+_stats_lock = threading.Lock()
+
+def extract_json(text: str) -> Optional[Any]:
+    """모델 출력에서 JSON 값 추출 (코드 블록, 앞뒤 설명문, 후행 쉼표, 잘린 객체 허용)"""
+    if not text or not text.strip():
+        _record('discarded')
+        return None
+
+    try:
+        value = json.loads(text)
+        _record('parsed')
+        return value
+    except json.JSONDecodeError:
+        pass
+
+    fence_match = CODE_FENCE_PATTERN.search(text)
+    if fence_match:
+        text = fence_match.group(1)
+
+    value = _repair_and_parse(text)
+    # 괄호만 복구되고 값이 하나도 없으면 폐기 (첫 필드부터 잘린 출력)
+    if _is_empty(value):
+        value = None
+    _record('discarded' if value is None else 'recovered')
+    return value
+
+def get_extraction_stats() -> Dict[str, int]:
+    """파싱 성공/복구/폐기 횟수"""
+    with _stats_lock:
+        return dict(EXTRACTION_STATS)
+
+def _record(outcome: str):
+    with _stats_lock:
+        EXTRACTION_STATS[outcome] += 1
+
+def _repair_and_parse(text: str) -> Optional[Any]:
+    """첫 번째 JSON 값을 찾아 닫히지 않은 괄호를 보완하고 파싱"""
+    start = _find_json_start(text)
+    if start < 0:
+        return None
+
+    out = []
+    stack = []
+    cut_points = []  # (out 길이, 그 시점의 stack) - 불완전한 마지막 요소를 버릴 위치
+    in_string = False
+    escape = False
+
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+            out.append(ch)
+            cut_points.append((len(out), tuple(stack)))
+        elif ch in '}]':
+            _strip_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                break
+        elif ch == ',':
+            cut_points.append((len(out), tuple(stack)))
+            out.append(ch)
+        else:
+            out.append(ch)
+
+    # 완전한 값이면 그대로 파싱
+    if not stack and not in_string:
+        return _try_loads(''.join(out))
+
+    # 문자열 중간에서 잘리지 않았다면 현재까지의 내용을 닫아서 시도
+    if not in_string:
+        candidate = list(out)
+        _strip_trailing_comma(candidate)
+        value = _try_loads(''.join(candidate) + ''.join(reversed(stack)))
+        if value is not None:
+            return value
+
+    # 마지막 불완전 요소를 버리면서 뒤에서부터 절단 지점 시도
+    for length, cut_stack in reversed(cut_points[-MAX_REPAIR_ATTEMPTS:]):
+        candidate = out[:length]
+        _strip_trailing_comma(candidate)
+        value = _try_loads(''.join(candidate) + ''.join(reversed(cut_stack)))
+        if value is not None:
+            return value
+
+    return None
+
+def _is_empty(value: Any) -> bool:
+    """값 없이 빈 객체/배열로만 이루어졌는지 여부"""
+    if isinstance(value, dict):
+        return all(_is_empty(item) for item in value.values())
+    if isinstance(value, list):
+        return all(_is_empty(item) for item in value)
+    return False
+
+def _find_json_start(text: str) -> int:
+    positions = [pos for pos in (text.find('{'), text.find('[')) if pos >= 0]
+    return min(positions) if positions else -1
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+
+def _try_loads(text: str) -> Optional[Any]:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+class IncrementalJSONExtractor:
+    """스트리밍 청크를 받아 완성된 문자열 필드를 즉시 돌려주는 추출기"""
+
+    def __init__(self):
+        self.buffer = ''
+        self._pos = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._string_is_value = False
+        self._after_colon = False
+        self._last_key = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """청크 추가 후 새로 완성된 (key, 문자열 값) 목록 반환"""
+        self.buffer += chunk
+        completed = []
+        buffer = self.buffer
+
+        for pos in range(self._pos, len(buffer)):
+            ch = buffer[pos]
+
+            if not self._started:
+                # 앞쪽 설명문/코드 블록 표시는 건너뜀
+                if ch in '{[':
+                    self._started = True
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    value = _try_loads(buffer[self._string_start:pos + 1])
+                    if self._string_is_value:
+                        if self._last_key is not None and isinstance(value, str):
+                            completed.append((self._last_key, value))
+                    else:
+                        self._last_key = value
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = pos
+                self._string_is_value = self._after_colon
+                self._after_colon = False
+            elif ch == ':':
+                self._after_colon = True
+            elif not ch.isspace():
+                self._after_colon = False
+
+        self._pos = len(buffer)
+        return completed
@@ -0,0 +1,116 @@
+import re
+from typing import Dict, List, Iterable, Set, Tuple
+
+# 성격 관련 키워드 매핑 (chat_analysis 답변 생성용)
+PERSONALITY_PATTERNS = {
+    '내성적': ['내성적', '조용', '수줍', '소심'],
+    '외향적': ['외향적', '활발', '사교적', '적극적'],
+    '감성적': ['감성적', '감정적', '로맨틱', '섬세'],
+    '논리적': ['논리적', '이성적', '분석적', '체계적'],
+    '유머러스': ['유머', '재미있', '웃긴', '장난'],
+    '진지함': ['진지', '성실', '책임감', '신중'],
+    '독립적': ['독립적', '자립적', '혼자', '개인주의'],
+    '배려심': ['배려', '친절', '따뜻', '상냥'],
+    '완벽주의': ['완벽', '꼼꼼', '세심', '정확'],
+    '자유로움': ['자유', '즉흥', '유연', '개방적']
+}
+
+# 상대방 프로필 분석용 성격 키워드 (설명/관심사 모두 검사)
+PARTNER_PERSONALITY_PATTERNS = {
+    '내성적': ['내성적', '조용', '수줍', '소심', '혼자'],
+    '외향적': ['외향적', '활발', '사교적', '적극적', '사람'],
+    '감성적': ['감성적', '감정적', '로맨틱', '섬세', '예술'],
+    '논리적': ['논리적', '이성적', '분석적', '체계적', '계획'],
+    '유머러스': ['유머', '재미있', '웃긴', '장난', '개그'],
+    '진지함': ['진지', '성실', '책임감', '신중', '깊이'],
+    '독립적': ['독립적', '자립적', '혼자', '개인주의'],
+    '배려심': ['배려', '친절', '따뜻', '상냥', '도움'],
+    '완벽주의': ['완벽', '꼼꼼', '세심', '정확', '철저'],
+    '자유로움': ['자유', '즉흥', '유연', '개방적', '모험']
+}
+
+# 관심사 → 대화 주제
+CONVERSATION_TOPICS = {
+    '영화': ['최근 본 영화', '좋아하는 장르', '영화관 vs 집에서 보기'],
+    '음악': ['좋아하는 가수', '콘서트 경험', '음악 취향'],
+    '독서': ['최근 읽은 책', '좋아하는 작가', '독서 습관'],
+    '운동': ['운동 종목', '헬스장 vs 야외운동', '운동 루틴'],
+    '여행': ['가고 싶은 곳', '여행 스타일', '여행 경험'],
+    '요리': ['좋아하는 음식', '요리 실력', '맛집 탐방'],
+    '게임': ['즐기는 게임', '게임 시간', '게임 취향'],
+    '드라마': ['최근 본 드라마', '좋아하는 장르', '드라마 추천'],
+    '카페': ['좋아하는 카페', '커피 vs 차', '카페 분위기'],
+    '쇼핑': ['쇼핑 스타일', '좋아하는 브랜드', '온라인 vs 오프라인']
+}
+
+# 상대방 상태 위험 요소
+RISK_KEYWORDS = ['바쁨', '스트레스', '피곤', '힘들', '우울', '예민', '까다로움']
+
+# 말투/톤 분석 패턴
+FORMAL_PATTERNS = ['요', '습니다', '해요', '입니다', '세요', '시죠', '죠']
+POSITIVE_WORDS = ['좋아', '최고', '대박', '완전', '진짜', '헐', '와']
+NEGATIVE_WORDS = ['싫어', '별로', '아니', '안돼', '힘들어', 'ㅠㅠ']
+
+class KeywordMatcher:
+    """여러 키워드 테이블을 하나의 정규식으로 컴파일하여 한 번의 스캔으로 모든 라벨을 찾는 매처"""
+
+    def __init__(self, tables: Dict[str, Dict[str, Iterable[str]]]):
+        pattern_labels = {}  # pattern -> {(table, label)}
+        self.label_order = {}  # table -> [label] (테이블 정의 순서)
+
+        for table, mapping in tables.items():
+            self.label_order[table] = list(mapping.keys())
+            for label, patterns in mapping.items():
+                for pattern in patterns:
+                    pattern_labels.setdefault(pattern, set()).add((table, label))
+
+        # 정규식은 각 위치에서 가장 긴 패턴만 잡으므로, 그 패턴의 접두사인
+        # 더 짧은 패턴(예: '힘들어' 안의 '힘들')의 라벨을 미리 합쳐둠
+        self._labels = {}
+        for pattern in pattern_labels:
+            implied = set()
+            for other, labels in pattern_labels.items():
+                if pattern.startswith(other):
+                    implied |= labels
+            self._labels[pattern] = frozenset(implied)
+
+        alternatives = sorted(pattern_labels, key=len, reverse=True)
+        self._regex = re.compile('(?=(' + '|'.join(map(re.escape, alternatives)) + '))')
+
+    def scan(self, text: str) -> Set[Tuple[str, str]]:
+        """텍스트를 한 번 스캔하여 (table, label) 집합 반환"""
+        hits = set()
+        labels = self._labels
+        for match in self._regex.finditer(text):
+            hits |= labels[match.group(1)]
+        return hits
+
+    def match(self, text: str, table: str) -> List[str]:
+        """특정 테이블의 라벨을 테이블 정의 순서대로 반환"""
+        return self.select(self.scan(text), table)
+
+    def select(self, hits: Set[Tuple[str, str]], table: str) -> List[str]:
+        """scan 결과에서 특정 테이블 라벨만 정의 순서대로 추출"""
+        return [label for label in self.label_order[table] if (table, label) in hits]
+
+def minimal_patterns(patterns: Iterable[str]) -> List[str]:
+    """포함 여부만 볼 때 필요한 최소 패턴 (다른 패턴을 포함하는 패턴 제거, 예: '해요' → '요')"""
+    patterns = set(patterns)
+    minimal = [
+        pattern for pattern in patterns
+        if not any(other != pattern and other in pattern for other in patterns)
+    ]
+    return sorted(minimal, key=len, reverse=True)
+
+def compile_presence_pattern(patterns: Iterable[str]) -> 're.Pattern':
+    """패턴 중 하나라도 포함되는지 확인하는 정규식"""
+    return re.compile('|'.join(map(re.escape, minimal_patterns(patterns))))
+
+# 모듈 로드 시 1회 컴파일 (Lambda 웜 컨테이너에서 재사용)
+PERSONALITY_MATCHER = KeywordMatcher({'personality': PERSONALITY_PATTERNS})
+
+PARTNER_MATCHER = KeywordMatcher({
+    'personality': PARTNER_PERSONALITY_PATTERNS,
+    'topic': {interest: [interest] for interest in CONVERSATION_TOPICS},
+    'risk': {keyword: [keyword] for keyword in RISK_KEYWORDS}
+})
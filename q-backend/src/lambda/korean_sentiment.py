@@ -0,0 +1,142 @@
+import os
+import re
+from typing import Dict, List, Any, Optional
+
+# 감정 분석 엔진: comprehend(기본) / local(사전 기반 로컬 분석, 비용 절감용)
+SENTIMENT_ENGINE = os.environ.get('SENTIMENT_ENGINE', 'comprehend').lower()
+# Comprehend 실패 시 대체: local(기본) / none(기존처럼 NEUTRAL 기본값)
+SENTIMENT_FALLBACK = os.environ.get('SENTIMENT_FALLBACK', 'local').lower()
+
+# 감정 사전 (어간 기준, 가중치)
+POSITIVE_LEXICON = {
+    '좋': 1.0, '최고': 1.5, '대박': 1.2, '사랑': 1.5,
+    '고마워': 1.2, '고맙': 1.2, '감사': 1.2, '행복': 1.5, '기뻐': 1.3, '기쁘': 1.3, '신나': 1.2,
+    '재밌': 1.0, '재미있': 1.0, '설레': 1.2, '멋지': 1.0, '멋있': 1.0, '예쁘': 1.0, '이쁘': 1.0,
+    '귀여': 1.0, '귀엽': 1.0, '맛있': 0.8, '축하': 1.2, '웃기': 0.8, '다행': 0.8, '괜찮': 0.5,
+    '편하': 0.6, '반가': 1.0, '보고싶': 0.8, '보고 싶': 0.8, '훌륭': 1.2, '완벽': 1.0, '좋겠': 0.8
+}
+NEGATIVE_LEXICON = {
+    '싫': 1.2, '별로': 0.8, '힘들': 1.0, '슬퍼': 1.3, '슬프': 1.3, '짜증': 1.5,
+    '화나': 1.5, '화가': 1.3, '우울': 1.5, '아파': 1.0, '아프': 1.0, '피곤': 0.8, '외로': 1.0,
+    '미안': 0.6, '걱정': 0.8, '무서': 1.0, '속상': 1.3, '실망': 1.3, '최악': 1.5, '지루': 0.8,
+    '귀찮': 0.8, '서운': 1.2, '답답': 1.0, '불안': 1.0, '스트레스': 1.0, '망했': 1.3,
+    '안돼': 0.8, '아쉽': 0.8, '후회': 1.0, '억울': 1.2, '괴로': 1.3
+}
+# 이모티콘/자모/이모지 (반복 길이와 무관하게 1회로 계산)
+POSITIVE_EMOTICONS = {'ㅋㅋ': 0.8, 'ㅎㅎ': 0.7, '^^': 0.8, ':)': 0.8, ':D': 1.0, 'XD': 0.8, '♡': 1.0, '♥': 1.0}
+NEGATIVE_EMOTICONS = {'ㅠㅠ': 1.0, 'ㅜㅜ': 1.0, 'ㅠ': 0.7, 'ㅜ': 0.7, 'T_T': 1.0, ':(': 0.8, ';;': 0.5}
+POSITIVE_EMOJI_RANGES = [(0x1F600, 0x1F60D), (0x1F617, 0x1F61D), (0x1F970, 0x1F970), (0x2764, 0x2764),
+                         (0x1F493, 0x1F49F), (0x1F44D, 0x1F44D)]
+NEGATIVE_EMOJI_RANGES = [(0x1F61E, 0x1F62D), (0x1F62B, 0x1F630), (0x1F494, 0x1F494), (0x1F44E, 0x1F44E),
+                         (0x1F97A, 0x1F97A)]
+
+# 강조어: 바로 뒤 감정어 가중치 증가
+INTENSIFIERS = ['너무', '진짜', '정말', '완전', '엄청', '되게', '아주', '매우', '넘', '존나', '개']
+INTENSIFIER_WEIGHT = 1.5
+# 부정어: 앞에 오는 '안/못', 뒤에 오는 '-지 않/-지 못/-지 마'
+NEGATION_BEFORE = re.compile(r'(?:^|\s)(?:안|못)\s*$')
+NEGATION_AFTER = re.compile(r'^\S{0,3}지\s?(?:않|못|마)')
+NEGATION_WEIGHT = 0.7  # 부정된 감정어는 반대 감정으로 약하게 반영
+# 감정 점수 합이 이 값의 역수를 넘으면 NEUTRAL보다 감정 쪽 확률이 커짐
+SENTIMENT_SCALE = 2.0
+
+# 모듈 로드 시 1회 컴파일 (긴 패턴 우선)
+_LEXICON = {}
+for _word, _weight in POSITIVE_LEXICON.items():
+    _LEXICON[_word] = ('positive', _weight, True)
+for _word, _weight in NEGATIVE_LEXICON.items():
+    _LEXICON[_word] = ('negative', _weight, True)
+for _token, _weight in POSITIVE_EMOTICONS.items():
+    _LEXICON[_token] = ('positive', _weight, False)
+for _token, _weight in NEGATIVE_EMOTICONS.items():
+    _LEXICON[_token] = ('negative', _weight, False)
+
+LEXICON_REGEX = re.compile(
+    '|'.join(re.escape(word) + ('+' if not is_word and len(word) == 2 and word[0] == word[1] else '')
+             for word, (_, _, is_word) in sorted(_LEXICON.items(), key=lambda item: len(item[0]), reverse=True))
+)
+INTENSIFIER_REGEX = re.compile(r'(?:' + '|'.join(map(re.escape, INTENSIFIERS)) + r')\s*$')
+EMOJI_REGEX = re.compile(
+    '[' + ''.join(f'{chr(start)}-{chr(end)}' for start, end in POSITIVE_EMOJI_RANGES + NEGATIVE_EMOJI_RANGES) + ']'
+)
+
+def score_sentiment(text: str) -> Dict[str, Any]:
+    """사전 기반 한국어 감정 분석 (Comprehend detect_sentiment와 같은 응답 형태)"""
+    positive = negative = 0.0
+
+    for match in LEXICON_REGEX.finditer(text):
+        token = match.group(0)
+        polarity, weight, is_word = _LEXICON.get(token) or _LEXICON[token[:2]]
+
+        if is_word:
+            before = text[max(0, match.start() - 6):match.start()]
+            if INTENSIFIER_REGEX.search(before):
+                weight *= INTENSIFIER_WEIGHT
+            if NEGATION_BEFORE.search(before) or NEGATION_AFTER.match(text[match.end():match.end() + 6]):
+                polarity = 'negative' if polarity == 'positive' else 'positive'
+                weight *= NEGATION_WEIGHT
+
+        if polarity == 'positive':
+            positive += weight
+        else:
+            negative += weight
+
+    for match in EMOJI_REGEX.finditer(text):
+        code = ord(match.group(0))
+        if any(start <= code <= end for start, end in NEGATIVE_EMOJI_RANGES):
+            negative += 1.0
+        else:
+            positive += 1.0
+
+    return build_sentiment_response(positive, negative)
+
+def build_sentiment_response(positive: float, negative: float) -> Dict[str, Any]:
+    """긍정/부정 점수를 Comprehend 형태의 확률 분포로 변환"""
+    strength = positive + negative
+    neutral_score = 1.0 / (1.0 + SENTIMENT_SCALE * strength)
+    remaining = 1.0 - neutral_score
+
+    mixed_score = 0.0
+    if positive and negative:
+        # 긍정과 부정이 비슷할수록 MIXED 비중 증가
+        mixed_score = remaining * 0.5 * min(positive, negative) / max(positive, negative)
+    rest = remaining - mixed_score
+
+    scores = {
+        'Positive': rest * positive / strength if strength else 0.0,
+        'Negative': rest * negative / strength if strength else 0.0,
+        'Neutral': neutral_score,
+        'Mixed': mixed_score
+    }
+    dominant = max(scores, key=scores.get)
+    return {'Sentiment': dominant.upper(), 'SentimentScore': scores}
+
+class LocalSentimentClient:
+    """Comprehend 클라이언트 대신 사용할 수 있는 로컬 감정 분석 클라이언트"""
+
+    def detect_sentiment(self, Text: str, LanguageCode: str = 'ko') -> Dict[str, Any]:
+        return score_sentiment(Text)
+
+    def batch_detect_sentiment(self, TextList: List[str], LanguageCode: str = 'ko') -> Dict[str, Any]:
+        return {
+            'ResultList': [{'Index': index, **score_sentiment(text)} for index, text in enumerate(TextList)],
+            'ErrorList': []
+        }
+
+    def detect_key_phrases(self, Text: str, LanguageCode: str = 'ko') -> Dict[str, Any]:
+        return {'KeyPhrases': []}
+
+    def detect_entities(self, Text: str, LanguageCode: str = 'ko') -> Dict[str, Any]:
+        return {'Entities': []}
+
+LOCAL_SENTIMENT_CLIENT = LocalSentimentClient()
+
+def resolve_sentiment_client(comprehend_client=None):
+    """설정된 엔진에 맞는 클라이언트 (local 엔진이거나 Comprehend 클라이언트가 없으면 로컬)"""
+    if SENTIMENT_ENGINE == 'local' or comprehend_client is None:
+        return LOCAL_SENTIMENT_CLIENT
+    return comprehend_client
+
+def fallback_sentiment_client() -> Optional[LocalSentimentClient]:
+    """Comprehend 실패 시 사용할 클라이언트 (SENTIMENT_FALLBACK=none 이면 None)"""
+    return LOCAL_SENTIMENT_CLIENT if SENTIMENT_FALLBACK == 'local' else None
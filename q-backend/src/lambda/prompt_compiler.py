@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable
+
+# 컴파일된 섹션 캐시 최대 항목 수 (웜 컨테이너 동안 유지)
+DEFAULT_MAX_SECTIONS = int(os.environ.get('PROMPT_SECTION_CACHE_MAX', '500'))
+
+class CompiledPrompt:
+    """고정 앞부분(stable)과 요청마다 바뀌는 뒷부분(dynamic)으로 나뉜 프롬프트"""
+
+    def __init__(self, stable: str, dynamic: str):
+        self.stable = stable
+        self.dynamic = dynamic
+
+    def __str__(self) -> str:
+        return self.stable + self.dynamic
+
+class SectionCache:
+    """프롬프트 섹션 캐시 ((종류, 대상)별 한 항목, 버전이 바뀌면 다시 컴파일)"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_SECTIONS):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (kind, owner) -> (version, text)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get_or_build(self, kind: str, owner: str, version: str, build: Callable[[], str]) -> str:
+        key = (kind, owner)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+
+        text = build()
+        with self._lock:
+            # 이전 버전은 새 버전으로 교체 (프로필 수정 시 무효화)
+            self._entries[key] = (version, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stats['misses'] += 1
+        return text
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'entries': len(self._entries),
+            'hit_ratio': self.stats['hits'] / lookups if lookups else 0.0
+        }
+
+def content_version(*parts: Any) -> str:
+    """섹션 입력값의 지문 (입력이 같으면 같은 버전)"""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
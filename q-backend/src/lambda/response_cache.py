@@ -0,0 +1,233 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+# 캐시 설정 (환경 변수)
+DEFAULT_TTL_SECONDS = int(os.environ.get('RESPONSE_CACHE_TTL', '3600'))
+DEFAULT_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '1000'))
+DEFAULT_SQLITE_PATH = os.environ.get('RESPONSE_CACHE_PATH', '/tmp/love_q_response_cache.db')
+
+# 유사도 검색 시 버킷당 최대 비교 후보 수
+MAX_SIMILARITY_CANDIDATES = 200
+
+NON_WORD_PATTERN = re.compile(r'[^\w]+')
+# ㅋㅋㅋㅋ, ㅠㅠㅠ 처럼 반복되는 문자는 2개로 축약
+REPEAT_PATTERN = re.compile(r'(.)\1{2,}')
+
+def normalize_text(text: str) -> str:
+    """캐시 키 생성을 위한 텍스트 정규화"""
+    text = unicodedata.normalize('NFC', text or '').lower()
+    text = REPEAT_PATTERN.sub(r'\1\1', text)
+    text = NON_WORD_PATTERN.sub(' ', text)
+    return ' '.join(text.split())
+
+def build_fingerprint(situation: str, context: str, response_type: str,
+                      partner_traits: Iterable[str], speech_style: str, scope: str = '') -> Dict[str, str]:
+    """답변 생성 입력의 정규화된 지문 생성 (scope가 다르면 유사도 검색 대상도 분리)"""
+    traits = sorted({normalize_text(trait) for trait in partner_traits if trait})
+    bucket = '|'.join([scope, response_type or '', speech_style or '', ','.join(traits)])
+    situation_text = normalize_text(situation)
+    context_text = normalize_text(context)
+
+    key_source = '\n'.join([bucket, situation_text, context_text])
+    return {
+        'key': hashlib.sha256(key_source.encode('utf-8')).hexdigest(),
+        'bucket': bucket,
+        'text': f"{situation_text} {context_text}".strip()
+    }
+
+def text_similarity(text_a: str, text_b: str) -> float:
+    """문자 바이그램 기반 Jaccard 유사도 (한국어 띄어쓰기 차이에 강함)"""
+    grams_a = _char_bigrams(text_a)
+    grams_b = _char_bigrams(text_b)
+    if not grams_a and not grams_b:
+        return 1.0
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+def _char_bigrams(text: str) -> set:
+    compact = text.replace(' ', '')
+    if len(compact) < 2:
+        return {compact} if compact else set()
+    return {compact[i:i + 2] for i in range(len(compact) - 1)}
+
+class MemoryCacheBackend:
+    """프로세스 내 LRU + TTL 캐시 (Lambda 웜 컨테이너 동안 유지)"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, bucket, text, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[3]
+
+    def set(self, key: str, bucket: str, text: str, value: Any, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, bucket, text, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def candidates(self, bucket: str) -> List[Tuple[str, str]]:
+        """같은 버킷의 (key, text) 목록 - 최근 사용 순"""
+        now = time.time()
+        with self._lock:
+            result = []
+            for key in reversed(self._entries):
+                expires_at, entry_bucket, text, _ = self._entries[key]
+                if entry_bucket == bucket and expires_at >= now:
+                    result.append((key, text))
+                    if len(result) >= MAX_SIMILARITY_CANDIDATES:
+                        break
+            return result
+
+class SQLiteCacheBackend:
+    """로컬 파일(SQLite) 캐시 - /tmp에 저장하여 같은 인스턴스의 재시작 간 공유"""
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                cache_key TEXT PRIMARY KEY,
+                bucket TEXT NOT NULL,
+                text TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_response_cache_bucket ON response_cache(bucket, last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM response_cache WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE response_cache SET last_access = ? WHERE cache_key = ?", (now, key)
+            )
+            self._conn.commit()
+            return json.loads(row[0])
+
+    def set(self, key: str, bucket: str, text: str, value: Any, ttl: int):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO response_cache (cache_key, bucket, text, value, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, bucket, text, json.dumps(value, ensure_ascii=False), now + ttl, now)
+            )
+            # LRU 정리: 만료 항목 삭제 후 최대 개수 초과분 제거
+            self._conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                """
+                DELETE FROM response_cache WHERE cache_key IN (
+                    SELECT cache_key FROM response_cache
+                    ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def candidates(self, bucket: str) -> List[Tuple[str, str]]:
+        with self._lock:
+            return self._conn.execute(
+                """
+                SELECT cache_key, text FROM response_cache
+                WHERE bucket = ? AND expires_at >= ?
+                ORDER BY last_access DESC LIMIT ?
+                """,
+                (bucket, time.time(), MAX_SIMILARITY_CANDIDATES)
+            ).fetchall()
+
+class ResponseCache:
+    """Bedrock 답변 캐시 (정확 일치 + 선택적 유사도 매칭)"""
+
+    def __init__(self, backend, ttl: int = DEFAULT_TTL_SECONDS,
+                 similarity_threshold: Optional[float] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.stats = {'hits': 0, 'similar_hits': 0, 'misses': 0, 'stores': 0}
+
+    def get(self, fingerprint: Dict[str, str]) -> Optional[List[Dict]]:
+        value = self.backend.get(fingerprint['key'])
+        if value is not None:
+            self.stats['hits'] += 1
+            return value
+
+        if self.similarity_threshold is not None:
+            for key, text in self.backend.candidates(fingerprint['bucket']):
+                if text_similarity(fingerprint['text'], text) >= self.similarity_threshold:
+                    value = self.backend.get(key)
+                    if value is not None:
+                        self.stats['hits'] += 1
+                        self.stats['similar_hits'] += 1
+                        return value
+
+        self.stats['misses'] += 1
+        return None
+
+    def set(self, fingerprint: Dict[str, str], responses: List[Dict]):
+        self.backend.set(fingerprint['key'], fingerprint['bucket'], fingerprint['text'], responses, self.ttl)
+        self.stats['stores'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 적중률 및 절약된 Bedrock 호출 수"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'lookups': lookups,
+            'hit_ratio': self.stats['hits'] / lookups if lookups else 0.0,
+            'bedrock_calls_saved': self.stats['hits']
+        }
+
+def create_response_cache_from_env() -> Optional[ResponseCache]:
+    """환경 변수 설정으로 캐시 생성 (RESPONSE_CACHE_BACKEND=none 이면 비활성화)"""
+    backend_name = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory').lower()
+
+    if backend_name == 'none':
+        return None
+    if backend_name == 'sqlite':
+        backend = SQLiteCacheBackend(DEFAULT_SQLITE_PATH, DEFAULT_MAX_ENTRIES)
+    else:
+        backend = MemoryCacheBackend(DEFAULT_MAX_ENTRIES)
+
+    threshold = os.environ.get('RESPONSE_CACHE_SIMILARITY')
+    return ResponseCache(
+        backend,
+        ttl=DEFAULT_TTL_SECONDS,
+        similarity_threshold=float(threshold) if threshold else None
+    )
@@ -1,15 +1,26 @@
 import json
+import os
 import re
 import boto3
-import os
-from typing import Dict, List, Any
+from typing import Dict, Any
+
+from speech_analyzer import analyze_messages
 
 # AWS 서비스 클라이언트
 comprehend = boto3.client('comprehend')
 lambda_client = boto3.client('lambda')
+s3_client = boto3.client('s3')
+
+# 비동기 분석 결과 저장 위치 (버킷은 환경 변수, 키는 서버에서 upload_id로 생성)
+RESULT_PREFIX = 'results/'
+UPLOAD_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
 
 def lambda_handler(event, context):
     """말투 분석 Lambda 함수"""
+    # file_upload의 내부 비동기 호출 (API Gateway 프록시 이벤트에는 없는 최상위 키)
+    if 'async_analysis' in event:
+        return handle_async_analysis(event['async_analysis'])
+    
     try:
         # CORS 헤더
         headers = {
@@ -38,19 +49,8 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Messages are required'})
             }
         
-        # 말투 분석 수행
-        speech_analysis = analyze_speech_style(messages)
-        
-        # 감정 분석 수행 (Comprehend)
-        emotion_analysis = analyze_emotions(messages)
-        
-        # 결과 결합
-        combined_result = {
-            **speech_analysis,
-            'emotion_data': emotion_analysis,
-            'personality_traits': extract_personality_traits(speech_analysis, emotion_analysis),
-            'response_examples': generate_response_examples(messages[:3])  # 처음 3개 메시지만
-        }
+        # 말투 + 감정 분석 (공용 분석 모듈)
+        combined_result = analyze_messages(messages, comprehend, body.get('sentiment_mode'))
         
         return {
             'statusCode': 200,
@@ -66,140 +66,33 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
-def analyze_speech_style(messages: List[str]) -> Dict[str, Any]:
-    """사용자 말투 분석"""
-    total_msgs = len(messages)
-    if total_msgs == 0:
-        return {
-            "formal_ratio": 0.5,
-            "emoji_ratio": 0.2,
-            "avg_length": 10,
-            "total_messages": 0,
-            "tone": "neutral",
-            "speech_style": "casual"
-        }
-    
-    # 존댓말 패턴 분석
-    formal_patterns = ['요', '습니다', '해요', '입니다', '세요', '시죠', '죠']
-    formal_count = sum(1 for msg in messages 
-                      if any(pattern in msg for pattern in formal_patterns))
-    
-    # 이모티콘 분석
-    emoji_pattern = r'[😀-🙏ㅋㅎㅠㅜ]|:\)|:\(|:D|XD|><|T_T|\^\^'
-    emoji_count = sum(len(re.findall(emoji_pattern, msg)) for msg in messages)
-    
-    # 평균 메시지 길이
-    avg_length = sum(len(msg) for msg in messages) / total_msgs
-    
-    # 톤 분석
-    positive_words = ['좋아', '최고', '대박', '완전', '진짜', '헐', '와']
-    negative_words = ['싫어', '별로', '아니', '안돼', '힘들어', 'ㅠㅠ']
-    
-    positive_count = sum(1 for msg in messages 
-                        if any(word in msg for word in positive_words))
-    negative_count = sum(1 for msg in messages 
-                        if any(word in msg for word in negative_words))
-    
-    if positive_count > negative_count:
-        tone = "positive"
-    elif negative_count > positive_count:
-        tone = "negative"
-    else:
-        tone = "neutral"
-    
-    # 말투 스타일 결정
-    formal_ratio = formal_count / total_msgs
-    if formal_ratio > 0.7:
-        speech_style = "formal"
-    elif formal_ratio > 0.3:
-        speech_style = "semi_formal"
-    else:
-        speech_style = "casual"
-    
-    return {
-        "formal_ratio": formal_ratio,
-        "emoji_ratio": emoji_count / total_msgs,
-        "avg_length": avg_length,
-        "total_messages": total_msgs,
-        "tone": tone,
-        "speech_style": speech_style
-    }
-
-def analyze_emotions(messages: List[str]) -> Dict[str, Any]:
-    """Comprehend를 사용한 감정 분석"""
+def handle_async_analysis(request: Dict[str, Any], client=None) -> Dict[str, Any]:
+    """file_upload async 모드 분석 후 S3_BUCKET의 results/<upload_id>.json에 결과 저장"""
+    client = client or s3_client
+    bucket = os.environ.get('S3_BUCKET')
+    upload_id = request.get('upload_id') or ''
+    if not bucket or not UPLOAD_ID_PATTERN.fullmatch(upload_id):
+        print(f"Invalid async speech analysis request: {upload_id!r}")
+        return {'status': 'rejected'}
+    
+    messages = request.get('messages') or []
     try:
-        # 메시지들을 하나의 텍스트로 결합 (최대 5000자 제한)
-        combined_text = ' '.join(messages)[:5000]
-        
-        if not combined_text.strip():
-            return {
-                'sentiment': 'NEUTRAL',
-                'sentiment_confidence': 0.5,
-                'emotions': {'neutral': 1.0}
-            }
-        
-        # Comprehend 감정 분석
-        sentiment_response = comprehend.detect_sentiment(
-            Text=combined_text,
-            LanguageCode='ko'  # 한국어
-        )
-        
-        return {
-            'sentiment': sentiment_response['Sentiment'],
-            'sentiment_confidence': max(sentiment_response['SentimentScore'].values()),
-            'emotions': sentiment_response['SentimentScore']
+        if not messages:
+            raise ValueError('Messages are required')
+        result = {
+            'upload_id': upload_id,
+            'status': 'completed',
+            'analysis': analyze_messages(messages, comprehend, request.get('sentiment_mode'))
         }
-        
     except Exception as e:
-        print(f"Emotion analysis error: {e}")
-        # 폴백: 기본 감정 분석
-        return {
-            'sentiment': 'NEUTRAL',
-            'sentiment_confidence': 0.5,
-            'emotions': {'neutral': 1.0}
-        }
-
-def extract_personality_traits(speech_data: Dict, emotion_data: Dict) -> List[str]:
-    """말투와 감정 데이터를 기반으로 성격 특성 추출"""
-    traits = []
-    
-    # 말투 기반 특성
-    if speech_data['formal_ratio'] > 0.7:
-        traits.append('정중함')
-    elif speech_data['formal_ratio'] < 0.3:
-        traits.append('친근함')
-    
-    if speech_data['emoji_ratio'] > 0.5:
-        traits.append('표현력 풍부')
-    elif speech_data['emoji_ratio'] < 0.1:
-        traits.append('간결함')
-    
-    if speech_data['avg_length'] > 50:
-        traits.append('상세함')
-    elif speech_data['avg_length'] < 15:
-        traits.append('간단명료')
-    
-    # 감정 기반 특성
-    sentiment = emotion_data.get('sentiment', 'NEUTRAL')
-    if sentiment == 'POSITIVE':
-        traits.append('긍정적')
-    elif sentiment == 'NEGATIVE':
-        traits.append('신중함')
-    
-    return traits[:5]  # 최대 5개 특성
-
-def generate_response_examples(messages: List[str]) -> List[str]:
-    """사용자 메시지 스타일을 기반으로 응답 예시 생성"""
-    if not messages:
-        return ['안녕!', '좋아!', '그렇구나~']
-    
-    examples = []
-    for msg in messages[:3]:
-        if len(msg) > 5:  # 너무 짧은 메시지는 제외
-            examples.append(msg)
-    
-    # 부족하면 기본 예시 추가
-    while len(examples) < 3:
-        examples.extend(['네!', '좋아요', '그렇네요'])
-    
-    return examples[:3]
+        print(f"Async speech analysis error ({upload_id}): {e}")
+        result = {'upload_id': upload_id, 'status': 'failed', 'error': str(e)}
+    
+    result_key = f"{RESULT_PREFIX}{upload_id}.json"
+    client.put_object(
+        Bucket=bucket,
+        Key=result_key,
+        Body=json.dumps(result, ensure_ascii=False).encode('utf-8'),
+        ContentType='application/json'
+    )
+    return {'status': result['status'], 'result_key': result_key}
@@ -0,0 +1,389 @@
+import os
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+from korean_sentiment import resolve_sentiment_client, fallback_sentiment_client
+from keyword_matcher import (
+    compile_presence_pattern, minimal_patterns, FORMAL_PATTERNS, POSITIVE_WORDS, NEGATIVE_WORDS
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy가 없는 배포 환경에서는 단일 순회 분석만 사용
+    np = None
+
+# 모듈 로드 시 1회 컴파일
+FORMAL_REGEX = compile_presence_pattern(FORMAL_PATTERNS)
+POSITIVE_REGEX = compile_presence_pattern(POSITIVE_WORDS)
+NEGATIVE_REGEX = compile_presence_pattern(NEGATIVE_WORDS)
+FORMAL_KEYS = minimal_patterns(FORMAL_PATTERNS)
+POSITIVE_KEYS = minimal_patterns(POSITIVE_WORDS)
+NEGATIVE_KEYS = minimal_patterns(NEGATIVE_WORDS)
+EMOJI_REGEX = re.compile(r'[😀-🙏ㅋㅎㅠㅜ]|:\)|:\(|:D|XD|><|T_T|\^\^')
+
+# NumPy 경로용 이모티콘 정의 (EMOJI_REGEX와 동일한 집합)
+EMOJI_CODE_RANGE = (ord('😀'), ord('🙏'))
+EMOJI_JAMO_CODES = [ord(ch) for ch in 'ㅋㅎㅠㅜ']
+EMOJI_TOKENS = [':)', ':(', ':D', 'XD', '><', 'T_T', '^^']
+
+# 배치 분석 설정
+BATCH_THRESHOLD = 10000
+BATCH_CHUNK_SIZE = 20000
+# 고정 폭 배열은 가장 긴 메시지 길이로 잡히므로 이보다 긴 메시지는 단일 순회로 처리
+BATCH_MAX_MESSAGE_LENGTH = int(os.environ.get('BATCH_MAX_MESSAGE_LENGTH', '1000'))
+
+# 감정 분석을 할 수 없을 때의 기본값
+NEUTRAL_EMOTION = {
+    'sentiment': 'NEUTRAL',
+    'sentiment_confidence': 0.5,
+    'emotions': {'neutral': 1.0}
+}
+
+# Comprehend 감정 분석 방식: single(앞부분 5000자 1회 호출) / batch(메시지 구간별 batch_detect_sentiment)
+SENTIMENT_MODE = os.environ.get('SENTIMENT_MODE', 'single').lower()
+
+# batch_detect_sentiment 제한: 요청당 문서 25개, 문서당 5000바이트(UTF-8)
+COMPREHEND_BATCH_SIZE = 25
+COMPREHEND_MAX_BYTES = 5000
+# 구간(window)당 최대 메시지 수 (시계열 해상도)
+SENTIMENT_WINDOW_MESSAGES = int(os.environ.get('SENTIMENT_WINDOW_MESSAGES', '50'))
+# 대용량 업로드 비용 상한 (초과 시 전체 구간에서 고르게 표본 추출)
+SENTIMENT_MAX_BATCHES = int(os.environ.get('SENTIMENT_MAX_BATCHES', '20'))
+
+SENTIMENT_LABELS = ['Positive', 'Negative', 'Neutral', 'Mixed']
+
+def analyze_messages(messages: List[str], comprehend_client=None,
+                     sentiment_mode: Optional[str] = None) -> Dict[str, Any]:
+    """말투 + 감정 분석 결과 결합 (speech_analysis, file_upload 공용)"""
+    # 말투 분석 수행 (대용량은 NumPy 배치 경로)
+    if len(messages) >= BATCH_THRESHOLD:
+        speech_analysis = analyze_speech_style_batch(messages)
+    else:
+        speech_analysis = analyze_speech_style(messages)
+    
+    # 감정 분석 수행 (Comprehend)
+    if (sentiment_mode or SENTIMENT_MODE) == 'batch':
+        emotion_analysis = analyze_emotions_batched(messages, comprehend_client)
+    else:
+        emotion_analysis = analyze_emotions(messages, comprehend_client)
+    
+    return {
+        **speech_analysis,
+        'emotion_data': emotion_analysis,
+        'personality_traits': extract_personality_traits(speech_analysis, emotion_analysis),
+        'response_examples': generate_response_examples(messages[:3])  # 처음 3개 메시지만
+    }
+
+def analyze_speech_style(messages: List[str]) -> Dict[str, Any]:
+    """사용자 말투 분석 (메시지 목록 한 번 순회)"""
+    total_msgs = len(messages)
+    if total_msgs == 0:
+        return build_speech_result(0, 0, 0, 0, 0, 0)
+    
+    return build_speech_result(total_msgs, *_count_speech_features(messages))
+
+def _count_speech_features(messages: List[str]) -> Tuple[int, int, int, int, int]:
+    """(존댓말, 이모티콘, 전체 길이, 긍정, 부정) 개수를 메시지 한 번 순회로 집계"""
+    formal_count = emoji_count = total_length = positive_count = negative_count = 0
+    
+    formal_search = FORMAL_REGEX.search
+    positive_search = POSITIVE_REGEX.search
+    negative_search = NEGATIVE_REGEX.search
+    emoji_findall = EMOJI_REGEX.findall
+    
+    for msg in messages:
+        if formal_search(msg):
+            formal_count += 1
+        if positive_search(msg):
+            positive_count += 1
+        if negative_search(msg):
+            negative_count += 1
+        emoji_count += len(emoji_findall(msg))
+        total_length += len(msg)
+    
+    return formal_count, emoji_count, total_length, positive_count, negative_count
+
+def analyze_speech_style_batch(messages: List[str]) -> Dict[str, Any]:
+    """대용량(1만~100만 건) 메시지용 NumPy 벡터화 말투 분석 (analyze_speech_style과 동일 결과)"""
+    total_msgs = len(messages)
+    if np is None or total_msgs < BATCH_THRESHOLD:
+        return analyze_speech_style(messages)
+    
+    formal_count = emoji_count = total_length = positive_count = negative_count = 0
+    
+    # 고정 폭 유니코드 배열 메모리를 제한하기 위해 청크 단위로 처리
+    for start in range(0, total_msgs, BATCH_CHUNK_SIZE):
+        chunk = messages[start:start + BATCH_CHUNK_SIZE]
+        
+        # 긴 메시지는 청크 전체 배열 폭을 키우지 않도록 따로 순회 집계
+        long_messages = [msg for msg in chunk if len(msg) > BATCH_MAX_MESSAGE_LENGTH]
+        if long_messages:
+            chunk = [msg for msg in chunk if len(msg) <= BATCH_MAX_MESSAGE_LENGTH]
+            counts = _count_speech_features(long_messages)
+            formal_count += counts[0]
+            emoji_count += counts[1]
+            total_length += counts[2]
+            positive_count += counts[3]
+            negative_count += counts[4]
+            if not chunk:
+                continue
+        
+        arr = np.array(chunk, dtype=str)
+        
+        formal_count += _count_containing(arr, FORMAL_KEYS)
+        positive_count += _count_containing(arr, POSITIVE_KEYS)
+        negative_count += _count_containing(arr, NEGATIVE_KEYS)
+        emoji_count += _count_emojis(arr)
+        # np.str_는 끝의 NUL 문자를 잘라내므로 길이는 원본 문자열로 계산
+        total_length += sum(map(len, chunk))
+    
+    return build_speech_result(total_msgs, formal_count, emoji_count, total_length,
+                               positive_count, negative_count)
+
+def _count_containing(arr, patterns: List[str]) -> int:
+    """패턴 중 하나라도 포함하는 메시지 수"""
+    found = np.zeros(len(arr), dtype=bool)
+    for pattern in patterns:
+        found |= np.char.find(arr, pattern) >= 0
+    return int(found.sum())
+
+def _count_emojis(arr) -> int:
+    """EMOJI_REGEX.findall 결과 개수의 합과 동일한 값 계산"""
+    codes = arr.view(np.uint32).reshape(len(arr), -1)
+    single_chars = (codes >= EMOJI_CODE_RANGE[0]) & (codes <= EMOJI_CODE_RANGE[1])
+    for code in EMOJI_JAMO_CODES:
+        single_chars |= codes == code
+    
+    # 토큰끼리는 문자를 공유하지 않으므로 겹침 없는 개수 합이 정규식 결과와 같음
+    token_count = sum(int(np.char.count(arr, token).sum()) for token in EMOJI_TOKENS)
+    return int(single_chars.sum()) + token_count
+
+def build_speech_result(total_msgs: int, formal_count: int, emoji_count: int, total_length: int,
+                        positive_count: int, negative_count: int) -> Dict[str, Any]:
+    """집계값으로 말투 분석 결과 구성"""
+    if total_msgs == 0:
+        return {
+            "formal_ratio": 0.5,
+            "emoji_ratio": 0.2,
+            "avg_length": 10,
+            "total_messages": 0,
+            "tone": "neutral",
+            "speech_style": "casual"
+        }
+    
+    # 톤 분석
+    if positive_count > negative_count:
+        tone = "positive"
+    elif negative_count > positive_count:
+        tone = "negative"
+    else:
+        tone = "neutral"
+    
+    # 말투 스타일 결정
+    formal_ratio = formal_count / total_msgs
+    if formal_ratio > 0.7:
+        speech_style = "formal"
+    elif formal_ratio > 0.3:
+        speech_style = "semi_formal"
+    else:
+        speech_style = "casual"
+    
+    return {
+        "formal_ratio": formal_ratio,
+        "emoji_ratio": emoji_count / total_msgs,
+        "avg_length": total_length / total_msgs,
+        "total_messages": total_msgs,
+        "tone": tone,
+        "speech_style": speech_style
+    }
+
+def analyze_emotions(messages: List[str], comprehend_client=None) -> Dict[str, Any]:
+    """Comprehend를 사용한 감정 분석 (클라이언트가 없거나 SENTIMENT_ENGINE=local이면 로컬 분석)"""
+    client = resolve_sentiment_client(comprehend_client)
+    
+    try:
+        # 메시지들을 하나의 텍스트로 결합 (최대 5000자 제한)
+        combined_text = ' '.join(messages)[:5000]
+        
+        if not combined_text.strip():
+            return dict(NEUTRAL_EMOTION)
+        
+        # Comprehend 감정 분석 (실패 시 로컬 분석으로 대체)
+        try:
+            sentiment_response = client.detect_sentiment(
+                Text=combined_text,
+                LanguageCode='ko'  # 한국어
+            )
+        except Exception as e:
+            fallback = fallback_sentiment_client()
+            if fallback is None or fallback is client:
+                raise
+            print(f"Emotion analysis error, using local engine: {e}")
+            sentiment_response = fallback.detect_sentiment(Text=combined_text, LanguageCode='ko')
+        
+        return {
+            'sentiment': sentiment_response['Sentiment'],
+            'sentiment_confidence': max(sentiment_response['SentimentScore'].values()),
+            'emotions': sentiment_response['SentimentScore']
+        }
+        
+    except Exception as e:
+        print(f"Emotion analysis error: {e}")
+        # 폴백: 기본 감정 분석
+        return dict(NEUTRAL_EMOTION)
+
+def analyze_emotions_batched(messages: List[str], comprehend_client=None,
+                             max_batches: int = SENTIMENT_MAX_BATCHES) -> Dict[str, Any]:
+    """메시지 구간별 batch_detect_sentiment 결과를 길이 가중 평균으로 집계하고 시계열 반환"""
+    client = resolve_sentiment_client(comprehend_client)
+    fallback = fallback_sentiment_client()
+    if fallback is client:
+        fallback = None
+    
+    windows = build_sentiment_windows(messages)
+    if not windows:
+        return dict(NEUTRAL_EMOTION)
+    
+    selected = sample_windows(windows, max_batches * COMPREHEND_BATCH_SIZE)
+    
+    timeline = []
+    weighted = {label: 0.0 for label in SENTIMENT_LABELS}
+    total_weight = 0
+    
+    for start in range(0, len(selected), COMPREHEND_BATCH_SIZE):
+        batch = selected[start:start + COMPREHEND_BATCH_SIZE]
+        text_list = [text for _, _, text in batch]
+        try:
+            response = client.batch_detect_sentiment(TextList=text_list, LanguageCode='ko')  # 한국어
+        except Exception as e:
+            print(f"Batch emotion analysis error: {e}")
+            if fallback is None:
+                continue
+            response = fallback.batch_detect_sentiment(TextList=text_list, LanguageCode='ko')
+        
+        results = list(response.get('ResultList', []))
+        if response.get('ErrorList'):
+            print(f"Batch emotion analysis item errors: {len(response['ErrorList'])}")
+            # 실패한 문서만 로컬 분석으로 대체
+            if fallback is not None:
+                for error in response['ErrorList']:
+                    local = fallback.detect_sentiment(Text=text_list[error['Index']], LanguageCode='ko')
+                    results.append({'Index': error['Index'], **local})
+        
+        for item in results:
+            first, last, text = batch[item['Index']]
+            scores = item['SentimentScore']
+            weight = len(text)
+            for label in SENTIMENT_LABELS:
+                weighted[label] += scores.get(label, 0.0) * weight
+            total_weight += weight
+            timeline.append({
+                'start_message': first,
+                'end_message': last,
+                'sentiment': item['Sentiment'],
+                'scores': scores
+            })
+    
+    if not total_weight:
+        return dict(NEUTRAL_EMOTION)
+    
+    emotions = {label: weighted[label] / total_weight for label in SENTIMENT_LABELS}
+    dominant = max(SENTIMENT_LABELS, key=lambda label: emotions[label])
+    timeline.sort(key=lambda point: point['start_message'])
+    
+    return {
+        'sentiment': dominant.upper(),
+        'sentiment_confidence': emotions[dominant],
+        'emotions': emotions,
+        'timeline': timeline,
+        'windows_analyzed': len(timeline),
+        'windows_total': len(windows)
+    }
+
+def build_sentiment_windows(messages: List[str], max_bytes: int = COMPREHEND_MAX_BYTES,
+                            max_messages: int = SENTIMENT_WINDOW_MESSAGES) -> List[Tuple[int, int, str]]:
+    """연속된 메시지를 문서 크기 제한 안에서 묶어 (첫 메시지, 마지막 메시지, 텍스트) 구간 목록 생성"""
+    windows = []
+    parts = []
+    size = 0
+    first = last = 0
+    
+    for index, msg in enumerate(messages):
+        msg = msg.strip()
+        if not msg:
+            continue
+        
+        msg_bytes = len(msg.encode('utf-8'))
+        if msg_bytes > max_bytes:
+            # 한 메시지가 제한을 넘으면 UTF-8 경계에서 자름
+            msg = msg.encode('utf-8')[:max_bytes].decode('utf-8', 'ignore')
+            msg_bytes = len(msg.encode('utf-8'))
+        
+        if parts and (size + 1 + msg_bytes > max_bytes or len(parts) >= max_messages):
+            windows.append((first, last, ' '.join(parts)))
+            parts = []
+            size = 0
+        
+        if not parts:
+            first = index
+            size = msg_bytes
+        else:
+            size += 1 + msg_bytes
+        parts.append(msg)
+        last = index
+    
+    if parts:
+        windows.append((first, last, ' '.join(parts)))
+    return windows
+
+def sample_windows(windows: List[Tuple[int, int, str]], limit: int) -> List[Tuple[int, int, str]]:
+    """구간 수가 상한을 넘으면 전체 대화에 걸쳐 고른 간격으로 선택"""
+    if len(windows) <= limit:
+        return windows
+    step = len(windows) / limit
+    return [windows[int(i * step)] for i in range(limit)]
+
+def extract_personality_traits(speech_data: Dict, emotion_data: Dict) -> List[str]:
+    """말투와 감정 데이터를 기반으로 성격 특성 추출"""
+    traits = []
+    
+    # 말투 기반 특성
+    if speech_data['formal_ratio'] > 0.7:
+        traits.append('정중함')
+    elif speech_data['formal_ratio'] < 0.3:
+        traits.append('친근함')
+    
+    if speech_data['emoji_ratio'] > 0.5:
+        traits.append('표현력 풍부')
+    elif speech_data['emoji_ratio'] < 0.1:
+        traits.append('간결함')
+    
+    if speech_data['avg_length'] > 50:
+        traits.append('상세함')
+    elif speech_data['avg_length'] < 15:
+        traits.append('간단명료')
+    
+    # 감정 기반 특성
+    sentiment = emotion_data.get('sentiment', 'NEUTRAL')
+    if sentiment == 'POSITIVE':
+        traits.append('긍정적')
+    elif sentiment == 'NEGATIVE':
+        traits.append('신중함')
+    
+    return traits[:5]  # 최대 5개 특성
+
+def generate_response_examples(messages: List[str]) -> List[str]:
+    """사용자 메시지 스타일을 기반으로 응답 예시 생성"""
+    if not messages:
+        return ['안녕!', '좋아!', '그렇구나~']
+    
+    examples = []
+    for msg in messages[:3]:
+        if len(msg) > 5:  # 너무 짧은 메시지는 제외
+            examples.append(msg)
+    
+    # 부족하면 기본 예시 추가
+    while len(examples) < 3:
+        examples.extend(['네!', '좋아요', '그렇네요'])
+    
+    return examples[:3]
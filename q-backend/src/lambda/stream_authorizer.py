@@ -0,0 +1,62 @@
+import base64
+import json
+import os
+import boto3
+from typing import Dict, Any, Optional
+
+# AWS 서비스 클라이언트
+cognito_client = boto3.client('cognito-idp')
+
+COGNITO_USER_POOL_ID = os.environ.get('COGNITO_USER_POOL_ID', '')
+COGNITO_CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID', '')
+
+def lambda_handler(event, context):
+    """WebSocket $connect 권한 부여자 (쿼리 문자열 token의 Cognito 액세스 토큰 검증)"""
+    token = (event.get('queryStringParameters') or {}).get('token', '')
+    user_id = verify_access_token(token) if token else None
+    if not user_id:
+        print("WebSocket connect rejected: missing or invalid token")
+        # API Gateway가 401로 연결 거부
+        raise Exception('Unauthorized')
+
+    # context 값은 이 연결의 모든 라우트 requestContext.authorizer로 전달됨
+    return {
+        'principalId': user_id,
+        'policyDocument': {
+            'Version': '2012-10-17',
+            'Statement': [{
+                'Action': 'execute-api:Invoke',
+                'Effect': 'Allow',
+                'Resource': event['methodArn']
+            }]
+        },
+        'context': {'user_id': user_id}
+    }
+
+def verify_access_token(token: str, client=None) -> Optional[str]:
+    """Cognito가 검증한 액세스 토큰의 사용자 ID (sub, 이 사용자 풀/앱 클라이언트 토큰이 아니면 None)"""
+    client = client or cognito_client
+    try:
+        # 서명/만료/폐기 여부는 Cognito GetUser가 확인
+        response = client.get_user(AccessToken=token)
+    except Exception as e:
+        print(f"Access token verification error: {e}")
+        return None
+
+    # GetUser는 다른 사용자 풀의 토큰도 받으므로 발급자와 앱 클라이언트를 확인
+    claims = decode_claims(token)
+    issuer_pool = claims.get('iss', '').rsplit('/', 1)[-1]
+    if issuer_pool != COGNITO_USER_POOL_ID or claims.get('client_id') != COGNITO_CLIENT_ID:
+        print(f"Access token from another user pool or client: {claims.get('iss')}")
+        return None
+
+    attributes = {attr['Name']: attr['Value'] for attr in response.get('UserAttributes', [])}
+    return attributes.get('sub') or claims.get('sub')
+
+def decode_claims(token: str) -> Dict[str, Any]:
+    """JWT 페이로드 디코딩 (서명은 GetUser에서 이미 검증됨)"""
+    try:
+        payload = token.split('.')[1]
+        return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except (IndexError, ValueError):
+        return {}
@@ -0,0 +1,114 @@
+import os
+from datetime import datetime
+from typing import Dict, List, Any, Tuple
+
+import dsql
+
+# 반영 설정 (환경 변수)
+# 한 번의 반영에서 꺼내는 증분 행 수 (DSQL 트랜잭션 크기 제한 내)
+FLUSH_BATCH_SIZE = int(os.environ.get('USAGE_STATS_FLUSH_BATCH', '2000'))
+# 한 번의 스케줄 호출에서 반복하는 최대 반영 횟수
+MAX_FLUSH_ROUNDS = int(os.environ.get('USAGE_STATS_MAX_FLUSH_ROUNDS', '20'))
+
+# 대화 1건당 생성되는 답변 수
+RESPONSES_PER_CONVERSATION = 3
+
+def group_conversations(conversations: List[Dict[str, Any]]) -> Dict[Tuple[str, str], List[int]]:
+    """대화 목록을 (user_id, date)별 [conversations_count, responses_generated] 증분으로 묶음"""
+    today = datetime.now().date().isoformat()
+    groups = {}
+    for conversation in conversations:
+        date = str(conversation['created_at'])[:10] if conversation.get('created_at') else today
+        counts = groups.setdefault((conversation['user_id'], date), [0, 0])
+        counts[0] += 1
+        counts[1] += RESPONSES_PER_CONVERSATION
+    return groups
+
+def append_deltas(tx, groups: Dict[Tuple[str, str], List[int]]):
+    """증분을 usage_stats_deltas에 추가 (대화 저장과 같은 트랜잭션, usage_stats 행은 잠그지 않음)"""
+    if not groups:
+        return
+
+    params = {}
+    rows = []
+    for index, ((user_id, date), (conversations, responses)) in enumerate(groups.items()):
+        params.update({
+            f"user_id_{index}": user_id,
+            f"date_{index}": date,
+            f"conversations_{index}": conversations,
+            f"responses_{index}": responses
+        })
+        rows.append(
+            f"(%(user_id_{index})s, %(date_{index})s::date, %(conversations_{index})s::int, "
+            f"%(responses_{index})s::int)"
+        )
+
+    tx.execute(f"""
+        INSERT INTO usage_stats_deltas (user_id, date, conversations, responses)
+        VALUES {', '.join(rows)}
+    """, params)
+
+def flush(limit: int = FLUSH_BATCH_SIZE) -> Dict[str, int]:
+    """쌓인 증분을 꺼내 (user_id, date)별로 합치고 한 번의 UPSERT로 반영
+
+    증분 삭제와 UPSERT가 한 트랜잭션이라 실패하면 둘 다 취소되고 증분은 다음 반영에서 다시 처리됨
+    """
+    with dsql.transaction() as tx:
+        rows = tx.fetch_all("""
+            DELETE FROM usage_stats_deltas
+            WHERE delta_id IN (
+                SELECT delta_id FROM usage_stats_deltas ORDER BY delta_id LIMIT %(limit)s
+            )
+            RETURNING user_id, date, conversations, responses
+        """, {'limit': limit})
+
+        pending = {}
+        for row in rows:
+            counts = pending.setdefault((row['user_id'], str(row['date'])), [0, 0])
+            counts[0] += row['conversations']
+            counts[1] += row['responses']
+
+        if pending:
+            write_usage_stats(tx, pending)
+
+    return {'deltas': len(rows), 'groups': len(pending)}
+
+def flush_handler(event, context):
+    """증분 반영 작업 (EventBridge 스케줄)"""
+    deltas = groups = 0
+    for _ in range(MAX_FLUSH_ROUNDS):
+        result = flush(FLUSH_BATCH_SIZE)
+        deltas += result['deltas']
+        groups += result['groups']
+        if result['deltas'] < FLUSH_BATCH_SIZE:
+            break
+
+    print(f"Flushed {deltas} usage stats deltas into {groups} (user, date) groups")
+    return {'deltas': deltas, 'groups': groups}
+
+def write_usage_stats(tx, pending: Dict[Tuple[str, str], Any]):
+    """(user_id, date)별 증분을 multi-row UPSERT 한 번으로 반영"""
+    params = {}
+    rows = []
+    for index, ((user_id, date), (conversations, responses)) in enumerate(pending.items()):
+        params.update({
+            f"user_id_{index}": user_id,
+            f"date_{index}": date,
+            f"conversations_{index}": conversations,
+            f"responses_{index}": responses
+        })
+        rows.append(
+            f"(%(user_id_{index})s, %(date_{index})s::date, %(conversations_{index})s::int, "
+            f"%(responses_{index})s::int, NOW())"
+        )
+
+    sql = f"""
+    INSERT INTO usage_stats (user_id, date, conversations_count, responses_generated, created_at)
+    VALUES {', '.join(rows)}
+    ON CONFLICT (user_id, date)
+    DO UPDATE SET
+        conversations_count = usage_stats.conversations_count + EXCLUDED.conversations_count,
+        responses_generated = usage_stats.responses_generated + EXCLUDED.responses_generated
+    """
+
+    tx.execute(sql, params)
@@ -4,10 +4,15 @@ import os
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+import dsql
+import dashboard_summary
+
 # AWS 서비스 클라이언트
-dsql_client = boto3.client('dsql')
 cognito_client = boto3.client('cognito-idp')
 
+# user_profiles 외에 users 테이블에 저장되는 필드
+USER_FIELDS = {'username'}
+
 def lambda_handler(event, context):
     """사용자 프로필 관리 Lambda 함수"""
     try:
@@ -216,69 +221,38 @@ def update_user_profile(event, headers) -> Dict[str, Any]:
 def get_profile_from_dsql(user_id: str) -> Optional[Dict[str, Any]]:
     """DSQL에서 사용자 프로필 조회"""
     try:
-        # 실제로는 DSQL 쿼리 실행
         sql = """
         SELECT 
             u.user_id, u.email, u.username, u.subscription_type, u.created_at,
             up.total_messages, up.formal_ratio, up.emoji_ratio, up.avg_length,
             up.tone, up.speech_style, up.personality_traits, up.response_examples,
             up.last_analysis_at,
-            uc.credits_remaining, uc.credits_used
+            uc.credits_remaining, uc.credits_used, uc.credits_reserved
         FROM users u
         LEFT JOIN user_profiles up ON u.user_id = up.user_id
         LEFT JOIN user_credits uc ON u.user_id = uc.user_id
         WHERE u.user_id = %(user_id)s AND u.is_active = true
         """
         
-        # 시뮬레이션 데이터
-        profile_data = {
-            'user_id': user_id,
-            'email': 'user@example.com',
-            'username': 'testuser',
-            'subscription_type': 'free',
-            'total_messages': 25,
-            'formal_ratio': 0.3,
-            'emoji_ratio': 0.4,
-            'avg_length': 28.5,
-            'tone': 'positive',
-            'speech_style': 'casual',
-            'personality_traits': ['친근함', '표현력 풍부', '긍정적'],
-            'response_examples': ['안녕!', '좋아요!', '그렇구나~'],
-            'credits_remaining': 7,
-            'credits_used': 3,
-            'last_analysis_at': datetime.now().isoformat(),
-            'created_at': datetime.now().isoformat()
-        }
-        
-        return profile_data
+        return dsql.fetch_one(sql, {'user_id': user_id})
         
     except Exception as e:
         print(f"Get profile from DSQL error: {e}")
         return None
 
 def get_dashboard_data(user_id: str) -> Dict[str, Any]:
-    """대시보드 데이터 조회"""
+    """대시보드 데이터 조회 (사용자별 요약 테이블, 대화 수와 무관한 비용)"""
     try:
-        # 실제로는 DSQL 뷰에서 조회
-        sql = """
-        SELECT * FROM user_dashboard WHERE user_id = %(user_id)s
+        # 최근 7일 활동
+        activity_sql = """
+        SELECT date, conversations_count AS conversations, avg_response_rating AS avg_rating
+        FROM usage_stats
+        WHERE user_id = %(user_id)s AND date >= CURRENT_DATE - 6
+        ORDER BY date DESC
         """
         
-        # 시뮬레이션 데이터
-        dashboard_data = {
-            'total_conversations': 15,
-            'today_conversations': 3,
-            'avg_response_rating': 4.2,
-            'overall_success_rate': 0.85,
-            'favorite_response_type': '표준형',
-            'recent_activity': [
-                {
-                    'date': datetime.now().date().isoformat(),
-                    'conversations': 3,
-                    'avg_rating': 4.5
-                }
-            ]
-        }
+        dashboard_data = dashboard_summary.get_summary(user_id)
+        dashboard_data['recent_activity'] = dsql.fetch_all(activity_sql, {'user_id': user_id})
         
         return dashboard_data
         
@@ -289,8 +263,6 @@ def get_dashboard_data(user_id: str) -> Dict[str, Any]:
 def create_user_in_dsql(user_data: Dict, profile_data: Dict, credit_data: Dict):
     """DSQL에 새 사용자 생성"""
     try:
-        # 실제로는 트랜잭션으로 처리
-        
         # 1. users 테이블 삽입
         user_sql = """
         INSERT INTO users (user_id, email, username, subscription_type, created_at)
@@ -314,6 +286,18 @@ def create_user_in_dsql(user_data: Dict, profile_data: Dict, credit_data: Dict):
         VALUES (%(user_id)s, %(credits_remaining)s, %(credits_used)s, NOW())
         """
         
+        profile_params = {
+            **profile_data,
+            'personality_traits': json.dumps(profile_data['personality_traits'], ensure_ascii=False),
+            'response_examples': json.dumps(profile_data['response_examples'], ensure_ascii=False)
+        }
+        
+        # 세 테이블을 하나의 트랜잭션으로 생성
+        with dsql.transaction() as tx:
+            tx.execute(user_sql, user_data)
+            tx.execute(profile_sql, profile_params)
+            tx.execute(credit_sql, credit_data)
+        
         print(f"Created user profile for {user_data['user_id']}")
         
     except Exception as e:
@@ -326,18 +310,26 @@ def update_profile_in_dsql(user_id: str, update_fields: Dict[str, Any]):
         if not update_fields:
             return
         
-        # 동적 UPDATE 쿼리 생성
-        set_clauses = []
-        for field in update_fields.keys():
-            set_clauses.append(f"{field} = %({field})s")
-        
-        sql = f"""
-        UPDATE user_profiles 
-        SET {', '.join(set_clauses)}, updated_at = NOW()
-        WHERE user_id = %(user_id)s
-        """
-        
-        update_fields['user_id'] = user_id
+        profile_fields = {k: v for k, v in update_fields.items() if k not in USER_FIELDS}
+        user_fields = {k: v for k, v in update_fields.items() if k in USER_FIELDS}
+        
+        with dsql.transaction() as tx:
+            for table, fields in (('user_profiles', profile_fields), ('users', user_fields)):
+                if not fields:
+                    continue
+                
+                # 동적 UPDATE 쿼리 생성 (필드 이름은 코드에서 정한 값만 사용)
+                set_clauses = []
+                for field in fields.keys():
+                    set_clauses.append(f"{field} = %({field})s")
+                
+                sql = f"""
+                UPDATE {table} 
+                SET {', '.join(set_clauses)}, updated_at = NOW()
+                WHERE user_id = %(user_id)s
+                """
+                
+                tx.execute(sql, {**fields, 'user_id': user_id})
         
         print(f"Updated profile for {user_id}: {list(update_fields.keys())}")
         
@@ -356,7 +348,11 @@ def deduct_credits(user_id: str, amount: int = 1) -> bool:
         WHERE user_id = %(user_id)s AND credits_remaining >= %(amount)s
         """
         
-        # 실제로는 DSQL에서 실행하고 affected_rows 확인
+        # 잔액이 부족하면 갱신되는 행이 없음
+        if dsql.execute(sql, {'user_id': user_id, 'amount': amount}) != 1:
+            print(f"Insufficient credits for user {user_id}")
+            return False
+        
         print(f"Deducted {amount} credits from user {user_id}")
         return True
         
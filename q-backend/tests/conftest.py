@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Lambda 함수 모듈은 패키지가 아니라 src/lambda에 평면 배치되어 있음
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'lambda'))
+
+# 모듈 로드 시 생성하는 boto3 클라이언트용 리전 (실제 AWS 호출은 하지 않음)
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+import chat_analysis
+import credits
+import dsql
+import response_cache
+
+MODEL_OUTPUT = '{"type": "균형형", "message": "주말에 영화 보러 갈래?", "explanation": "관심 표현", ' \
+               '"risk_level": 3, "confidence": 0.9}'
+
+class FakeBedrock:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        self.calls += 1
+        chunks = [MODEL_OUTPUT[:30], MODEL_OUTPUT[30:70], MODEL_OUTPUT[70:]]
+        return {'body': [
+            {'chunk': {'bytes': json.dumps({'type': 'content_block_delta', 'delta': {'text': chunk}}).encode()}}
+            for chunk in chunks
+        ]}
+
+class FakeConnections:
+    def __init__(self):
+        self.frames = []
+
+    def post_to_connection(self, ConnectionId, Data):
+        self.frames.append((ConnectionId, json.loads(Data)))
+
+@pytest.fixture
+def stream(monkeypatch):
+    """WebSocket 전송, Bedrock, 크레딧 저장소를 메모리 객체로 대체"""
+    connections = FakeConnections()
+    bedrock = FakeBedrock()
+    reservations = []
+    monkeypatch.setattr(chat_analysis.boto3, 'client', lambda service, **kwargs: connections)
+    monkeypatch.setattr(chat_analysis, 'bedrock', bedrock)
+    monkeypatch.setattr(chat_analysis, 'response_cache', None)
+    monkeypatch.setattr(dsql, 'is_configured', lambda: True)
+    monkeypatch.setattr(credits, 'reserve', lambda user_id, amount=1, idempotency_key=None: reservations.append(
+        user_id) or {'reservation_id': 'r-1', 'user_id': user_id, 'amount': amount, 'status': 'reserved'})
+    monkeypatch.setattr(credits, 'commit', lambda reservation_id, response=None: True)
+    monkeypatch.setattr(credits, 'release', lambda reservation_id: True)
+    return connections, bedrock, reservations
+
+def websocket_event(authorizer=None, route_key='generate', body=None):
+    request_context = {'routeKey': route_key, 'connectionId': 'conn-1',
+                       'domainName': 'ws.example.com', 'stage': 'dev'}
+    if authorizer is not None:
+        request_context['authorizer'] = authorizer
+    return {'requestContext': request_context, 'body': json.dumps(body) if body is not None else None}
+
+def test_stream_request_uses_connect_authorizer_user(stream):
+    connections, bedrock, reservations = stream
+    event = websocket_event({'principalId': 'user-1', 'user_id': 'user-1'},
+                            body={'action': 'generate', 'stream': True, 'situation': '데이트 제안'})
+
+    response = chat_analysis.lambda_handler(event, None)
+    assert response['statusCode'] == 200
+    assert reservations == ['user-1']
+    assert bedrock.calls == 1
+    assert [frame['type'] for _, frame in connections.frames] == ['message', 'responses']
+    assert connections.frames[0][1]['message'] == '주말에 영화 보러 갈래?'
+
+def test_stream_request_without_authorizer_is_rejected(stream):
+    connections, bedrock, _ = stream
+    event = websocket_event(body={'action': 'generate', 'stream': True, 'situation': '데이트 제안'})
+
+    assert chat_analysis.lambda_handler(event, None)['statusCode'] == 401
+    assert bedrock.calls == 0 and connections.frames == []
+
+@pytest.mark.parametrize('route_key', ['$connect', '$disconnect'])
+def test_connection_routes_are_accepted(stream, route_key):
+    event = websocket_event({'principalId': 'user-1', 'user_id': 'user-1'}, route_key)
+    assert chat_analysis.lambda_handler(event, None)['statusCode'] == 200
+
+def test_cache_stats_action_reports_response_cache(monkeypatch):
+    cache = response_cache.ResponseCache(response_cache.MemoryCacheBackend())
+    cache.get(response_cache.build_fingerprint('연락 없어', '', '안전형', [], 'casual'))
+    monkeypatch.setattr(chat_analysis, 'response_cache', cache)
+
+    response = chat_analysis.lambda_handler({'httpMethod': 'POST', 'body': json.dumps({'action': 'cache_stats'})}, None)
+
+    assert response['statusCode'] == 200
+    assert json.loads(response['body'])['response_cache']['misses'] == 1
+
+def test_cache_stats_action_reports_prompt_sections(monkeypatch):
+    sections = chat_analysis.SectionCache()
+    sections.get_or_build('partner', 'profile-1', 'v1', lambda: '상대방 섹션')
+    sections.get_or_build('partner', 'profile-1', 'v1', lambda: '상대방 섹션')
+    monkeypatch.setattr(chat_analysis, 'prompt_sections', sections)
+
+    response = chat_analysis.lambda_handler({'httpMethod': 'POST', 'body': json.dumps({'action': 'cache_stats'})}, None)
+
+    stats = json.loads(response['body'])['prompt_sections']
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+class FakeHold:
+    def __init__(self):
+        self.outcome = None
+
+    def reserve(self):
+        return None
+
+    def commit(self, response=None):
+        self.outcome = 'committed'
+
+    def release(self):
+        self.outcome = 'released'
+
+@pytest.fixture
+def model_output(monkeypatch):
+    """generate_all_responses가 받을 모델 출력 지정"""
+    output = {'text': ''}
+    monkeypatch.setattr(chat_analysis, 'response_cache', None)
+    monkeypatch.setattr(chat_analysis, 'invoke_model_text', lambda prompt, on_message=None: output['text'])
+    return output
+
+def test_all_styles_fills_only_missing_styles_with_fallback(model_output):
+    model_output['text'] = json.dumps([
+        {'type': '안전형', 'message': '오늘 하루 어땠어?', 'explanation': '안부', 'risk_level': 2, 'confidence': 0.8},
+        {'type': '대담형', 'message': '   '},
+        {'type': '없는형', 'message': '무시됨'}
+    ])
+    hold = FakeHold()
+
+    responses = chat_analysis.generate_all_responses('', '연락 없어', {}, {}, credit_hold=hold)
+
+    assert [response['type'] for response in responses] == chat_analysis.RESPONSE_TYPES
+    assert responses[0]['message'] == '오늘 하루 어땠어?'
+    fallback = {r['type']: r['message'] for r in chat_analysis.build_fallback_responses('연락 없어', {}, ['균형형', '대담형'])}
+    assert {r['type']: r['message'] for r in responses[1:]} == fallback
+    assert sum(response['recommended'] for response in responses) == 1
+    assert hold.outcome == 'committed'
+
+def test_all_styles_fallback_only_releases_credit(model_output):
+    model_output['text'] = '답변을 생성할 수 없습니다.'
+    hold = FakeHold()
+
+    responses = chat_analysis.generate_all_responses('', '연락 없어', {}, {}, credit_hold=hold)
+
+    assert [response['type'] for response in responses] == chat_analysis.RESPONSE_TYPES
+    assert hold.outcome == 'released'
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import chat_room_manager
+from chat_room_store import ChatRoomStore, SQLiteExecutor
+
+@pytest.fixture
+def store(monkeypatch):
+    room_store = ChatRoomStore(SQLiteExecutor(':memory:'))
+    monkeypatch.setattr(chat_room_manager, 'room_store', room_store)
+    return room_store
+
+def create_room(store, user_id='user-1'):
+    return store.create_room({
+        'room_id': f'room_{user_id}_00',
+        'user_id': user_id,
+        'name': '대화 0',
+        'partner_name': '상대 0',
+        'partner_relationship': 'friend',
+        'message_count': 0,
+        'last_message': ''
+    })
+
+def test_stale_version_returns_412_with_current_room(store):
+    room = create_room(store)
+    assert chat_room_manager.apply_room_update({'room_id': room['id'], 'message_count': 3,
+                                                'version': room['version']})['status'] == 200
+
+    result = chat_room_manager.apply_room_update({'room_id': room['id'], 'message_count': 4,
+                                                  'version': room['version']})
+    assert result['status'] == 412
+    assert result['room']['message_count'] == 3
+    assert result['room']['version'] == room['version'] + 1
+
+def test_batch_update_reports_each_result(store):
+    room = create_room(store)
+    event = {'body': json.dumps({'updates': [
+        {'room_id': room['id'], 'increment_message_count': 1},
+        {'room_id': 'room_missing', 'increment_message_count': 1},
+        {'room_id': room['id'], 'message_count': -1},
+        {'room_id': room['id'], 'increment_message_count': 1, 'version': 1},
+        'not-an-object'
+    ]})}
+
+    response = chat_room_manager.update_chat_room(event, {})
+    results = json.loads(response['body'])['results']
+    assert response['statusCode'] == 200
+    assert [result['status'] for result in results] == [200, 404, 400, 412, 400]
+    assert store.get_room(room['id'])['message_count'] == 1
+
+def test_delete_missing_room_returns_404(store):
+    room = create_room(store)
+    event = {'body': json.dumps({'room_id': room['id']})}
+    assert chat_room_manager.delete_chat_room(event, {})['statusCode'] == 200
+    assert chat_room_manager.delete_chat_room(event, {})['statusCode'] == 404
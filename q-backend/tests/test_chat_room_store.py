@@ -0,0 +1,47 @@
+import pytest
+
+from chat_room_store import ChatRoomStore, SQLiteExecutor
+
+@pytest.fixture
+def store():
+    return ChatRoomStore(SQLiteExecutor(':memory:'))
+
+def create_rooms(store, user_id, count):
+    return [
+        store.create_room({
+            'room_id': f'room_{user_id}_{index:02d}',
+            'user_id': user_id,
+            'name': f'대화 {index}',
+            'partner_name': f'상대 {index}',
+            'partner_relationship': 'friend',
+            'message_count': 0,
+            'last_message': ''
+        })
+        for index in range(count)
+    ]
+
+def test_list_rooms_paginates_newest_first(store):
+    rooms = create_rooms(store, 'user-1', 5)
+    create_rooms(store, 'user-2', 2)
+
+    first = store.list_rooms('user-1', 2)
+    assert [room['id'] for room in first['rooms']] == [rooms[4]['id'], rooms[3]['id']]
+    assert first['has_more']
+
+    second = store.list_rooms('user-1', 2, first['next_cursor'])
+    last = store.list_rooms('user-1', 2, second['next_cursor'])
+    assert [room['id'] for room in second['rooms']] == [rooms[2]['id'], rooms[1]['id']]
+    assert [room['id'] for room in last['rooms']] == [rooms[0]['id']]
+    assert not last['has_more'] and last['next_cursor'] is None
+
+def test_invalid_cursor_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.list_rooms('user-1', 10, 'not-a-cursor')
+
+def test_update_increments_count_and_version(store):
+    room = create_rooms(store, 'user-1', 1)[0]
+    outcome, updated = store.update_room(room['id'], {'last_message': '안녕'}, increment=2)
+    assert outcome == 'updated'
+    assert updated['message_count'] == 2
+    assert updated['last_message'] == '안녕'
+    assert updated['version'] == room['version'] + 1
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+import conversation_history
+from conversation_history import decode_cursor, encode_cursor
+
+HEADERS = {'Content-Type': 'application/json'}
+
+# 같은 created_at을 가진 행을 포함해 conversation_id로 순서가 갈리는 경우 재현
+ROWS = [
+    {'conversation_id': index, 'created_at': f'2026-10-0{1 + index // 3}T12:00:00'}
+    for index in range(1, 8)
+]
+
+@pytest.fixture
+def conversations(monkeypatch):
+    """(created_at, conversation_id) 내림차순 keyset 조회를 메모리 행으로 재현"""
+    def get_page(user_id, limit, after=None):
+        rows = sorted(ROWS, key=lambda row: (row['created_at'], row['conversation_id']), reverse=True)
+        if after:
+            rows = [row for row in rows
+                    if (row['created_at'], row['conversation_id']) < (after['created_at'], after['conversation_id'])]
+        return rows[:limit]
+
+    monkeypatch.setattr(conversation_history, 'get_page_from_dsql', get_page)
+
+def get_history(**params):
+    event = {'httpMethod': 'GET', 'queryStringParameters': {'user_id': 'user-1', **params}}
+    response = conversation_history.get_conversation_history(event, HEADERS)
+    return response['statusCode'], json.loads(response['body'])
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({'created_at': '2026-10-01T12:00:00.123456', 'conversation_id': 42})
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == {'created_at': '2026-10-01T12:00:00.123456', 'conversation_id': 42}
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', encode_cursor({'created_at': 'yesterday', 'conversation_id': 1})])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_pages_follow_next_cursor_without_gaps_or_duplicates(conversations):
+    seen = []
+    status, page = get_history(limit='3')
+    while True:
+        assert status == 200
+        seen.extend(row['conversation_id'] for row in page['conversations'])
+        if not page['has_more']:
+            break
+        status, page = get_history(limit='3', cursor=page['next_cursor'])
+
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+    assert page['next_cursor'] is None
+
+def test_invalid_cursor_returns_400(conversations):
+    status, body = get_history(cursor='not-a-cursor')
+
+    assert status == 400
+    assert body['error'] == 'Invalid cursor'
+
+class FakeTransaction:
+    """save_batch_to_dsql의 ID 선할당과 multi-row INSERT를 기록"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def fetch_all(self, sql, params):
+        assert 'generate_series' in sql
+        # nextval 결과가 입력 순서와 다르게 돌아와도 정렬해 지정하는지 확인
+        return [{'conversation_id': 100 + index} for index in reversed(range(params['count']))]
+
+    def execute(self, sql, params):
+        self.statements.append((sql, params))
+
+@pytest.fixture
+def batch_db(monkeypatch):
+    tx = FakeTransaction()
+    summaries = []
+    monkeypatch.setattr(conversation_history.dsql, 'is_configured', lambda: True)
+    monkeypatch.setattr(conversation_history.dsql, 'transaction', lambda: tx)
+    monkeypatch.setattr(conversation_history.dashboard_summary, 'apply_delta',
+                        lambda tx, user_id, delta: summaries.append((user_id, delta['conversations'])))
+    return tx, summaries
+
+def post_batch(conversations):
+    event = {'httpMethod': 'POST', 'body': json.dumps({'conversations': conversations})}
+    response = conversation_history.lambda_handler(event, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def test_batch_with_invalid_items_returns_207_with_per_item_results(batch_db):
+    tx, summaries = batch_db
+    status, body = post_batch([
+        {'user_id': 'user-1', 'user_message': '안녕', 'ai_responses': ['a'], 'created_at': '2026-10-01T09:00:00'},
+        {'user_id': 'user-1', 'ai_responses': ['a']},
+        'not-an-object',
+        {'user_id': 'user-1', 'user_message': '잘 자', 'ai_responses': ['b'], 'created_at': 'yesterday'},
+        {'user_id': 'user-2', 'user_message': '뭐 해?', 'ai_responses': ['c'], 'created_at': '2026-10-01T10:00:00'}
+    ])
+
+    assert status == 207
+    assert (body['saved_count'], body['error_count']) == (2, 3)
+    assert body['results'][0] == {'index': 0, 'conversation_id': 100}
+    assert body['results'][4] == {'index': 4, 'conversation_id': 101}
+    assert body['results'][1]['error'] == 'Missing required field: user_message'
+    assert body['results'][2]['error'] == 'Conversation must be an object'
+    assert body['results'][3]['error'] == 'Invalid created_at: yesterday'
+
+    insert_sql, insert_params = tx.statements[0]
+    assert 'INSERT INTO conversations' in insert_sql
+    assert (insert_params['conversation_id_0'], insert_params['user_message_0']) == (100, '안녕')
+    assert (insert_params['conversation_id_1'], insert_params['user_message_1']) == (101, '뭐 해?')
+    assert sorted(summaries) == [('user-1', 1), ('user-2', 1)]
+
+def test_fully_valid_batch_returns_200(batch_db):
+    status, body = post_batch([
+        {'user_id': 'user-1', 'user_message': f'메시지 {index}', 'ai_responses': ['a']} for index in range(3)
+    ])
+
+    assert status == 200
+    assert [result['conversation_id'] for result in body['results']] == [100, 101, 102]
+
+def test_oversized_batch_is_rejected(batch_db, monkeypatch):
+    monkeypatch.setattr(conversation_history, 'MAX_BATCH_SIZE', 2)
+    status, _ = post_batch([{'user_id': 'user-1', 'user_message': 'a', 'ai_responses': ['a']}] * 3)
+
+    assert status == 400
@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+import credits
+from credits import CreditHold, DuplicateRequestError, InsufficientCreditsError
+
+RESPONSES = [{'type': '안전형', 'message': '좋아!'}]
+
+class FakeLedger:
+    """credit_reservations/user_credits 테이블과 같은 상태 전이를 메모리에서 재현"""
+
+    def __init__(self, balance):
+        self.balance = balance
+        self.used = 0
+        self.reservations = {}
+        self.reserve_calls = 0
+
+    def reserve(self, user_id, amount=1, idempotency_key=None):
+        self.reserve_calls += 1
+        reservation_id = idempotency_key or f'auto-{self.reserve_calls}'
+        existing = self.reservations.get(reservation_id)
+        if existing:
+            if existing['user_id'] != user_id:
+                raise DuplicateRequestError(f"Idempotency key already used: {reservation_id}")
+            if existing['status'] == 'reserved':
+                raise DuplicateRequestError(f"Request already in progress: {reservation_id}")
+            if existing['status'] == 'committed':
+                return dict(existing)
+        if self.balance < amount:
+            return None
+        self.balance -= amount
+        self.reservations[reservation_id] = {'reservation_id': reservation_id, 'user_id': user_id,
+                                             'amount': amount, 'status': 'reserved', 'response': None}
+        return dict(self.reservations[reservation_id], credits_remaining=self.balance)
+
+    def commit(self, reservation_id, response=None):
+        reservation = self.reservations[reservation_id]
+        if reservation['status'] != 'reserved':
+            return False
+        reservation.update(status='committed', response=json.dumps(response) if response is not None else None)
+        self.used += reservation['amount']
+        return True
+
+    def release(self, reservation_id):
+        reservation = self.reservations[reservation_id]
+        if reservation['status'] != 'reserved':
+            return False
+        reservation['status'] = 'released'
+        self.balance += reservation['amount']
+        return True
+
+@pytest.fixture
+def ledger(monkeypatch):
+    fake = FakeLedger(balance=2)
+    monkeypatch.setattr(credits, 'reserve', fake.reserve)
+    monkeypatch.setattr(credits, 'commit', fake.commit)
+    monkeypatch.setattr(credits, 'release', fake.release)
+    return fake
+
+def test_commit_charges_once(ledger):
+    hold = CreditHold('user-1', idempotency_key='key-1')
+    assert hold.reserve() is None
+    hold.commit(RESPONSES)
+    hold.commit(RESPONSES)
+    hold.release()
+    assert (ledger.balance, ledger.used) == (1, 1)
+    assert ledger.reservations['key-1']['status'] == 'committed'
+
+def test_release_returns_credits(ledger):
+    hold = CreditHold('user-1')
+    hold.reserve()
+    hold.release()
+    hold.release()
+    assert (ledger.balance, ledger.used) == (2, 0)
+
+def test_retry_of_committed_request_returns_stored_responses(ledger):
+    first = CreditHold('user-1', idempotency_key='key-1')
+    first.reserve()
+    first.commit(RESPONSES)
+
+    retry = CreditHold('user-1', idempotency_key='key-1')
+    assert retry.reserve() == RESPONSES
+    retry.commit(RESPONSES)
+    assert (ledger.balance, ledger.used) == (1, 1)
+
+def test_retry_while_in_progress_is_rejected(ledger):
+    CreditHold('user-1', idempotency_key='key-1').reserve()
+    with pytest.raises(DuplicateRequestError):
+        CreditHold('user-1', idempotency_key='key-1').reserve()
+    assert ledger.balance == 1
+
+def test_key_from_another_user_is_rejected(ledger):
+    hold = CreditHold('user-1', idempotency_key='key-1')
+    hold.reserve()
+    hold.commit(RESPONSES)
+    with pytest.raises(DuplicateRequestError):
+        CreditHold('user-2', idempotency_key='key-1').reserve()
+
+def test_retry_after_release_reserves_again(ledger):
+    first = CreditHold('user-1', idempotency_key='key-1')
+    first.reserve()
+    first.release()
+
+    retry = CreditHold('user-1', idempotency_key='key-1')
+    assert retry.reserve() is None
+    retry.commit(RESPONSES)
+    assert (ledger.balance, ledger.used) == (1, 1)
+
+def test_committed_reservation_without_stored_response_is_rejected(ledger):
+    hold = CreditHold('user-1', idempotency_key='key-1')
+    hold.reserve()
+    hold.commit()
+    ledger.reservations['key-1']['response'] = None
+    with pytest.raises(DuplicateRequestError):
+        CreditHold('user-1', idempotency_key='key-1').reserve()
+
+def test_insufficient_credits(ledger):
+    CreditHold('user-1').reserve()
+    CreditHold('user-1').reserve()
+    with pytest.raises(InsufficientCreditsError):
+        CreditHold('user-1').reserve()
+    assert ledger.balance == 0
+
+def test_commit_after_expiry_is_logged_and_not_charged(ledger, capsys):
+    hold = CreditHold('user-1', idempotency_key='key-1')
+    hold.reserve()
+    ledger.release('key-1')  # 다른 요청의 만료 정리가 먼저 반환
+
+    hold.commit(RESPONSES)
+    assert hold.reservation['status'] == 'expired'
+    assert 'expired before commit' in capsys.readouterr().out
+    assert (ledger.balance, ledger.used) == (2, 0)
+
+def test_reservation_ttl_outlives_lambda_timeout():
+    assert credits.RESERVATION_TTL_SECONDS > 900
@@ -0,0 +1,90 @@
+import dashboard_summary
+from dashboard_summary import conversation_delta, feedback_delta, format_summary, merge_deltas
+
+TODAY = '2026-10-17'
+
+def rebuild_from(conversations):
+    """rebuild_summary SQL과 같은 집계를 최종 대화 상태에서 직접 계산"""
+    rated = [c['feedback_rating'] for c in conversations if c.get('feedback_rating') is not None]
+    types = {}
+    for conversation in conversations:
+        if conversation.get('selected_response_type'):
+            types[conversation['selected_response_type']] = types.get(conversation['selected_response_type'], 0) + 1
+    return {
+        'conversations': len(conversations),
+        'today': sum(1 for c in conversations if str(c['created_at'])[:10] == TODAY),
+        'rated': len(rated),
+        'rating_sum': sum(rated),
+        'success': sum(1 for rating in rated if rating >= dashboard_summary.SUCCESS_RATING),
+        'response_types': types
+    }
+
+def as_row(delta):
+    return {
+        'total_conversations': delta['conversations'],
+        'rated_conversations': delta['rated'],
+        'rating_sum': delta['rating_sum'],
+        'success_count': delta['success'],
+        'response_type_counts': delta['response_types'],
+        'is_today': True,
+        'activity_date_conversations': delta['today']
+    }
+
+def test_incremental_deltas_match_a_full_rebuild():
+    conversations = [
+        {'created_at': '2026-10-16T20:00:00', 'feedback_rating': 5, 'selected_response_type': '대담형'},
+        {'created_at': f'{TODAY}T09:00:00', 'feedback_rating': None, 'selected_response_type': None},
+        {'created_at': f'{TODAY}T10:00:00', 'feedback_rating': 3, 'selected_response_type': '안전형'},
+    ]
+    deltas = [conversation_delta(conversation, TODAY) for conversation in conversations]
+
+    # 피드백 변경: 평점 수정, 선택 답변 변경, 새 피드백
+    updates = [
+        (0, {'feedback_rating': 2, 'selected_response_type': '안전형'}),
+        (1, {'feedback_rating': 4, 'selected_response_type': '균형형'}),
+        (2, {'feedback_rating': 5}),
+    ]
+    for index, change in updates:
+        old = conversations[index]
+        new = {**old, **change}
+        deltas.append(feedback_delta(old, new))
+        conversations[index] = new
+
+    merged = merge_deltas(deltas)
+    rebuilt = rebuild_from(conversations)
+
+    assert {**merged, 'response_types': {k: v for k, v in merged['response_types'].items() if v}} == rebuilt
+    assert format_summary(as_row(merged)) == format_summary(as_row(rebuilt))
+
+def test_format_summary_of_missing_row_uses_defaults():
+    assert format_summary(None) == {
+        'total_conversations': 0,
+        'today_conversations': 0,
+        'avg_response_rating': 0,
+        'overall_success_rate': 0,
+        'favorite_response_type': dashboard_summary.DEFAULT_RESPONSE_TYPE
+    }
+
+def test_format_summary_ignores_stale_day_and_zeroed_types():
+    row = as_row({'conversations': 4, 'today': 2, 'rated': 2, 'rating_sum': 9, 'success': 2,
+                  'response_types': {'대담형': 0, '안전형': 2}})
+    row['is_today'] = False
+
+    summary = format_summary(row)
+
+    assert summary['today_conversations'] == 0
+    assert summary['avg_response_rating'] == 4.5
+    assert summary['overall_success_rate'] == 1.0
+    assert summary['favorite_response_type'] == '안전형'
+
+def test_rebuild_handler_reports_drift_and_failures(monkeypatch):
+    def rebuild(user_id):
+        if user_id == 'broken':
+            raise RuntimeError('db error')
+        return {'user_id': user_id, 'drifted': user_id == 'drifted'}
+
+    monkeypatch.setattr(dashboard_summary, 'rebuild_summary', rebuild)
+
+    result = dashboard_summary.rebuild_handler({'user_ids': ['ok', 'drifted', 'broken']}, None)
+
+    assert result == {'rebuilt': 2, 'drifted': 1, 'failed': 1}
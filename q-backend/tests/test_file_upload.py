@@ -0,0 +1,152 @@
+import base64
+import io
+import json
+from urllib.parse import quote
+
+import pytest
+
+import file_upload
+
+UPLOAD_ID = '0123456789abcdef0123456789abcdef'
+UPLOAD_KEY = f'uploads/{UPLOAD_ID}.txt'
+RESULT_KEY = f'results/{UPLOAD_ID}.json'
+
+KAKAO_EXPORT = '\n'.join([
+    '홍길동 님과 카카오톡 대화',
+    '--------------- 2024년 1월 1일 월요일 ---------------',
+    '[홍길동] [오후 3:45] 안녕하세요 반가워요 ㅎㅎ',
+    '[나] [오후 3:46] 네 안녕하세요!',
+    '[나] [오후 3:47] 오늘 날씨 좋네요',
+    '둘째 줄도 같은 메시지',
+    '[홍길동] [오후 3:48] 진짜 좋아요'
+])
+
+class StubS3:
+    """process_uploaded_object/s3_event_handler용 메모리 S3"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, Metadata=None):
+        self.objects[(Bucket, Key)] = {'Body': Body, 'Metadata': Metadata or {}}
+
+    def get_object(self, Bucket, Key):
+        stored = self.objects[(Bucket, Key)]
+        return {'Body': io.BytesIO(stored['Body']), 'Metadata': stored['Metadata']}
+
+    def result(self, bucket, key):
+        return json.loads(self.objects[(bucket, key)]['Body'])
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setattr(file_upload, 'comprehend_client', None)  # 로컬 감정 분석 사용
+    return StubS3()
+
+def s3_event(key):
+    return {'Records': [{'s3': {'bucket': {'name': 'love-q-files'}, 'object': {'key': quote(key)}}}]}
+
+def test_process_uploaded_object_writes_completed_result(s3):
+    s3.put_object('love-q-files', UPLOAD_KEY, KAKAO_EXPORT.encode('utf-8'),
+                  Metadata={'file-type': 'kakao', 'speaker': quote('나')})
+
+    assert file_upload.process_uploaded_object('love-q-files', UPLOAD_KEY, client=s3) == RESULT_KEY
+    result = s3.result('love-q-files', RESULT_KEY)
+    assert result['status'] == 'completed'
+    assert result['messages_count'] == 2
+    assert result['sample_messages'][1] == '오늘 날씨 좋네요\n둘째 줄도 같은 메시지'
+    assert result['speakers']['홍길동']['message_count'] == 2
+
+def test_export_without_messages_writes_failed_result(s3):
+    s3.put_object('love-q-files', UPLOAD_KEY, '홍길동 님과 카카오톡 대화\n'.encode('utf-8'))
+
+    file_upload.process_uploaded_object('love-q-files', UPLOAD_KEY, client=s3)
+    assert s3.result('love-q-files', RESULT_KEY)['status'] == 'failed'
+
+def test_processing_error_writes_failed_result(s3, monkeypatch):
+    monkeypatch.setattr(file_upload, 's3_client', s3)  # 객체가 없어 get_object 실패
+
+    response = file_upload.s3_event_handler(s3_event(UPLOAD_KEY), None)
+    assert response == {'processed': [], 'failed': [RESULT_KEY]}
+    result = s3.result('love-q-files', RESULT_KEY)
+    assert result['upload_id'] == UPLOAD_ID
+    assert result['status'] == 'failed'
+    assert result['error']
+
+    # 결과 조회는 202(처리 중)가 아닌 실패 결과를 반환
+    monkeypatch.setenv('S3_BUCKET', 'love-q-files')
+    lookup = file_upload.get_upload_result({'upload_id': UPLOAD_ID}, {}, client=s3)
+    assert lookup['statusCode'] == 200
+    assert json.loads(lookup['body'])['status'] == 'failed'
+
+def test_speaker_stats_cover_messages_past_the_cap():
+    parsed = file_upload.parse_chat_export(io.StringIO(KAKAO_EXPORT), 'kakao', max_messages=1)
+
+    assert parsed['messages'] == ['안녕하세요 반가워요 ㅎㅎ']
+    assert parsed['truncated'] is True
+    assert parsed['speakers']['홍길동']['message_count'] == 2
+    assert parsed['speakers']['나']['message_count'] == 2
+    assert parsed['speakers']['홍길동']['last_timestamp'] == '2024-01-01T15:48'
+
+def test_export_within_the_cap_is_not_truncated():
+    parsed = file_upload.parse_chat_export(io.StringIO(KAKAO_EXPORT), 'kakao', speaker='나', max_messages=2)
+
+    assert len(parsed['messages']) == 2
+    assert parsed['truncated'] is False
+
+MOBILE_EXPORT = '\n'.join([
+    'Talk_2024.3.9 21:10-1.txt',
+    '저장한 날짜 : 2024. 3. 9. 오후 9:10',
+    '2024년 3월 9일 토요일',
+    '2024년 3월 9일 오전 9:05, 홍길동 : 좋은 아침이에요',
+    '2024년 3월 9일 오전 9:06, 홍길동님이 들어왔습니다.',
+    '2024. 3. 9. 오후 12:30, 나 : 점심 먹었어요?',
+    '저는 김치찌개 먹었어요',
+    '2024. 3. 9. 오후 1:02, 홍길동 : 네 : 비빔밥이요'
+])
+
+def test_kakao_pc_export_records():
+    records = list(file_upload.iter_kakao_records(io.StringIO(KAKAO_EXPORT)))
+
+    assert [(record['speaker'], record['timestamp']) for record in records] == [
+        ('홍길동', '2024-01-01T15:45'), ('나', '2024-01-01T15:46'),
+        ('나', '2024-01-01T15:47'), ('홍길동', '2024-01-01T15:48')
+    ]
+
+def test_kakao_mobile_export_records_merge_lines_and_skip_system_messages():
+    records = list(file_upload.iter_kakao_records(io.StringIO(MOBILE_EXPORT)))
+
+    assert records == [
+        {'speaker': '홍길동', 'timestamp': '2024-03-09T09:05', 'text': '좋은 아침이에요'},
+        {'speaker': '나', 'timestamp': '2024-03-09T12:30', 'text': '점심 먹었어요?\n저는 김치찌개 먹었어요'},
+        {'speaker': '홍길동', 'timestamp': '2024-03-09T13:02', 'text': '네 : 비빔밥이요'}
+    ]
+
+def test_base64_content_is_split_into_lines_across_chunks(monkeypatch):
+    monkeypatch.setattr(file_upload, 'BASE64_CHUNK_SIZE', 8)
+    encoded = base64.b64encode(KAKAO_EXPORT.encode('utf-8')).decode('ascii')
+    wrapped = '\n'.join(encoded[i:i + 19] for i in range(0, len(encoded), 19))
+
+    assert list(file_upload.iter_content_lines(wrapped, 'base64')) == KAKAO_EXPORT.split('\n')
+
+def test_extract_messages_stops_at_max_messages():
+    messages = file_upload.extract_messages_from_content(MOBILE_EXPORT, 'kakao', max_messages=2)
+
+    assert messages == ['좋은 아침이에요', '점심 먹었어요?\n저는 김치찌개 먹었어요']
+
+def test_speaker_filter_keeps_only_that_speakers_messages():
+    parsed = file_upload.parse_chat_export(io.StringIO(MOBILE_EXPORT), 'kakao', speaker='홍길동')
+
+    assert parsed['messages'] == ['좋은 아침이에요', '네 : 비빔밥이요']
+    assert set(parsed['speakers']) == {'홍길동', '나'}
+    assert parsed['speakers']['홍길동'] == {
+        'message_count': 2,
+        'avg_length': (len('좋은 아침이에요') + len('네 : 비빔밥이요')) / 2,
+        'first_timestamp': '2024-03-09T09:05',
+        'last_timestamp': '2024-03-09T13:02'
+    }
+
+def test_unknown_speaker_yields_no_messages_but_keeps_stats():
+    parsed = file_upload.parse_chat_export(io.StringIO(KAKAO_EXPORT), 'kakao', speaker='김철수')
+
+    assert parsed['messages'] == []
+    assert parsed['speakers']['나']['message_count'] == 2
@@ -0,0 +1,23 @@
+import ids
+from ids import ENCODING, ULID_LENGTH, new_id, new_ulid
+
+def test_ulid_format():
+    value = new_ulid()
+    assert len(value) == ULID_LENGTH
+    assert set(value) <= set(ENCODING)
+    assert new_id('room').startswith('room_') and len(new_id('room')) == len('room_') + ULID_LENGTH
+
+def test_ulids_are_unique_and_sorted_in_creation_order():
+    values = [new_ulid() for _ in range(10000)]
+    assert len(set(values)) == len(values)
+    assert values == sorted(values)
+
+def test_monotonic_within_same_millisecond_and_clock_rollback(monkeypatch):
+    now = [1700000000.0]
+    monkeypatch.setattr(ids.time, 'time', lambda: now[0])
+    first = new_ulid()
+    second = new_ulid()
+    now[0] -= 5  # 시계가 뒤로 가도 순서 유지
+    third = new_ulid()
+    assert first < second < third
+    assert first[:10] == second[:10] == third[:10]  # 타임스탬프 부분(48비트)은 그대로
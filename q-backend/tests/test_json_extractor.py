@@ -0,0 +1,49 @@
+from json_extractor import IncrementalJSONExtractor, extract_json, get_extraction_stats
+
+def test_plain_json():
+    assert extract_json('{"type": "안전형", "risk_level": 2}') == {'type': '안전형', 'risk_level': 2}
+
+def test_code_fence_and_surrounding_text():
+    text = '답변입니다.\n```json\n{"responses": [{"message": "안녕"}]}\n```\n참고하세요.'
+    assert extract_json(text) == {'responses': [{'message': '안녕'}]}
+
+def test_trailing_comma():
+    assert extract_json('{"a": [1, 2,], "b": 3,}') == {'a': [1, 2], 'b': 3}
+
+def test_truncated_object_keeps_complete_fields():
+    text = '{"type": "균형형", "message": "주말에 뭐 해?", "explanation": "상대방이 좋아할'
+    assert extract_json(text) == {'type': '균형형', 'message': '주말에 뭐 해?'}
+
+def test_truncated_array_keeps_complete_items():
+    text = '{"responses": [{"type": "안전형", "message": "좋아"}, {"type": "대담형", "mess'
+    assert extract_json(text) == {'responses': [{'type': '안전형', 'message': '좋아'}, {'type': '대담형'}]}
+
+def test_unrecoverable_output_returns_none():
+    before = get_extraction_stats()
+    assert extract_json('JSON을 생성할 수 없습니다.') is None
+    assert extract_json('') is None
+    assert get_extraction_stats()['discarded'] == before['discarded'] + 2
+
+def test_incremental_extractor_emits_completed_string_fields():
+    extractor = IncrementalJSONExtractor()
+    chunks = ['```json\n{"ty', 'pe": "안전형", "mes', 'sage": "오늘 \\"진짜\\" 즐거웠어', '", "risk_level": 2}']
+    completed = [field for chunk in chunks for field in extractor.feed(chunk)]
+    assert completed == [('type', '안전형'), ('message', '오늘 "진짜" 즐거웠어')]
+    assert extract_json(extractor.buffer)['risk_level'] == 2
+
+def test_incremental_extractor_ignores_keys_and_leading_text():
+    extractor = IncrementalJSONExtractor()
+    assert extractor.feed('설명 "따옴표" 문장 ') == []
+    assert extractor.feed('{"message"') == []
+    assert extractor.feed(': "안녕"}') == [('message', '안녕')]
+
+def test_empty_value_recovered_from_truncated_output_is_discarded():
+    before = get_extraction_stats()
+    assert extract_json('{"a":"unterminated') is None
+    assert extract_json('[{"message": "잘린') is None
+    after = get_extraction_stats()
+    assert after['discarded'] == before['discarded'] + 2
+    assert after['recovered'] == before['recovered']
+
+def test_complete_empty_object_is_parsed():
+    assert extract_json('{}') == {}
@@ -0,0 +1,40 @@
+import random
+
+from keyword_matcher import (
+    PERSONALITY_MATCHER, PARTNER_MATCHER, PERSONALITY_PATTERNS, PARTNER_PERSONALITY_PATTERNS,
+    CONVERSATION_TOPICS, RISK_KEYWORDS, KeywordMatcher, minimal_patterns
+)
+
+def legacy_match(text, patterns):
+    """KeywordMatcher 도입 전 라벨별 순회 방식"""
+    return [label for label, keywords in patterns.items() if any(keyword in text for keyword in keywords)]
+
+def sample_texts():
+    words = sorted({pattern for patterns in PARTNER_PERSONALITY_PATTERNS.values() for pattern in patterns}
+                   | set(CONVERSATION_TOPICS) | set(RISK_KEYWORDS) | {'힘들어', '영화관', '사람들', '그리고', ' '})
+    rng = random.Random(0)
+    texts = ['', '평범한 설명', '조용하고 수줍지만 유머 있는 사람', '요즘 스트레스 받고 힘들어 해요']
+    texts += [''.join(rng.choice(words) for _ in range(rng.randint(1, 6))) for _ in range(500)]
+    return texts
+
+def test_personality_matches_legacy():
+    for text in sample_texts():
+        assert PERSONALITY_MATCHER.match(text, 'personality') == legacy_match(text, PERSONALITY_PATTERNS)
+
+def test_partner_tables_match_legacy():
+    topics = {interest: [interest] for interest in CONVERSATION_TOPICS}
+    risks = {keyword: [keyword] for keyword in RISK_KEYWORDS}
+    for text in sample_texts():
+        hits = PARTNER_MATCHER.scan(text)
+        assert PARTNER_MATCHER.select(hits, 'personality') == legacy_match(text, PARTNER_PERSONALITY_PATTERNS)
+        assert PARTNER_MATCHER.select(hits, 'topic') == legacy_match(text, topics)
+        assert PARTNER_MATCHER.select(hits, 'risk') == legacy_match(text, risks)
+
+def test_overlapping_patterns_report_every_label():
+    # 가장 긴 패턴만 잡혀도 그 안에 포함된 짧은 패턴의 라벨이 빠지지 않아야 함
+    matcher = KeywordMatcher({'t': {'short': ['힘들'], 'long': ['힘들어'], 'other': ['들어']}})
+    assert matcher.match('너무 힘들어', 't') == ['short', 'long', 'other']
+
+def test_minimal_patterns_drop_redundant_patterns():
+    # '해요', '세요'는 '요'를 포함하므로 포함 여부 검사에는 필요 없음
+    assert minimal_patterns(['요', '해요', '세요', '습니다']) == ['습니다', '요']
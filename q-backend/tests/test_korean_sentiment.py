@@ -0,0 +1,61 @@
+import pytest
+
+import korean_sentiment
+from korean_sentiment import LocalSentimentClient, score_sentiment
+
+def sentiment(text):
+    return score_sentiment(text)['Sentiment']
+
+@pytest.mark.parametrize('text, expected', [
+    ('오늘 진짜 좋았어', 'POSITIVE'),
+    ('너무 짜증나', 'NEGATIVE'),
+    ('내일 3시에 보자', 'NEUTRAL'),
+])
+def test_lexicon_polarity(text, expected):
+    assert sentiment(text) == expected
+
+@pytest.mark.parametrize('text', ['안 좋아', '좋지 않아', '별로 재밌지 못했어'])
+def test_negated_positive_words_turn_negative(text):
+    assert sentiment(text) == 'NEGATIVE'
+
+def test_negated_negative_word_turns_positive():
+    assert sentiment('하나도 안 싫어') == 'POSITIVE'
+
+def test_negation_weakens_the_score():
+    assert score_sentiment('좋아')['SentimentScore']['Positive'] > score_sentiment('안 좋아')['SentimentScore']['Negative']
+
+def test_intensifier_strengthens_the_score():
+    assert score_sentiment('진짜 좋아')['SentimentScore']['Positive'] > score_sentiment('좋아')['SentimentScore']['Positive']
+
+@pytest.mark.parametrize('text, expected', [
+    ('ㅋㅋ', 'POSITIVE'),
+    ('ㅠㅠ', 'NEGATIVE'),
+    ('^^', 'POSITIVE'),
+    ('T_T', 'NEGATIVE'),
+    ('😍', 'POSITIVE'),
+    ('😭', 'NEGATIVE'),
+])
+def test_emoticons_and_emoji(text, expected):
+    assert sentiment(text) == expected
+
+def test_repeated_jamo_counts_once():
+    assert score_sentiment('ㅋㅋㅋㅋㅋㅋㅋㅋ') == score_sentiment('ㅋㅋ')
+
+def test_mixed_positive_and_negative():
+    scores = score_sentiment('좋은데 슬퍼')['SentimentScore']
+    assert scores['Mixed'] > 0
+    assert abs(sum(scores.values()) - 1.0) < 1e-9
+
+def test_local_client_matches_comprehend_batch_shape():
+    response = LocalSentimentClient().batch_detect_sentiment(['좋아', '싫어'])
+
+    assert response['ErrorList'] == []
+    assert [(item['Index'], item['Sentiment']) for item in response['ResultList']] == [(0, 'POSITIVE'), (1, 'NEGATIVE')]
+
+def test_local_engine_replaces_comprehend_client(monkeypatch):
+    comprehend = object()
+    assert korean_sentiment.resolve_sentiment_client(comprehend) is comprehend
+    assert korean_sentiment.resolve_sentiment_client(None) is korean_sentiment.LOCAL_SENTIMENT_CLIENT
+
+    monkeypatch.setattr(korean_sentiment, 'SENTIMENT_ENGINE', 'local')
+    assert korean_sentiment.resolve_sentiment_client(comprehend) is korean_sentiment.LOCAL_SENTIMENT_CLIENT
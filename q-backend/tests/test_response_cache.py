@@ -0,0 +1,72 @@
+import response_cache
+from response_cache import MemoryCacheBackend, ResponseCache, SQLiteCacheBackend, build_fingerprint
+
+RESPONSES = [{'type': '안전형', 'message': '오늘 하루 어땠어?'}]
+
+def fingerprint(situation, context='어제 만났어', scope='user-1'):
+    return build_fingerprint(situation, context, '안전형', ['영화', '여행'], 'casual', scope)
+
+def test_normalized_inputs_share_a_key():
+    assert fingerprint('연락 없어ㅠㅠㅠㅠ')['key'] == fingerprint('  연락 없어ㅠㅠ!!')['key']
+    assert fingerprint('연락 없어')['key'] != fingerprint('연락 없어', scope='user-2')['key']
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, 'time', lambda: now[0])
+    cache = ResponseCache(MemoryCacheBackend(), ttl=60)
+    cache.set(fingerprint('연락 없어'), RESPONSES)
+
+    now[0] += 59
+    assert cache.get(fingerprint('연락 없어')) == RESPONSES
+    now[0] += 2
+    assert cache.get(fingerprint('연락 없어')) is None
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(MemoryCacheBackend(max_entries=2))
+    cache.set(fingerprint('첫 번째'), RESPONSES)
+    cache.set(fingerprint('두 번째'), RESPONSES)
+    cache.get(fingerprint('첫 번째'))
+    cache.set(fingerprint('세 번째'), RESPONSES)
+
+    assert cache.get(fingerprint('첫 번째')) == RESPONSES
+    assert cache.get(fingerprint('두 번째')) is None
+    assert cache.get(fingerprint('세 번째')) == RESPONSES
+
+def test_similar_situation_hits_only_with_threshold_and_same_bucket():
+    cache = ResponseCache(MemoryCacheBackend(), similarity_threshold=0.6)
+    cache.set(fingerprint('주말에 영화 보러 가자고 할까'), RESPONSES)
+
+    assert cache.get(fingerprint('주말에 영화 보러 가자고 할까?')) == RESPONSES
+    assert cache.get(fingerprint('주말에 영화보러 가자고할까')) == RESPONSES
+    assert cache.get(fingerprint('주말에 영화보러 가자고할까', scope='user-2')) is None
+    assert cache.get(fingerprint('답장이 너무 늦어')) is None
+    assert cache.get_stats()['similar_hits'] == 1
+
+def test_exact_match_only_without_threshold():
+    cache = ResponseCache(MemoryCacheBackend())
+    cache.set(fingerprint('주말에 영화 보러 가자고 할까'), RESPONSES)
+
+    assert cache.get(fingerprint('주말에 영화보러 가자고할까')) is None
+
+def test_stats_report_hit_ratio_and_saved_calls():
+    cache = ResponseCache(MemoryCacheBackend())
+    cache.set(fingerprint('연락 없어'), RESPONSES)
+    cache.get(fingerprint('연락 없어'))
+    cache.get(fingerprint('연락 없어'))
+    cache.get(fingerprint('답장 없어'))
+
+    stats = cache.get_stats()
+    assert stats['lookups'] == 3
+    assert stats['bedrock_calls_saved'] == 2
+    assert abs(stats['hit_ratio'] - 2 / 3) < 1e-9
+
+def test_sqlite_backend_persists_and_evicts(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ResponseCache(SQLiteCacheBackend(path, max_entries=1))
+    cache.set(fingerprint('첫 번째'), RESPONSES)
+
+    reopened = ResponseCache(SQLiteCacheBackend(path, max_entries=1))
+    assert reopened.get(fingerprint('첫 번째')) == RESPONSES
+
+    reopened.set(fingerprint('두 번째'), RESPONSES)
+    assert reopened.get(fingerprint('첫 번째')) is None
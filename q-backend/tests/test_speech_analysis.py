@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+import file_upload
+import speech_analysis
+
+UPLOAD_ID = '0123456789abcdef0123456789abcdef'
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        self.objects[(Bucket, Key)] = json.loads(Body)
+
+class FakeLambda:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def invoke(self, **kwargs):
+        self.calls.append(kwargs)
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake = FakeS3()
+    monkeypatch.setenv('S3_BUCKET', 'love-q-files')
+    monkeypatch.setattr(speech_analysis, 's3_client', fake)
+    monkeypatch.setattr(speech_analysis, 'comprehend', None)  # 로컬 감정 분석 사용
+    return fake
+
+def test_api_request_cannot_choose_result_location(s3):
+    event = {'httpMethod': 'POST', 'body': json.dumps({
+        'messages': ['안녕하세요 ㅎㅎ', '좋아요'],
+        'upload_id': UPLOAD_ID,
+        'result_bucket': 'other-bucket',
+        'result_key': 'uploads/injected.txt'
+    })}
+
+    response = speech_analysis.lambda_handler(event, None)
+    assert response['statusCode'] == 200
+    assert s3.objects == {}
+
+def test_async_invocation_writes_to_configured_bucket(s3):
+    result = speech_analysis.lambda_handler(
+        {'async_analysis': {'messages': ['안녕하세요 ㅎㅎ', '좋아요'], 'upload_id': UPLOAD_ID}}, None
+    )
+    assert result == {'status': 'completed', 'result_key': f'results/{UPLOAD_ID}.json'}
+    stored = s3.objects[('love-q-files', f'results/{UPLOAD_ID}.json')]
+    assert stored['status'] == 'completed'
+    assert stored['analysis']['total_messages'] == 2
+
+@pytest.mark.parametrize('upload_id', ['../uploads/x', 'ABCDEF', '', None])
+def test_async_invocation_rejects_invalid_upload_id(s3, upload_id):
+    result = speech_analysis.lambda_handler({'async_analysis': {'messages': ['안녕'], 'upload_id': upload_id}}, None)
+    assert result == {'status': 'rejected'}
+    assert s3.objects == {}
+
+def test_file_upload_invokes_with_internal_event_shape(monkeypatch):
+    calls = []
+    monkeypatch.setenv('SPEECH_ANALYSIS_FUNCTION', 'love-q-speech-analysis-dev')
+    monkeypatch.setenv('S3_BUCKET', 'love-q-files')
+    monkeypatch.setattr(file_upload, 'lambda_client', FakeLambda(calls))
+
+    upload_id = file_upload.start_async_speech_analysis(['안녕하세요'])
+    payload = json.loads(calls[0]['Payload'])
+    assert payload == {'async_analysis': {'messages': ['안녕하세요'], 'upload_id': upload_id}}
+    assert calls[0]['InvocationType'] == 'Event'
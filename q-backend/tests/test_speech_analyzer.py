@@ -0,0 +1,80 @@
+import speech_analyzer
+from speech_analyzer import COMPREHEND_BATCH_SIZE, COMPREHEND_MAX_BYTES, build_sentiment_windows, sample_windows
+
+class FakeComprehend:
+    """batch_detect_sentiment 호출을 기록하고 문서 순서대로 감정을 돌려줌"""
+
+    def __init__(self, failing_indexes=()):
+        self.batches = []
+        self.failing_indexes = set(failing_indexes)
+
+    def batch_detect_sentiment(self, TextList, LanguageCode):
+        self.batches.append(list(TextList))
+        results = []
+        errors = []
+        for index, _ in enumerate(TextList):
+            if index in self.failing_indexes:
+                errors.append({'Index': index, 'ErrorCode': 'INTERNAL_SERVER_ERROR'})
+            else:
+                results.append({'Index': index, 'Sentiment': 'POSITIVE',
+                                'SentimentScore': {'Positive': 0.9, 'Negative': 0.0, 'Neutral': 0.1, 'Mixed': 0.0}})
+        return {'ResultList': results, 'ErrorList': errors}
+
+def test_windows_respect_the_comprehend_byte_limit():
+    messages = ['가' * 1000] * 12  # 메시지당 3000바이트
+
+    windows = build_sentiment_windows(messages)
+
+    assert all(len(text.encode('utf-8')) <= COMPREHEND_MAX_BYTES for _, _, text in windows)
+    assert [(first, last) for first, last, _ in windows] == [(index, index) for index in range(12)]
+
+def test_windows_group_consecutive_messages_up_to_the_message_limit():
+    messages = ['안녕', '', '뭐 해?', '밥 먹었어', '응']
+
+    windows = build_sentiment_windows(messages, max_messages=2)
+
+    assert windows == [(0, 2, '안녕 뭐 해?'), (3, 4, '밥 먹었어 응')]
+
+def test_oversized_message_is_cut_on_a_utf8_boundary():
+    windows = build_sentiment_windows(['a' + '가' * 2000])
+
+    text = windows[0][2]
+    assert len(text.encode('utf-8')) <= COMPREHEND_MAX_BYTES
+    assert text == 'a' + '가' * ((COMPREHEND_MAX_BYTES - 1) // 3)
+
+def test_sample_windows_spreads_across_the_conversation():
+    windows = [(index, index, str(index)) for index in range(10)]
+
+    assert sample_windows(windows, 20) == windows
+    assert [first for first, _, _ in sample_windows(windows, 4)] == [0, 2, 5, 7]
+
+def test_batched_analysis_sends_at_most_25_documents_per_call():
+    client = FakeComprehend()
+    messages = ['즐' * 1000] * 60  # 메시지마다 한 구간
+
+    result = speech_analyzer.analyze_emotions_batched(messages, client, max_batches=2)
+
+    assert [len(batch) for batch in client.batches] == [COMPREHEND_BATCH_SIZE, COMPREHEND_BATCH_SIZE]
+    assert result['sentiment'] == 'POSITIVE'
+    assert (result['windows_analyzed'], result['windows_total']) == (50, 60)
+
+def test_batched_analysis_samples_when_over_the_batch_budget():
+    client = FakeComprehend()
+    messages = [f'메시지 {index}' for index in range(3000)]
+
+    result = speech_analyzer.analyze_emotions_batched(messages, client, max_batches=1)
+
+    assert len(client.batches) == 1
+    assert result['windows_analyzed'] == COMPREHEND_BATCH_SIZE
+    assert result['windows_total'] == 60
+    assert result['timeline'][-1]['end_message'] > 2800
+
+def test_failed_documents_fall_back_to_local_analysis():
+    client = FakeComprehend(failing_indexes={1})
+    messages = ['좋아'] * 50 + ['싫어'] * 50
+
+    result = speech_analyzer.analyze_emotions_batched(messages, client)
+
+    assert result['windows_analyzed'] == 2
+    assert [point['start_message'] for point in result['timeline']] == [0, 50]
+    assert [point['sentiment'] for point in result['timeline']] == ['POSITIVE', 'NEGATIVE']
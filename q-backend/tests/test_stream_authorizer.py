@@ -0,0 +1,59 @@
+import base64
+import json
+
+import pytest
+
+import stream_authorizer
+
+METHOD_ARN = 'arn:aws:execute-api:us-east-1:123456789012:api-id/dev/$connect'
+
+def make_token(claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip('=')
+    return f'header.{payload}.signature'
+
+class FakeCognito:
+    def __init__(self, valid_tokens):
+        self.valid_tokens = valid_tokens
+
+    def get_user(self, AccessToken):
+        if AccessToken not in self.valid_tokens:
+            raise Exception('NotAuthorizedException')
+        return {'UserAttributes': [{'Name': 'sub', 'Value': self.valid_tokens[AccessToken]}]}
+
+@pytest.fixture
+def cognito(monkeypatch):
+    monkeypatch.setattr(stream_authorizer, 'COGNITO_USER_POOL_ID', 'us-east-1_pool')
+    monkeypatch.setattr(stream_authorizer, 'COGNITO_CLIENT_ID', 'client-1')
+    fake = FakeCognito({})
+    monkeypatch.setattr(stream_authorizer, 'cognito_client', fake)
+    return fake
+
+def connect_event(token=None):
+    return {'methodArn': METHOD_ARN, 'queryStringParameters': {'token': token} if token else None}
+
+def test_valid_token_allows_connection_with_user_context(cognito):
+    token = make_token({'iss': 'https://cognito-idp.us-east-1.amazonaws.com/us-east-1_pool',
+                        'client_id': 'client-1', 'sub': 'user-1'})
+    cognito.valid_tokens[token] = 'user-1'
+
+    policy = stream_authorizer.lambda_handler(connect_event(token), None)
+    assert policy['principalId'] == 'user-1'
+    assert policy['context'] == {'user_id': 'user-1'}
+    assert policy['policyDocument']['Statement'][0]['Effect'] == 'Allow'
+    assert policy['policyDocument']['Statement'][0]['Resource'] == METHOD_ARN
+
+@pytest.mark.parametrize('claims', [
+    {'iss': 'https://cognito-idp.us-east-1.amazonaws.com/us-east-1_other', 'client_id': 'client-1'},
+    {'iss': 'https://cognito-idp.us-east-1.amazonaws.com/us-east-1_pool', 'client_id': 'client-2'}
+])
+def test_token_from_another_pool_or_client_is_rejected(cognito, claims):
+    token = make_token(claims)
+    cognito.valid_tokens[token] = 'user-1'
+    with pytest.raises(Exception, match='Unauthorized'):
+        stream_authorizer.lambda_handler(connect_event(token), None)
+
+def test_missing_or_invalid_token_is_rejected(cognito):
+    with pytest.raises(Exception, match='Unauthorized'):
+        stream_authorizer.lambda_handler(connect_event(), None)
+    with pytest.raises(Exception, match='Unauthorized'):
+        stream_authorizer.lambda_handler(connect_event('not-a-valid-token'), None)
@@ -0,0 +1,104 @@
+from contextlib import contextmanager
+
+import pytest
+
+import usage_stats_buffer
+
+class FakeStatsDb:
+    """usage_stats_deltas/usage_stats 테이블을 메모리에서 재현 (트랜잭션 실패 시 롤백)"""
+
+    def __init__(self):
+        self.deltas = []
+        self.stats = {}
+        self.upserts = 0
+        self.fail_upsert = False
+
+    @contextmanager
+    def transaction(self):
+        snapshot = (list(self.deltas), dict(self.stats))
+        try:
+            yield self
+        except Exception:
+            self.deltas, self.stats = snapshot
+            raise
+
+    def execute(self, sql, params):
+        rows = self._rows(params)
+        if 'INSERT INTO usage_stats_deltas' in sql:
+            self.deltas.extend(rows)
+        elif 'INSERT INTO usage_stats ' in sql:
+            if self.fail_upsert:
+                raise RuntimeError('upsert failed')
+            self.upserts += 1
+            for user_id, date, conversations, responses in rows:
+                counts = self.stats.setdefault((user_id, date), [0, 0])
+                counts[0] += conversations
+                counts[1] += responses
+
+    def fetch_all(self, sql, params):
+        assert 'DELETE FROM usage_stats_deltas' in sql
+        taken, self.deltas = self.deltas[:params['limit']], self.deltas[params['limit']:]
+        return [{'user_id': user_id, 'date': date, 'conversations': conversations, 'responses': responses}
+                for user_id, date, conversations, responses in taken]
+
+    @staticmethod
+    def _rows(params):
+        count = len([key for key in params if key.startswith('user_id_')])
+        return [(params[f'user_id_{i}'], params[f'date_{i}'], params[f'conversations_{i}'], params[f'responses_{i}'])
+                for i in range(count)]
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeStatsDb()
+    monkeypatch.setattr(usage_stats_buffer.dsql, 'transaction', fake.transaction)
+    return fake
+
+def record(db, conversations):
+    with db.transaction() as tx:
+        usage_stats_buffer.append_deltas(tx, usage_stats_buffer.group_conversations(conversations))
+
+def test_group_conversations_by_user_and_date():
+    groups = usage_stats_buffer.group_conversations([
+        {'user_id': 'u1', 'created_at': '2026-10-01T09:00:00'},
+        {'user_id': 'u1', 'created_at': '2026-10-01T21:00:00'},
+        {'user_id': 'u2', 'created_at': '2026-10-02T10:00:00'},
+    ])
+
+    assert groups == {('u1', '2026-10-01'): [2, 6], ('u2', '2026-10-02'): [1, 3]}
+
+def test_flush_merges_deltas_from_many_saves_into_one_upsert(db):
+    for _ in range(5):
+        record(db, [{'user_id': 'u1', 'created_at': '2026-10-01'}])
+    record(db, [{'user_id': 'u2', 'created_at': '2026-10-01'}, {'user_id': 'u1', 'created_at': '2026-10-01'}])
+
+    result = usage_stats_buffer.flush()
+
+    assert result == {'deltas': 7, 'groups': 2}
+    assert db.upserts == 1
+    assert db.stats == {('u1', '2026-10-01'): [6, 18], ('u2', '2026-10-01'): [1, 3]}
+    assert db.deltas == []
+
+def test_failed_flush_keeps_deltas_for_next_run(db):
+    record(db, [{'user_id': 'u1', 'created_at': '2026-10-01'}])
+    db.fail_upsert = True
+
+    with pytest.raises(RuntimeError):
+        usage_stats_buffer.flush()
+    assert len(db.deltas) == 1 and db.stats == {}
+
+    db.fail_upsert = False
+    usage_stats_buffer.flush()
+
+    assert db.stats == {('u1', '2026-10-01'): [1, 3]}
+    assert db.deltas == []
+
+def test_flush_handler_drains_in_bounded_batches(db, monkeypatch):
+    monkeypatch.setattr(usage_stats_buffer, 'FLUSH_BATCH_SIZE', 2)
+    for day in range(1, 6):
+        record(db, [{'user_id': 'u1', 'created_at': f'2026-10-0{day}'}])
+
+    result = usage_stats_buffer.flush_handler({}, None)
+
+    assert result == {'deltas': 5, 'groups': 5}
+    assert db.upserts == 3
+    assert db.deltas == []